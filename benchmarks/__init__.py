@@ -0,0 +1,22 @@
+"""
+Standalone performance benchmarks for GymFlow.
+
+Each module is runnable with ``python -m benchmarks.<name>`` from the project
+root and uses the configured ``DJANGO_SETTINGS_MODULE`` database, which must
+already be migrated.
+"""
+import os
+import statistics
+
+
+def setup_django():
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gym_flow.settings')
+
+    import django
+    django.setup()
+
+
+def percentile(samples, pct):
+    if len(samples) < 2:
+        return samples[0] if samples else 0.0
+    return statistics.quantiles(samples, n=100, method='inclusive')[pct - 1]
@@ -0,0 +1,106 @@
+"""
+WSGI versus ASGI throughput with many concurrent slow clients.
+
+    python -m benchmarks.bench_asgi_wsgi --clients 200 --requests 2000 --threads 16 --client-delay-ms 50
+
+Drives the home page through Django's own WSGI and ASGI handlers in-process.
+Each client spends ``--client-delay-ms`` receiving the response, as a slow
+mobile connection would. Under WSGI that time occupies one of ``--threads``
+worker threads; under ASGI it is an await on the event loop.
+"""
+import argparse
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import percentile, setup_django
+
+
+def run_wsgi(path, requests, threads, delay):
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+
+    handler = WSGIHandler()
+    factory = RequestFactory()
+
+    def request(_):
+        started = time.perf_counter()
+        environ = factory._base_environ(PATH_INFO=path, REQUEST_METHOD='GET', HTTP_HOST='localhost')
+        body = handler(environ, lambda status, headers, exc_info=None: None)
+        for chunk in body:
+            time.sleep(delay)
+        body.close()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        latencies = sorted(executor.map(request, range(requests)))
+    return requests / (time.perf_counter() - started), latencies
+
+
+def run_asgi(path, requests, clients, delay):
+    from django.core.handlers.asgi import ASGIHandler
+
+    handler = ASGIHandler()
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+        'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+        'headers': [(b'host', b'localhost')], 'server': ('localhost', 80), 'client': ('127.0.0.1', 0),
+    }
+
+    async def request():
+        started = time.perf_counter()
+        sent = asyncio.Event()
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if messages:
+                return messages.pop()
+            await sent.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.body':
+                await asyncio.sleep(delay)
+                if not message.get('more_body'):
+                    sent.set()
+
+        await handler(dict(scope), receive, send)
+        return time.perf_counter() - started
+
+    async def main():
+        semaphore = asyncio.Semaphore(clients)
+
+        async def limited():
+            async with semaphore:
+                return await request()
+
+        return await asyncio.gather(*(limited() for _ in range(requests)))
+
+    started = time.perf_counter()
+    latencies = sorted(asyncio.run(main()))
+    return requests / (time.perf_counter() - started), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--path', default='/')
+    parser.add_argument('--clients', type=int, default=200, help="Concurrent clients under ASGI.")
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=16, help="WSGI worker threads.")
+    parser.add_argument('--client-delay-ms', type=float, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+    delay = args.client_delay_ms / 1000
+
+    print(f"{'server':<28} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, (rate, latencies) in (
+        (f'WSGI, {args.threads} threads', run_wsgi(args.path, args.requests, args.threads, delay)),
+        (f'ASGI, {args.clients} clients', run_asgi(args.path, args.requests, args.clients, delay)),
+    ):
+        print(f"{label:<28} {rate:>9.1f} {percentile(latencies, 50) * 1000:>8.1f} {percentile(latencies, 99) * 1000:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
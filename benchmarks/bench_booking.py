@@ -0,0 +1,109 @@
+"""
+Booking-opens rush: hundreds of members booking one class at the same moment.
+
+    python -m benchmarks.bench_booking --bookers 300 --capacity 40
+
+Starts ``--bookers`` threads behind a barrier, each booking the same class
+for a different synthetic member, and reports outcomes, latency of the
+successful bookings and whether the class was oversold. Runs the
+conditional-UPDATE ``book()`` and, for comparison, a naive
+read-check-write version. Needs PostgreSQL to show real contention; SQLite
+serializes every writer on a database lock.
+"""
+import argparse
+import threading
+import time
+from datetime import timedelta
+
+from benchmarks import percentile, setup_django
+
+DOMAIN = 'booking.bench.gymflow.invalid'
+
+
+def naive_book(session_id, user):
+    from gym_flow.scheduling.booking import ClassFull
+    from gym_flow.scheduling.models import Booking, ClassSession
+
+    session = ClassSession.objects.get(pk=session_id)
+    if session.booked >= session.capacity:
+        raise ClassFull
+    Booking.objects.create(session=session, user=user)
+    session.booked += 1
+    session.save(update_fields=['booked'])
+
+
+def run(label, book, members, capacity):
+    from django.db import connections
+    from django.utils import timezone
+
+    from gym_flow.scheduling.booking import BookingError
+    from gym_flow.scheduling.models import Booking, ClassSession
+
+    now = timezone.now()
+    session = ClassSession.objects.create(
+        title='bench', capacity=capacity, booking_opens_at=now,
+        starts_at=now + timedelta(days=1), ends_at=now + timedelta(days=1, hours=1),
+    )
+    start = threading.Barrier(len(members))
+    lock = threading.Lock()
+    booked, rejected, errors = [], [], []
+
+    def attempt(member):
+        start.wait()
+        started = time.perf_counter()
+        try:
+            book(session.pk, member)
+            outcome = booked
+        except BookingError:
+            outcome = rejected
+        except Exception:
+            outcome = errors
+        finally:
+            connections.close_all()
+        with lock:
+            outcome.append(time.perf_counter() - started)
+
+    threads = [threading.Thread(target=attempt, args=(member, )) for member in members]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    session.refresh_from_db()
+    rows = Booking.objects.filter(session=session).count()
+    booked.sort()
+    print(
+        f"{label:<20} {len(booked):>6} {len(rejected):>8} {len(errors):>6}"
+        f" {percentile(booked, 50) * 1000:>8.1f} {percentile(booked, 95) * 1000:>8.1f}"
+        f" {percentile(booked, 99) * 1000:>8.1f} {elapsed:>7.2f}"
+        f"  counter={session.booked} rows={rows} {'OVERSOLD' if rows > capacity or rows != session.booked else 'ok'}"
+    )
+    session.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--bookers', type=int, default=300)
+    parser.add_argument('--capacity', type=int, default=40)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+
+    from gym_flow.scheduling.booking import book
+
+    UserModel = get_user_model()
+    existing = UserModel.objects.filter(email__endswith=f'@{DOMAIN}').count()
+    UserModel.objects.create_users({'email': f'member{number}@{DOMAIN}'} for number in range(existing, args.bookers))
+    members = list(UserModel.objects.filter(email__endswith=f'@{DOMAIN}')[:args.bookers])
+
+    print(f"{'mode':<20} {'booked':>6} {'rejected':>8} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'total s':>7}")
+    run('conditional update', book, members, args.capacity)
+    run('naive read-write', naive_book, members, args.capacity)
+
+
+if __name__ == '__main__':
+    main()
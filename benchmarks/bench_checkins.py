@@ -0,0 +1,127 @@
+"""
+Check-in ingestion throughput: one INSERT per scan versus the write buffer.
+
+    python -m benchmarks.bench_checkins --events 50000 --threads 8 --members 2000
+
+Generates turnstile scans for ``--members`` synthetic members from
+``--threads`` gates at once and reports events per second for plain
+``CheckIn.objects.create`` calls, for ``CheckInBuffer`` directly, and for
+the buffer behind the HTTP ingestion view (posting ``--batch`` events per
+request). Check-ins written by the run are deleted afterwards.
+"""
+import argparse
+import json
+import random
+import time
+from unittest import mock
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from benchmarks import setup_django
+
+DOMAIN = 'checkins.bench.gymflow.invalid'
+GATE_PREFIX = 'bench-'
+
+
+def member_ids(total):
+    from django.contrib.auth import get_user_model
+
+    UserModel = get_user_model()
+    existing = UserModel.objects.filter(email__endswith=f'@{DOMAIN}').count()
+    UserModel.objects.create_users({'email': f'member{number}@{DOMAIN}'} for number in range(existing, total))
+    return list(UserModel.objects.filter(email__endswith=f'@{DOMAIN}').values_list('pk', flat=True)[:total])
+
+
+def scans(members, events, gate, seed):
+    """
+    Yield (user_id, direction, scanned_at) one millisecond apart. Members
+    come round again quickly, so some scans are dropped as duplicates.
+    """
+    from django.utils import timezone
+
+    rng = random.Random(seed)
+    now = timezone.now()
+    for number in range(events):
+        yield rng.choice(members), rng.choice(('in', 'out')), now + timedelta(milliseconds=number)
+
+
+def run(label, events, threads, ingest):
+    from django.db import connections
+
+    per_thread = events // threads
+
+    def gate(index):
+        try:
+            ingest(f'{GATE_PREFIX}{index}', per_thread, index)
+        finally:
+            connections.close_all()
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        list(executor.map(gate, range(threads)))
+    elapsed = time.perf_counter() - started
+    print(f"{label:<32} {per_thread * threads / elapsed:>12.0f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--events', type=int, default=50_000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--members', type=int, default=2000)
+    parser.add_argument('--batch', type=int, default=50, help="Events per HTTP request.")
+    parser.add_argument('--unbuffered-events', type=int, default=None,
+                        help="Events for the slow per-row baseline; defaults to a tenth of --events.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.test import Client, override_settings
+
+    from gym_flow.checkins.buffer import CheckInBuffer
+    from gym_flow.checkins.models import CheckIn
+
+    members = member_ids(args.members)
+    buffer = CheckInBuffer(
+        max_size=settings.CHECKINS_BUFFER_SIZE,
+        flush_interval=settings.CHECKINS_FLUSH_INTERVAL,
+        dedup_window=settings.CHECKINS_DEDUP_WINDOW,
+    )
+
+    def unbuffered(gate, events, seed):
+        for user_id, direction, scanned_at in scans(members, events, gate, seed):
+            CheckIn.objects.create(user_id=user_id, direction=direction, gate=gate, scanned_at=scanned_at)
+
+    def buffered(gate, events, seed):
+        for user_id, direction, scanned_at in scans(members, events, gate, seed):
+            buffer.add(CheckIn(user_id=user_id, direction=direction, gate=gate, scanned_at=scanned_at))
+
+    def over_http(gate, events, seed):
+        client = Client()
+        pending = []
+        for user_id, direction, scanned_at in scans(members, events, gate, seed):
+            pending.append({'user_id': user_id, 'direction': direction, 'gate': gate,
+                            'scanned_at': scanned_at.isoformat()})
+            if len(pending) == args.batch:
+                client.post('/checkins/', json.dumps({'events': pending}), content_type='application/json',
+                            HTTP_X_GATE_TOKEN='bench', HTTP_HOST='localhost')
+                pending = []
+
+    print(f"{'mode':<32} {'events/s':>12}")
+    try:
+        run('create() per scan', args.unbuffered_events or max(args.events // 10, args.threads),
+            args.threads, unbuffered)
+
+        run('buffered bulk_create', args.events, args.threads, buffered)
+        buffer.flush()
+
+        with override_settings(CHECKINS_GATE_TOKENS=['bench']), \
+                mock.patch('gym_flow.checkins.views.checkin_buffer', return_value=buffer):
+            run(f'HTTP, {args.batch} per request', args.events, args.threads, over_http)
+        buffer.flush()
+    finally:
+        CheckIn.objects.filter(gate__startswith=GATE_PREFIX).delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+"""
+Request throughput with and without persistent database connections.
+
+    python -m benchmarks.bench_db_connections --requests 2000 --threads 4
+
+Simulates requests the way Django's handler sees them: ``request_started``,
+a couple of queries, then ``request_finished``, which closes connections
+older than ``CONN_MAX_AGE``. Runs once with ``CONN_MAX_AGE=0`` (a new
+connection per request) and once with the configured value, or with the
+configured psycopg 3 pool. Works against PostgreSQL or a SQLite stand-in.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import percentile, setup_django
+
+
+def run(requests, threads, conn_max_age):
+    from django.core.signals import request_finished, request_started
+    from django.db import connection, connections
+
+    connections['default'].close()
+    connections.settings['default']['CONN_MAX_AGE'] = conn_max_age
+
+    def request(_):
+        started = time.perf_counter()
+        request_started.send(sender=None)
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+                cursor.execute('SELECT 1')
+        finally:
+            request_finished.send(sender=None)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(threads) as executor:
+        latencies = sorted(executor.map(request, range(requests)))
+    return requests / (time.perf_counter() - started), latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--conn-max-age', type=int, default=None, help="Defaults to the configured CONN_MAX_AGE, or 60.")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db import connections
+
+    configured = connections.settings['default']
+    options = configured.get('OPTIONS', {})
+    # Without the pool option every request opens its own connection.
+    unpooled = {key: value for key, value in options.items() if key != 'pool'}
+
+    if 'pool' in options:
+        tuned = ('psycopg pool', 0, options)
+    else:
+        persistent = args.conn_max_age if args.conn_max_age is not None else (configured.get('CONN_MAX_AGE') or 60)
+        tuned = (f'persistent (CONN_MAX_AGE={persistent})', persistent, unpooled)
+
+    print(f"{'mode':<34} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, conn_max_age, mode_options in [('new connection per request', 0, unpooled), tuned]:
+        configured['OPTIONS'] = mode_options
+        rate, latencies = run(args.requests, args.threads, conn_max_age)
+        print(f"{label:<34} {rate:>9.1f} {percentile(latencies, 50) * 1000:>8.2f} {percentile(latencies, 99) * 1000:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
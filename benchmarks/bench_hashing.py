@@ -0,0 +1,90 @@
+"""
+Bulk user creation throughput against the number of hashing processes, and
+the cost of one hash for candidate scrypt parameters.
+
+    python -m benchmarks.bench_hashing --users 2000
+    python -m benchmarks.bench_hashing --parameters
+
+Runs ``AppUserManager.create_users`` once per worker count inside a
+transaction that is rolled back, and prints users/second for each.
+``--parameters`` instead times single scrypt hashes for Django's default and
+the memory/parallelism trade-offs around it, to pick
+``ACCOUNTS_SCRYPT_*``.
+"""
+import argparse
+import hashlib
+import os
+import time
+
+from benchmarks import setup_django
+
+
+def run(users, workers):
+    from django.contrib.auth import get_user_model
+    from django.db import transaction
+
+    from gym_flow.accounts.managers import password_hashing_pool
+
+    UserModel = get_user_model()
+    data = [
+        {'email': f'bench-hashing-{i}@example.com', 'password': f'password-{i}'}
+        for i in range(users)
+    ]
+
+    with password_hashing_pool(workers) as executor:
+        # Start the workers outside the timed section.
+        list(executor.map(abs, range(workers)))
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            UserModel.objects.create_users(data, executor=executor)
+            elapsed = time.perf_counter() - started
+            transaction.set_rollback(True)
+
+    return users / elapsed
+
+
+# (log2 N, r, p); Django's default first.
+SCRYPT_CANDIDATES = [(14, 8, 5), (15, 8, 3), (16, 8, 2), (17, 8, 1), (15, 8, 1), (16, 8, 1)]
+
+
+def time_scrypt(log_n, r, p, rounds=5):
+    from gym_flow.accounts.hashers import scrypt_maxmem
+
+    n = 2 ** log_n
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        hashlib.scrypt(b'bench-Password-1', salt=b'bench-salt', n=n, r=r, p=p, maxmem=scrypt_maxmem(n, r, p), dklen=64)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=1000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count())
+    parser.add_argument('--parameters', action='store_true')
+    args = parser.parse_args()
+
+    if args.parameters:
+        print(f"{'N':>6} {'r':>3} {'p':>3} {'ms':>8} {'MiB':>6} {'N*N*p vs default':>17}")
+        for log_n, r, p in SCRYPT_CANDIDATES:
+            elapsed = time_scrypt(log_n, r, p)
+            # Memory-time cost of one guess, relative to Django's default.
+            cost = 2 ** (2 * log_n) * p / (2 ** 28 * 5)
+            print(f"2**{log_n:<3} {r:>3} {p:>3} {elapsed * 1000:>8.1f} {128 * 2 ** log_n * r / 2**20:>6.0f} {cost:>16.2f}x")
+        return
+
+    setup_django()
+
+    print(f"{'workers':>8} {'users/s':>10} {'speedup':>8}")
+    baseline = None
+    for workers in range(1, args.max_workers + 1):
+        rate = run(args.users, workers)
+        baseline = baseline or rate
+        print(f"{workers:>8} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+"""
+Login throughput and latency under a burst of concurrent members.
+
+    python -m benchmarks.bench_login --users 50 --logins 500 --concurrency 16 --budget-ms 250
+
+Creates throwaway users with the preferred password hasher, then runs
+``authenticate()`` from ``--concurrency`` threads. Reports logins/second,
+latency percentiles and the share of logins inside ``--budget-ms``. A tenth
+of the attempts use unknown emails to include the dummy-hash path.
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import percentile, setup_django
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--users', type=int, default=50)
+    parser.add_argument('--logins', type=int, default=500)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--budget-ms', type=float, default=250)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import authenticate, get_user_model
+    from django.db import connection
+
+    UserModel = get_user_model()
+    emails = [f'bench-login-{i}@example.com' for i in range(args.users)]
+    UserModel.objects.filter(email__in=emails).delete()
+    UserModel.objects.create_users({'email': email, 'password': 'bench-password'} for email in emails)
+
+    def login(i):
+        email = random.choice(emails) if i % 10 else f'bench-unknown-{i}@example.com'
+        started = time.perf_counter()
+        authenticate(email=email, password='bench-password')
+        elapsed = time.perf_counter() - started
+        connection.close()
+        return elapsed
+
+    try:
+        started = time.perf_counter()
+        with ThreadPoolExecutor(args.concurrency) as executor:
+            latencies = sorted(executor.map(login, range(args.logins)))
+        wall = time.perf_counter() - started
+    finally:
+        UserModel.objects.filter(email__in=emails).delete()
+
+    within_budget = sum(latency * 1000 <= args.budget_ms for latency in latencies) / len(latencies)
+    print(f"logins/s:      {args.logins / wall:.1f}")
+    for pct in (50, 95, 99):
+        print(f"p{pct}:           {percentile(latencies, pct) * 1000:.1f} ms")
+    print(f"within budget: {within_budget:.1%} of logins <= {args.budget_ms:.0f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Save cost and disk usage of content-addressed media against plain files.
+
+    python -m benchmarks.bench_media_storage --uploads 2000 --size-kb 300 --duplicates 0.3
+
+Saves ``--uploads`` random files of ``--size-kb`` into a temporary directory
+with ``FileSystemStorage`` and with ``ContentAddressedStorage``; the share
+``--duplicates`` repeats an earlier upload, as re-uploads of the same photo
+do. Reports saves/second, p95 save latency and the bytes left on disk.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks import percentile, setup_django
+
+
+def disk_usage(root):
+    return sum(
+        os.path.getsize(os.path.join(directory, name)) for directory, _, names in os.walk(root) for name in names
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--uploads', type=int, default=2000)
+    parser.add_argument('--size-kb', type=int, default=300)
+    parser.add_argument('--duplicates', type=float, default=0.3)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.files.base import ContentFile
+    from django.core.files.storage import FileSystemStorage
+
+    from gym_flow.common.storage import ContentAddressedStorage
+
+    rng = random.Random(args.seed)
+    uploads = []
+    for _ in range(args.uploads):
+        if uploads and rng.random() < args.duplicates:
+            uploads.append(rng.choice(uploads))
+        else:
+            uploads.append(rng.randbytes(args.size_kb * 1024))
+
+    print(f"{'storage':<18} {'saves/s':>8} {'p95 ms':>8} {'on disk MB':>11}")
+    for label, storage_class in (('filesystem', FileSystemStorage), ('content-addressed', ContentAddressedStorage)):
+        with tempfile.TemporaryDirectory() as root:
+            storage = storage_class(location=root)
+            latencies = []
+            started = time.perf_counter()
+            for number, content in enumerate(uploads):
+                begin = time.perf_counter()
+                storage.save(f'profile_pictures/photo{number % 50}.jpg', ContentFile(content))
+                latencies.append(time.perf_counter() - begin)
+            wall = time.perf_counter() - started
+            print(
+                f"{label:<18} {len(uploads) / wall:>8.0f} {percentile(sorted(latencies), 95) * 1000:>8.2f}"
+                f" {disk_usage(root) / 2**20:>11.1f}"
+            )
+
+
+if __name__ == '__main__':
+    main()
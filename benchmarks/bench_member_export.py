@@ -0,0 +1,71 @@
+"""
+Member export memory and throughput for growing member bases.
+
+    python -m benchmarks.bench_member_export --profiles 10000 100000 --format csv
+
+Seeds members the same way as ``bench_member_search`` (shared with it, so a
+seeded database serves both), then exports all of them with
+``export_members`` and, for comparison, by building the whole export in a
+list first. Reports rows/s and the peak Python memory of each; the streaming
+peak should stay flat as ``--profiles`` grows. Each size in ``--profiles``
+exports the first that many members. ``--cleanup`` deletes the
+seeded members afterwards.
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks import setup_django
+from benchmarks.bench_member_search import DOMAIN, seed
+
+
+def measure(chunks):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = sum(len(chunk) for chunk in chunks())
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--format', choices=['csv', 'ndjson'], default='csv')
+    parser.add_argument('--chunk-size', type=int, default=None)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--cleanup', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    from gym_flow.accounts.export import export_members
+    from gym_flow.accounts.models import Profile
+
+    seed(max(args.profiles), args.batch_size, random.Random(0))
+    print(f"{connection.vendor}, {args.format}")
+    print(f"{'members':>9} {'mode':<10} {'rows/s':>10} {'MB out':>8} {'peak MB':>8}")
+
+    try:
+        for total in sorted(args.profiles):
+            last_pk = Profile.objects.order_by('pk').values_list('pk', flat=True)[total - 1]
+            profiles = Profile.objects.filter(pk__lte=last_pk)
+            modes = {
+                'streaming': lambda: export_members(args.format, args.chunk_size, profiles),
+                'in-memory': lambda: [''.join(list(export_members(args.format, args.chunk_size, profiles)))],
+            }
+            for mode, chunks in modes.items():
+                size, elapsed, peak = measure(chunks)
+                print(f"{total:>9} {mode:<10} {total / elapsed:>10.0f} {size / 2**20:>8.1f} {peak / 2**20:>8.1f}")
+    finally:
+        if args.cleanup:
+            get_user_model().objects.filter(email__endswith=f'@{DOMAIN}').delete()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,114 @@
+"""
+Member directory search latency over a large synthetic member base.
+
+    python -m benchmarks.bench_member_search --profiles 1000000 --queries 500
+
+Seeds ``--profiles`` members under the ``@bench.gymflow.invalid`` domain (only
+the missing ones, so later runs reuse them) with unusable passwords, then
+times first pages and follow-up keyset pages for prefix, fuzzy and email
+searches and prints p50/p95 per kind. ``--cleanup`` deletes the seeded
+members afterwards. Run it against PostgreSQL to exercise the trigram
+indexes; on SQLite it measures the substring fallback.
+"""
+import argparse
+import random
+import string
+import time
+from itertools import islice
+
+from benchmarks import percentile, setup_django
+
+DOMAIN = 'bench.gymflow.invalid'
+SYLLABLES = ['an', 'bel', 'cor', 'dan', 'el', 'fin', 'gar', 'hol', 'is', 'jo', 'kar', 'lin', 'mar', 'nov',
+             'ol', 'pet', 'quin', 'ros', 'sam', 'tor', 'ul', 'van', 'wil', 'yan', 'zel']
+
+
+def make_name(rng, parts):
+    return ''.join(rng.choice(SYLLABLES) for _ in range(parts)).capitalize()
+
+
+def seed(total, batch_size, rng):
+    from django.contrib.auth import get_user_model
+
+    UserModel = get_user_model()
+    existing = UserModel.objects.filter(email__endswith=f'@{DOMAIN}').count()
+
+    def members():
+        for number in range(existing, total):
+            first, last = make_name(rng, 2), make_name(rng, 3)
+            yield {
+                'email': f'{first.lower()}.{last.lower()}.{number}@{DOMAIN}',
+                'profile': {'username': f'{first.lower()}{number}', 'first_name': first, 'last_name': last},
+            }
+
+    started = time.perf_counter()
+    pending = members()
+    # create_users returns what it created, so feed it a bounded chunk at a time.
+    while chunk := list(islice(pending, batch_size * 10)):
+        UserModel.objects.create_users(chunk, batch_size=batch_size)
+    if total > existing:
+        print(f"seeded {total - existing} members in {time.perf_counter() - started:.1f}s")
+
+
+def typo(rng, word):
+    index = rng.randrange(len(word))
+    return word[:index] + rng.choice(string.ascii_lowercase) + word[index + 1:]
+
+
+def run(kind, queries, rng):
+    from gym_flow.accounts.search import paginate, search_profiles
+
+    first_page, next_page = [], []
+    for _ in range(queries):
+        if kind == 'prefix':
+            term = make_name(rng, 2)[:rng.randint(2, 4)]
+        elif kind == 'fuzzy':
+            term = typo(rng, make_name(rng, 3))
+        else:
+            term = f'{make_name(rng, 2).lower()}.'
+
+        started = time.perf_counter()
+        profiles, cursor = paginate(search_profiles(term))
+        first_page.append(time.perf_counter() - started)
+
+        if cursor:
+            started = time.perf_counter()
+            paginate(search_profiles(term), cursor=cursor)
+            next_page.append(time.perf_counter() - started)
+
+    return sorted(first_page), sorted(next_page)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--profiles', type=int, default=1_000_000)
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--cleanup', action='store_true')
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+
+    rng = random.Random(args.seed)
+    seed(args.profiles, args.batch_size, rng)
+
+    print(f"{connection.vendor}, {args.profiles} members")
+    print(f"{'search':<8} {'page 1 p50 ms':>14} {'page 1 p95 ms':>14} {'page 2 p50 ms':>14} {'page 2 p95 ms':>14}")
+    try:
+        for kind in ('prefix', 'fuzzy', 'email'):
+            first_page, next_page = run(kind, args.queries, rng)
+            print(
+                f"{kind:<8} {percentile(first_page, 50) * 1000:>14.2f} {percentile(first_page, 95) * 1000:>14.2f}"
+                f" {percentile(next_page, 50) * 1000:>14.2f} {percentile(next_page, 95) * 1000:>14.2f}"
+            )
+    finally:
+        if args.cleanup:
+            get_user_model().objects.filter(email__endswith=f'@{DOMAIN}').delete()
+
+
+if __name__ == '__main__':
+    main()
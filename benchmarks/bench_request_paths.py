@@ -0,0 +1,260 @@
+"""
+Throughput, latency and queries per request for the main member request paths.
+
+    python manage.py benchmark_requests --requests 500 --concurrency 4 --output before.json
+    python manage.py benchmark_requests --output after.json --compare before.json
+    python manage.py benchmark_requests --compare before.json after.json --threshold 5
+
+Drives ``home``, ``register``, ``login``, ``logout`` and ``profile-edit``
+(GET and a saving POST) through the full middleware stack with the Django
+test client, one synthetic member per worker thread under the
+``@paths.bench.gymflow.invalid`` domain, and deletes the members afterwards.
+Each scenario records requests/second, p50/p95/p99 latency and queries per
+request; ``--output`` saves them as JSON together with the database vendor
+and git revision.
+
+``--compare BASELINE`` checks the fresh run against a saved one, and
+``--compare BASELINE CURRENT`` compares two saved runs without running
+anything. Latency or throughput worse than ``--threshold`` percent, any
+extra query per request or any failed request is reported as a regression
+and makes the command exit with an error. A fresh run with failed requests
+(wrong status code, e.g. 400 for a host missing from ``ALLOWED_HOSTS``) is
+an error by itself and is not saved, so it cannot become a baseline.
+
+Runs against whatever ``DATABASES['default']`` points to. SQLite serialises
+writes, so keep ``--concurrency 1`` there and use PostgreSQL for concurrent
+runs. ``python -m benchmarks.bench_request_paths`` takes the same options.
+"""
+import platform
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from benchmarks import percentile, setup_django
+
+DOMAIN = 'paths.bench.gymflow.invalid'
+PASSWORD = 'bench-Password-1'
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms')
+
+
+class Worker:
+    """One client and one synthetic member, used by a single thread."""
+
+    def __init__(self, user, run_id, number):
+        from django.test import Client
+
+        self.client = Client(HTTP_HOST='localhost')
+        self.user = user
+        self.run_id = run_id
+        self.number = number
+
+
+def _home(worker, i):
+    return worker.client.get('/')
+
+
+def _register(worker, i):
+    email = f'new-{worker.run_id}-{worker.number}-{i}@{DOMAIN}'
+    return worker.client.post('/accounts/register/', {'email': email, 'password1': PASSWORD, 'password2': PASSWORD})
+
+
+def _login(worker, i):
+    return worker.client.post('/accounts/login/', {'username': worker.user.email, 'password': PASSWORD})
+
+
+def _logout_prepare(worker, i):
+    worker.client.force_login(worker.user)
+
+
+def _logout(worker, i):
+    return worker.client.post('/accounts/logout/')
+
+
+def _login_prepare(worker, i):
+    worker.client.logout()
+
+
+def _member_prepare(worker, i):
+    if '_auth_user_id' not in worker.client.session:
+        worker.client.force_login(worker.user)
+
+
+def _profile_edit(worker, i):
+    return worker.client.get(f'/accounts/profile/{worker.user.pk}/')
+
+
+def _profile_save(worker, i):
+    return worker.client.post(
+        f'/accounts/profile/{worker.user.pk}/',
+        {'username': f'member{worker.number}x{i}', 'first_name': 'Bench', 'last_name': f'Member{worker.number}'},
+    )
+
+
+# name: (untimed preparation, timed request, expected status)
+SCENARIOS = {
+    'home': (None, _home, 200),
+    'register': (_login_prepare, _register, 302),
+    'login': (_login_prepare, _login, 302),
+    'logout': (_logout_prepare, _logout, 302),
+    'profile-edit': (_member_prepare, _profile_edit, 200),
+    'profile-save': (_member_prepare, _profile_save, 302),
+}
+
+
+def _run_worker(scenario, worker, numbers):
+    from django.db import connection
+
+    prepare, send, expected = SCENARIOS[scenario]
+    queries = []
+    latencies = []
+    errors = 0
+
+    def count(execute, sql, params, many, context):
+        queries[-1] += 1
+        return execute(sql, params, many, context)
+
+    try:
+        for i in numbers:
+            if prepare:
+                prepare(worker, i)
+            queries.append(0)
+            with connection.execute_wrapper(count):
+                started = time.perf_counter()
+                response = send(worker, i)
+                latencies.append(time.perf_counter() - started)
+            errors += response.status_code != expected
+    finally:
+        connection.close()
+    return latencies, queries, errors
+
+
+def run_scenario(scenario, workers, requests, warmup=10):
+    # Warm templates, caches and connections outside the measurement.
+    for worker in workers:
+        _run_worker(scenario, worker, range(-warmup, 0))
+
+    slices = [range(number, requests, len(workers)) for number in range(len(workers))]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(len(workers)) as executor:
+        outcomes = list(executor.map(_run_worker, [scenario] * len(workers), workers, slices))
+    wall = time.perf_counter() - started
+
+    latencies = [latency for outcome in outcomes for latency in outcome[0]]
+    queries = [count for outcome in outcomes for count in outcome[1]]
+    return {
+        'requests': len(latencies),
+        'errors': sum(outcome[2] for outcome in outcomes),
+        'throughput_rps': round(len(latencies) / wall, 2),
+        'p50_ms': round(percentile(latencies, 50) * 1000, 3),
+        'p95_ms': round(percentile(latencies, 95) * 1000, 3),
+        'p99_ms': round(percentile(latencies, 99) * 1000, 3),
+        'queries_per_request': round(sum(queries) / len(queries), 2),
+    }
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(scenarios=tuple(SCENARIOS), requests=200, concurrency=1, warmup=10, progress=None):
+    """Run ``scenarios`` and return the results document saved by ``--output``."""
+    import django
+    from django.conf import settings
+    from django.contrib.auth import get_user_model
+    from django.db import connection
+    from django.test.utils import override_settings
+
+    UserModel = get_user_model()
+    run_id = uuid.uuid4().hex[:8]
+    UserModel.objects.filter(email__endswith=f'@{DOMAIN}').delete()
+    users = UserModel.objects.create_users(
+        {'email': f'member-{number}@{DOMAIN}', 'password': PASSWORD, 'profile': {'username': f'member{number}'}}
+        for number in range(concurrency)
+    )
+
+    # The same few members log in over and over; keep the throttle checks in
+    # the measurement but never let them reject.
+    unthrottled = override_settings(ACCOUNTS_THROTTLE_RATES={
+        scope: (10 ** 9, window) for scope, (_, window) in settings.ACCOUNTS_THROTTLE_RATES.items()
+    })
+    results = {}
+    try:
+        unthrottled.enable()
+        for scenario in scenarios:
+            workers = [Worker(user, run_id, number) for number, user in enumerate(users)]
+            results[scenario] = run_scenario(scenario, workers, requests, warmup)
+            if progress:
+                progress(scenario, results[scenario])
+    finally:
+        unthrottled.disable()
+        UserModel.objects.filter(email__endswith=f'@{DOMAIN}').delete()
+
+    return {
+        'meta': {
+            'started_at': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'revision': _git_revision(),
+            'settings': settings.SETTINGS_MODULE,
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'requests': requests,
+            'concurrency': concurrency,
+        },
+        'results': results,
+    }
+
+
+def _change(old, new):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(baseline, current, threshold=10.0):
+    """
+    Return ``[(scenario, metric, old, new, change_pct, regressed), ...]`` for
+    the scenarios both runs measured.
+    """
+    rows = []
+    for scenario, new in current['results'].items():
+        old = baseline['results'].get(scenario)
+        if old is None:
+            continue
+        for metric in LATENCY_METRICS:
+            change = _change(old[metric], new[metric])
+            rows.append((scenario, metric, old[metric], new[metric], change, change > threshold))
+        change = _change(old['throughput_rps'], new['throughput_rps'])
+        rows.append((scenario, 'throughput_rps', old['throughput_rps'], new['throughput_rps'], change, -change > threshold))
+        # Query counts are deterministic, so any increase is a regression.
+        old_queries, new_queries = old['queries_per_request'], new['queries_per_request']
+        rows.append((
+            scenario, 'queries_per_request', old_queries, new_queries,
+            _change(old_queries, new_queries), new_queries > old_queries,
+        ))
+        # Timings of failed requests measure the wrong thing.
+        rows.append((
+            scenario, 'errors', old['errors'], new['errors'], _change(old['errors'], new['errors']), new['errors'] > 0,
+        ))
+    return rows
+
+
+def failed_scenarios(results):
+    return [scenario for scenario, stats in results['results'].items() if stats['errors']]
+
+
+def main():
+    setup_django()
+
+    from django.core.management import call_command
+
+    call_command('benchmark_requests', *sys.argv[1:])
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Dashboard queries from the rollups versus aggregating raw check-ins.
+
+    python -m benchmarks.bench_rollups --checkins 1000000 --days 30 --repeat 20
+
+Seeds ``--checkins`` scans spread over the last ``--days`` days for a set of
+synthetic members, times a full rebuild and an incremental refresh, then
+times each dashboard query against the rollups and as an on-the-fly
+aggregate over ``CheckIn``. Seeded rows are deleted afterwards and the
+rollups rebuilt from what is left.
+"""
+import argparse
+import random
+import time
+from datetime import timedelta
+
+from benchmarks import percentile, setup_django
+
+DOMAIN = 'rollups.bench.gymflow.invalid'
+GATE = 'bench-rollups'
+
+
+def seed(checkins, days, members, rng):
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from gym_flow.checkins.models import CheckIn
+
+    UserModel = get_user_model()
+    existing = UserModel.objects.filter(email__endswith=f'@{DOMAIN}').count()
+    UserModel.objects.create_users({'email': f'member{number}@{DOMAIN}'} for number in range(existing, members))
+    member_ids = list(UserModel.objects.filter(email__endswith=f'@{DOMAIN}').values_list('pk', flat=True))
+
+    start = timezone.now() - timedelta(days=days)
+    span = days * 24 * 3600
+    batch = []
+    for number in range(checkins):
+        scanned_at = start + timedelta(seconds=rng.randrange(span))
+        batch.append(CheckIn(
+            user_id=rng.choice(member_ids), gate=GATE, scanned_at=scanned_at,
+            direction=CheckIn.Direction.IN if number % 2 == 0 else CheckIn.Direction.OUT,
+        ))
+        if len(batch) == 10_000:
+            CheckIn.objects.bulk_create(batch)
+            batch = []
+    CheckIn.objects.bulk_create(batch)
+    return member_ids
+
+
+def timed(repeat, query):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        query()
+        samples.append(time.perf_counter() - started)
+    return sorted(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--checkins', type=int, default=1_000_000)
+    parser.add_argument('--days', type=int, default=30)
+    parser.add_argument('--members', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.db.models import Count, Q
+    from django.db.models.functions import TruncDate, TruncHour
+    from django.test import override_settings
+    from django.utils import timezone
+
+    from gym_flow.checkins import rollups
+    from gym_flow.checkins.models import CheckIn
+
+    rng = random.Random(args.seed)
+    started = time.perf_counter()
+    member_ids = seed(args.checkins, args.days, args.members, rng)
+    print(f"seeded {args.checkins} check-ins in {time.perf_counter() - started:.1f}s")
+
+    try:
+        with override_settings(CHECKINS_ROLLUP_LAG=0):
+            started = time.perf_counter()
+            rollups.rebuild()
+            print(f"rebuild: {time.perf_counter() - started:.1f}s")
+
+            now = timezone.now()
+            CheckIn.objects.bulk_create(
+                CheckIn(user_id=rng.choice(member_ids), gate=GATE, scanned_at=now - timedelta(seconds=rng.randrange(3600)))
+                for _ in range(1000)
+            )
+            started = time.perf_counter()
+            rollups.refresh()
+            print(f"incremental refresh of 1000 new check-ins: {(time.perf_counter() - started) * 1000:.1f}ms")
+
+        month_start = now - timedelta(days=args.days)
+        today = rollups.day_start(rollups.local_day(now))
+        member = rng.choice(member_ids)
+
+        queries = [
+            ('members inside now',
+             lambda: rollups.current_occupancy(now),
+             lambda: CheckIn.objects.filter(scanned_at__gte=today, scanned_at__lte=now).aggregate(
+                 entries=Count('pk', filter=Q(direction='in')), exits=Count('pk', filter=Q(direction='out')))),
+            ('visits per hour, whole range',
+             lambda: rollups.visits_per_hour(month_start, now),
+             lambda: list(CheckIn.objects.filter(scanned_at__gte=month_start, scanned_at__lt=now, direction='in')
+                          .annotate(hour=TruncHour('scanned_at')).values('hour').annotate(n=Count('pk')).order_by('hour'))),
+            ('one member, visits per day',
+             lambda: rollups.visits_per_day(month_start.date(), now.date() + timedelta(days=1), user=member),
+             lambda: list(CheckIn.objects.filter(user=member, direction='in', scanned_at__gte=month_start)
+                          .annotate(day=TruncDate('scanned_at')).values('day').annotate(n=Count('pk')).order_by('day'))),
+        ]
+
+        print(f"{'query':<30} {'rollup p50 ms':>14} {'rollup p95 ms':>14} {'raw p50 ms':>11} {'raw p95 ms':>11}")
+        for label, from_rollup, from_raw in queries:
+            fast, slow = timed(args.repeat, from_rollup), timed(args.repeat, from_raw)
+            print(
+                f"{label:<30} {percentile(fast, 50) * 1000:>14.2f} {percentile(fast, 95) * 1000:>14.2f}"
+                f" {percentile(slow, 50) * 1000:>11.2f} {percentile(slow, 95) * 1000:>11.2f}"
+            )
+    finally:
+        CheckIn.objects.filter(gate=GATE).delete()
+        rollups.rebuild()
+
+
+if __name__ == '__main__':
+    main()
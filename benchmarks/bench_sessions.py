@@ -0,0 +1,68 @@
+"""
+Per-request session overhead for each session engine.
+
+    python -m benchmarks.bench_sessions --requests 2000
+
+Runs ``SessionMiddleware`` around a trivial view for an existing session,
+once reading it and once re-assigning an unchanged value (which marks the
+session modified), and prints the time per request for each engine.
+"""
+import argparse
+import time
+
+from benchmarks import setup_django
+
+ENGINES = (
+    'django.contrib.sessions.backends.db',
+    'django.contrib.sessions.backends.cached_db',
+    'gym_flow.common.sessions',
+)
+
+
+def run(engine, requests, rewrite):
+    from django.conf import settings
+    from django.contrib.sessions.middleware import SessionMiddleware
+    from django.http import HttpResponse
+    from django.test import RequestFactory, override_settings
+    from django.utils.module_loading import import_string
+
+    def view(request):
+        member = request.session.get('member')
+        if rewrite:
+            request.session['member'] = member
+        return HttpResponse()
+
+    with override_settings(SESSION_ENGINE=engine):
+        store = import_string(f'{engine}.SessionStore')()
+        store['member'] = 1
+        store.create()
+
+        middleware = SessionMiddleware(view)
+        factory = RequestFactory()
+        try:
+            started = time.perf_counter()
+            for _ in range(requests):
+                request = factory.get('/')
+                request.COOKIES[settings.SESSION_COOKIE_NAME] = store.session_key
+                middleware(request)
+            return (time.perf_counter() - started) / requests
+        finally:
+            store.delete()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+
+    print(f"{'engine':<44} {'read us':>9} {'rewrite us':>11}")
+    for engine in ENGINES:
+        read = run(engine, args.requests, rewrite=False)
+        rewrite = run(engine, args.requests, rewrite=True)
+        print(f"{engine:<44} {read * 1e6:>9.1f} {rewrite * 1e6:>11.1f}")
+
+
+if __name__ == '__main__':
+    main()
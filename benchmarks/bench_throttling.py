@@ -0,0 +1,70 @@
+"""
+Cost of throttling login and registration attempts.
+
+    python -m benchmarks.bench_throttling --requests 2000
+
+Times ``throttling.check`` on its own, then posts registrations with
+mismatched passwords (rejected by the form, so nothing is hashed or saved)
+with throttling off and with limits high enough never to reject. Reports
+p50/p95 latency of each and the difference throttling adds per request.
+Uses whatever cache ``ACCOUNTS_THROTTLE_CACHE_ALIAS`` points to.
+"""
+import argparse
+import time
+
+from benchmarks import percentile, setup_django
+
+
+def timed(call, requests):
+    latencies = []
+    for i in range(requests):
+        started = time.perf_counter()
+        call(i)
+        latencies.append(time.perf_counter() - started)
+    latencies.sort()
+    return percentile(latencies, 50) * 1000, percentile(latencies, 95) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.conf import settings
+    from django.test import Client, RequestFactory
+    from django.test.utils import override_settings
+
+    from gym_flow.accounts.throttling import check
+
+    unlimited = {scope: (10 ** 9, window) for scope, (_, window) in settings.ACCOUNTS_THROTTLE_RATES.items()}
+    request = RequestFactory().post('/', REMOTE_ADDR='192.0.2.1')
+    client = Client(HTTP_HOST='localhost')
+
+    def register(i):
+        client.post('/accounts/register/', {
+            'email': f'throttle-{i}@bench.gymflow.invalid', 'password1': 'bench-Password-1', 'password2': 'mismatch',
+        })
+
+    print(settings.CACHES[settings.ACCOUNTS_THROTTLE_CACHE_ALIAS]['BACKEND'])
+    print(f"{'measurement':<22} {'p50 ms':>8} {'p95 ms':>8}")
+    with override_settings(ACCOUNTS_THROTTLE_RATES=unlimited):
+        timed(lambda i: check(request, 'login', f'member{i}@bench.gymflow.invalid'), args.warmup)
+        p50, p95 = timed(lambda i: check(request, 'login', f'member{i}@bench.gymflow.invalid'), args.requests)
+    print(f"{'check()':<22} {p50:>8.3f} {p95:>8.3f}")
+
+    rows = {}
+    for label, rates in (('register, off', {}), ('register, throttled', unlimited)):
+        with override_settings(ACCOUNTS_THROTTLE_RATES=rates):
+            timed(register, args.warmup)
+            rows[label] = timed(register, args.requests)
+        print(f"{label:<22} {rows[label][0]:>8.3f} {rows[label][1]:>8.3f}")
+
+    (off50, off95), (on50, on95) = rows.values()
+    print(f"{'added by throttling':<22} {on50 - off50:>8.3f} {on95 - off95:>8.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,63 @@
 from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.contrib.auth.admin import UserAdmin
 
-# Register your models here.
+from gym_flow.accounts.forms import AppUserChangeForm, AppUserCreationForm
+from gym_flow.accounts.models import Profile
+from gym_flow.common.admin import KeysetPaginationMixin
+
+UserModel = get_user_model()
+
+
+class ProfileInline(admin.StackedInline):
+    model = Profile
+    can_delete = False
+
+
+@admin.register(UserModel)
+class AppUserAdmin(KeysetPaginationMixin, UserAdmin):
+    form = AppUserChangeForm
+    add_form = AppUserCreationForm
+
+    list_display = ('email', 'profile_username', 'profile_name', 'is_staff', 'is_active')
+    list_filter = ('is_staff', 'is_superuser', 'is_active')
+    list_select_related = ('profile', )
+    list_only = (
+        'id', 'email', 'is_staff', 'is_active',
+        'profile__username', 'profile__first_name', 'profile__last_name',
+    )
+    # Prefix searches use the indexes added for the member directory.
+    search_fields = ('^email', '^profile__username', '^profile__first_name', '^profile__last_name')
+    ordering = ('-pk', )
+
+    fieldsets = (
+        (None, {'fields': ('email', 'password')}),
+        ('Permissions', {'fields': ('is_active', 'is_staff', 'is_superuser', 'groups', 'user_permissions')}),
+        ('Important dates', {'fields': ('last_login', )}),
+    )
+    add_fieldsets = (
+        (None, {'classes': ('wide', ), 'fields': ('email', 'password1', 'password2')}),
+    )
+    inlines = (ProfileInline, )
+
+    @admin.display(description='username', ordering='profile__username')
+    def profile_username(self, user):
+        return user.profile.username
+
+    @admin.display(description='name', ordering='profile__last_name')
+    def profile_name(self, user):
+        return ' '.join(filter(None, (user.profile.first_name, user.profile.last_name)))
+
+
+@admin.register(Profile)
+class ProfileAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = ('username', 'first_name', 'last_name', 'user_email', 'date_joined')
+    list_select_related = ('user', )
+    list_only = ('user', 'username', 'first_name', 'last_name', 'date_joined', 'user__email')
+    search_fields = ('^username', '^first_name', '^last_name', '^user__email')
+    ordering = ('-pk', )
+    raw_id_fields = ('user', )
+
+    @admin.display(description='email', ordering='user__email')
+    def user_email(self, profile):
+        return profile.user.email
@@ -0,0 +1,92 @@
+import threading
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+UserModel = get_user_model()
+
+# Bump when the cached AppUser/Profile shape changes so stale pickles are ignored.
+USER_CACHE_VERSION = 1
+
+
+def user_cache():
+    return caches[getattr(settings, 'ACCOUNTS_USER_CACHE_ALIAS', 'default')]
+
+
+def user_cache_key(user_id):
+    return f'accounts:user:v{USER_CACHE_VERSION}:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    user_cache().delete(user_cache_key(user_id))
+
+
+def invalidate_cached_users(user_ids):
+    user_cache().delete_many([user_cache_key(user_id) for user_id in user_ids])
+
+
+class HashingBusy(Exception):
+    """No hashing slot became free in time; the login should be retried."""
+
+    retry_after = 5
+
+
+_hashing_slots = (None, None)
+_hashing_slots_lock = threading.Lock()
+
+
+def hashing_slots():
+    """
+    The process-wide semaphore, replaced when
+    ``ACCOUNTS_MAX_CONCURRENT_HASHES`` changes; holders of the old one
+    release it as usual.
+    """
+    global _hashing_slots
+
+    size = settings.ACCOUNTS_MAX_CONCURRENT_HASHES
+    with _hashing_slots_lock:
+        if _hashing_slots[0] != size:
+            _hashing_slots = (size, threading.BoundedSemaphore(size))
+        return _hashing_slots[1]
+
+
+class ProfileModelBackend(ModelBackend):
+    """
+    Loads the AppUser together with its Profile in one query and keeps the
+    pair in the cache, so the per-request user lookup and
+    ``request.user.profile`` do not hit the database on a warm cache.
+
+    Password checks, including the dummy hash for unknown emails and the
+    rehash of outdated hashes, hold one of ``ACCOUNTS_MAX_CONCURRENT_HASHES``
+    slots per process, so a login burst queues instead of occupying every
+    worker thread with hashing. Waiting longer than
+    ``ACCOUNTS_HASH_QUEUE_TIMEOUT`` seconds raises HashingBusy rather than
+    reporting wrong credentials. The login view renders its own 503 for it;
+    HashingBusyMiddleware answers it for every other view, such as the
+    admin login.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        slots = hashing_slots()
+        if not slots.acquire(timeout=settings.ACCOUNTS_HASH_QUEUE_TIMEOUT):
+            raise HashingBusy
+        try:
+            return super().authenticate(request, username=username, password=password, **kwargs)
+        finally:
+            slots.release()
+
+    def get_user(self, user_id):
+        cache = user_cache()
+        key = user_cache_key(user_id)
+
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = UserModel._default_manager.select_related('profile').get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            cache.set(key, user, getattr(settings, 'ACCOUNTS_USER_CACHE_TIMEOUT', 300))
+
+        return user if self.user_can_authenticate(user) else None
@@ -0,0 +1,101 @@
+"""
+Streaming member export.
+
+Rows are read with ``QuerySet.iterator()``, which uses a server-side cursor
+on PostgreSQL, and encoded as CSV or NDJSON a chunk at a time, so memory use
+does not depend on the number of members. Under ASGI the response needs
+``aexport_members``, because Django reads a sync iterator into a list there
+before sending anything. The CSV columns are a superset of
+what ``import_members`` reads, so an export can be imported elsewhere.
+
+CSV text cells that a spreadsheet would evaluate as a formula (``=``, ``+``,
+``-``, ``@``, tab or carriage return first) are prefixed with ``'``.
+"""
+import csv
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from gym_flow.accounts.models import Profile
+
+COLUMNS = ('email', 'username', 'first_name', 'last_name', 'date_of_birth', 'date_joined', 'picture_url')
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+FORMATS = {
+    'csv': 'text/csv; charset=utf-8',
+    'ndjson': 'application/x-ndjson',
+}
+
+
+def member_rows(chunk_size=None, profiles=None):
+    """Yield one tuple per member of ``profiles`` (default: all) in ``COLUMNS`` order."""
+    chunk_size = chunk_size or settings.ACCOUNTS_EXPORT_CHUNK_SIZE
+    storage = Profile._meta.get_field('profile_picture').storage
+    profiles = Profile.objects.all() if profiles is None else profiles
+    rows = (
+        profiles
+        .order_by('pk')
+        .values_list('user__email', 'username', 'first_name', 'last_name', 'date_of_birth', 'date_joined',
+                     'profile_picture')
+        .iterator(chunk_size=chunk_size)
+    )
+    for *fields, picture in rows:
+        yield (*fields, storage.url(picture) if picture else None)
+
+
+def _csv_cell(value):
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return f"'{value}"
+    return value
+
+
+class _Buffer(list):
+    def write(self, value):
+        self.append(value)
+
+
+def _csv_chunks(rows, chunk_size):
+    buffer = _Buffer()
+    writer = csv.writer(buffer)
+    writer.writerow(COLUMNS)
+    for number, row in enumerate(rows, 1):
+        writer.writerow([_csv_cell(value) for value in row])
+        if number % chunk_size == 0:
+            yield ''.join(buffer)
+            buffer.clear()
+    if buffer:
+        yield ''.join(buffer)
+
+
+def _ndjson_chunks(rows, chunk_size):
+    encoder = DjangoJSONEncoder()
+    lines = []
+    for row in rows:
+        lines.append(encoder.encode(dict(zip(COLUMNS, row))))
+        if len(lines) == chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines.clear()
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+def export_members(format='csv', chunk_size=None, profiles=None):
+    """
+    Yield the export as text chunks of ``chunk_size`` members each (the same
+    number of rows fetched per cursor round trip).
+    """
+    chunk_size = chunk_size or settings.ACCOUNTS_EXPORT_CHUNK_SIZE
+    encode = {'csv': _csv_chunks, 'ndjson': _ndjson_chunks}[format]
+    return encode(member_rows(chunk_size, profiles), chunk_size)
+
+
+async def aexport_members(format='csv', chunk_size=None, profiles=None):
+    """``export_members`` as an async iterator; each chunk is read and encoded in a worker thread."""
+    chunks = export_members(format, chunk_size, profiles)
+    next_chunk = sync_to_async(next)
+    try:
+        while (chunk := await next_chunk(chunks, None)) is not None:
+            yield chunk
+    finally:
+        # Closes the cursor in the thread that opened it.
+        await sync_to_async(chunks.close)()
@@ -20,19 +20,15 @@ class AppUserCreationForm(UserCreationForm):
 
 class ProfileEditForm(forms.ModelForm):
     class Meta:
-        model = UserModel
-        fields = '__all__'
-
-# class ProfileEditForm(forms.ModelForm):
-#     class Meta:
-#         model = Profile
-#         exclude = ('user', )
-#
-#     date_of_birth = forms.DateField(
-#         widget=forms.DateInput(attrs={'placeholder': 'YYYY-MM-DD', 'type': 'date'})
-#     )
-#
-#     def __init__(self, *args, **kwargs):
-#         super().__init__(*args, **kwargs)
-#         # Override the widget for profile_picture
-#         self.fields['profile_picture'].widget = forms.FileInput(attrs={'class': 'file-input'})
+        model = Profile
+        exclude = ('user', )
+
+    date_of_birth = forms.DateField(
+        required=False,
+        widget=forms.DateInput(attrs={'placeholder': 'YYYY-MM-DD', 'type': 'date'})
+    )
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        # Override the widget for profile_picture
+        self.fields['profile_picture'].widget = forms.FileInput(attrs={'class': 'file-input'})
@@ -0,0 +1,62 @@
+import base64
+import hashlib
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, ScryptPasswordHasher
+
+
+def scrypt_maxmem(n, r, p):
+    # OpenSSL needs 128 * r * (N + p + 2) bytes and refuses more than 32 MiB
+    # unless allowed; the extra MiB is headroom for its bookkeeping.
+    return 128 * r * (n + p + 2) + 2 ** 20
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    """
+    Scrypt with its cost parameters read from settings on every use. Hashes
+    made with other parameters are upgraded on the next successful login.
+    """
+
+    @property
+    def work_factor(self):
+        return settings.ACCOUNTS_SCRYPT_WORK_FACTOR
+
+    @property
+    def block_size(self):
+        return settings.ACCOUNTS_SCRYPT_BLOCK_SIZE
+
+    @property
+    def parallelism(self):
+        return settings.ACCOUNTS_SCRYPT_PARALLELISM
+
+    def encode(self, password, salt, n=None, r=None, p=None):
+        # As ScryptPasswordHasher.encode, but with maxmem sized for the
+        # parameters being used, which for verify() are the stored hash's.
+        self._check_encode_args(password, salt)
+        n = n or self.work_factor
+        r = r or self.block_size
+        p = p or self.parallelism
+        hash_ = hashlib.scrypt(
+            password.encode(), salt=salt.encode(), n=n, r=r, p=p, maxmem=scrypt_maxmem(n, r, p), dklen=64,
+        )
+        hash_ = base64.b64encode(hash_).decode('ascii').strip()
+        return '%s$%d$%s$%d$%d$%s' % (self.algorithm, n, salt, r, p, hash_)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with its cost parameters read from settings on every use.
+    Requires argon2-cffi.
+    """
+
+    @property
+    def time_cost(self):
+        return settings.ACCOUNTS_ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self):
+        return settings.ACCOUNTS_ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self):
+        return settings.ACCOUNTS_ARGON2_PARALLELISM
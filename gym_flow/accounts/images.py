@@ -0,0 +1,96 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connections, transaction
+from django.db.models import F
+from PIL import Image, ImageOps
+
+from gym_flow.accounts.backends import invalidate_cached_users
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def variant_name(name, size):
+    root, _ = os.path.splitext(name)
+    return f'{root}_{size}.webp'
+
+
+def generate_variants(name, storage=default_storage):
+    with storage.open(name, 'rb') as f:
+        image = ImageOps.exif_transpose(Image.open(f))
+        image.load()
+
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'A' in image.getbands() else 'RGB')
+
+    for size, max_side in settings.PROFILE_PICTURE_SIZES.items():
+        variant = image.copy()
+        variant.thumbnail((max_side, max_side))
+
+        buffer = BytesIO()
+        variant.save(buffer, format='WEBP', quality=settings.PROFILE_PICTURE_WEBP_QUALITY)
+
+        target = variant_name(name, size)
+        storage.delete(target)
+        storage.save(target, ContentFile(buffer.getvalue()))
+
+
+def record_variants(names):
+    """Mark the variants of ``names`` as generated on every profile still showing one of them."""
+    from gym_flow.accounts.models import Profile
+
+    names = list(names)
+    for start in range(0, len(names), 1000):
+        with transaction.atomic():
+            profiles = Profile.objects.filter(profile_picture__in=names[start:start + 1000]).exclude(
+                picture_variants_name=F('profile_picture'),
+            )
+            user_ids = list(profiles.select_for_update().values_list('pk', flat=True))
+            Profile.objects.filter(pk__in=user_ids).update(picture_variants_name=F('profile_picture'))
+        # update() sends no post_save, and the cached profiles still have the old value.
+        invalidate_cached_users(user_ids)
+
+
+def generate_and_record(name):
+    generate_variants(name)
+    record_variants([name])
+
+
+def _generate_in_worker(name):
+    try:
+        generate_and_record(name)
+    finally:
+        # The worker thread opened its own database connection.
+        connections.close_all()
+
+
+def variants_executor():
+    global _executor
+
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.PROFILE_PICTURE_WORKERS,
+                thread_name_prefix='profile-pictures',
+            )
+        return _executor
+
+
+def schedule_variants(name):
+    """
+    Generate the resized WebP variants of ``name`` once the current transaction
+    commits. Pillow releases the GIL while resizing and encoding, so a small
+    thread pool keeps the work off the request without a separate queue.
+    Variants lost to a worker restart are recreated by the
+    generate_picture_variants command.
+    """
+    if settings.PROFILE_PICTURE_WORKERS:
+        transaction.on_commit(lambda: variants_executor().submit(_generate_in_worker, name))
+    else:
+        transaction.on_commit(lambda: generate_and_record(name))
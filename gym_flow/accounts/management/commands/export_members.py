@@ -0,0 +1,34 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from gym_flow.accounts.export import FORMATS, export_members
+
+
+class Command(BaseCommand):
+    help = (
+        "Export every member's email and profile as CSV or NDJSON, streamed "
+        "from a server-side cursor so memory use stays flat."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='csv')
+        parser.add_argument('--output', help="File to write; defaults to stdout.")
+        parser.add_argument(
+            '--chunk-size', type=int, default=None,
+            help=f"Members per cursor fetch. Defaults to ACCOUNTS_EXPORT_CHUNK_SIZE ({settings.ACCOUNTS_EXPORT_CHUNK_SIZE}).",
+        )
+
+    def handle(self, *args, format, output, chunk_size, **options):
+        if chunk_size is not None and chunk_size < 1:
+            raise CommandError("--chunk-size must be positive.")
+
+        chunks = export_members(format, chunk_size)
+        if output is None:
+            for chunk in chunks:
+                self.stdout.write(chunk, ending='')
+            return
+
+        with open(output, 'w', newline='', encoding='utf-8') as f:
+            for chunk in chunks:
+                f.write(chunk)
+        self.stdout.write(self.style.SUCCESS(f"Exported members to {output}."))
@@ -0,0 +1,51 @@
+import os
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from django.core.management.base import BaseCommand
+from django.db.models import F
+
+from gym_flow.accounts.images import generate_variants, record_variants
+from gym_flow.accounts.models import Profile
+
+
+class Command(BaseCommand):
+    help = "Generate the resized WebP variants of existing profile pictures."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help="Regenerate variants that already exist.")
+        parser.add_argument('--workers', type=int, default=os.cpu_count())
+
+    def handle(self, *args, force, workers, **options):
+        profiles = (
+            Profile.objects
+            .exclude(profile_picture='')
+            .exclude(profile_picture__isnull=True)
+            .only('pk', 'profile_picture')
+        )
+        if not force:
+            profiles = profiles.exclude(picture_variants_name=F('profile_picture'))
+
+        futures = {}
+        seen = set()
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for profile in profiles.iterator(chunk_size=2000):
+                picture = profile.profile_picture
+                if picture.name in seen:
+                    # Profiles with the same picture share one stored file.
+                    continue
+                seen.add(picture.name)
+                futures[executor.submit(generate_variants, picture.name, picture.storage)] = picture.name
+
+            done, _ = wait(futures)
+
+        failed = 0
+        generated = []
+        for future in done:
+            if future.exception() is not None:
+                failed += 1
+                self.stderr.write(f"{futures[future]}: {future.exception()}")
+            else:
+                generated.append(futures[future])
+        record_variants(generated)
+
+        self.stdout.write(self.style.SUCCESS(f"Generated variants for {len(futures) - failed} pictures ({failed} failed)."))
@@ -0,0 +1,125 @@
+import csv
+import json
+import time
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from gym_flow.accounts.managers import password_hashing_pool
+
+UserModel = get_user_model()
+
+PROFILE_FIELDS = ('username', 'first_name', 'last_name', 'date_of_birth')
+
+
+def read_csv(path):
+    with open(path, newline='', encoding='utf-8') as f:
+        yield from csv.DictReader(f)
+
+
+def read_jsonl(path):
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+READERS = {
+    'csv': read_csv,
+    'jsonl': read_jsonl,
+}
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        "Import members from a CSV or JSONL file, creating AppUser and Profile "
+        "rows in batches. Each batch is committed on its own, so a failed run "
+        "can be resumed with --start-at."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--format', choices=READERS, help="Defaults to the file extension.")
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--start-at', type=int, default=0,
+            help="Number of leading rows to skip, e.g. the row count reported before a failed batch.",
+        )
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help="Password hashing processes. Defaults to the number of CPUs.",
+        )
+
+    def handle(self, *args, path, format, batch_size, start_at, workers, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+        if not path.exists():
+            raise CommandError(f"{path} does not exist.")
+
+        format = format or path.suffix.lstrip('.').lower()
+        if format not in READERS:
+            raise CommandError(f"Cannot infer the format of {path}; pass --format.")
+
+        rows = islice(READERS[format](path), start_at, None)
+        processed = start_at
+        created = skipped = 0
+        started = time.perf_counter()
+
+        with password_hashing_pool(workers) as executor:
+            for batch in batched(rows, batch_size):
+                try:
+                    batch_created = self.import_batch(batch, executor)
+                except Exception as exc:
+                    raise CommandError(
+                        f"Batch starting at row {processed} failed: {exc}. "
+                        f"Rows before it are committed; resume with --start-at {processed}."
+                    ) from exc
+
+                processed += len(batch)
+                created += batch_created
+                skipped += len(batch) - batch_created
+                elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{processed} rows processed, {created} created, {skipped} skipped "
+                    f"({(processed - start_at) / elapsed:.0f} rows/s)"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Imported {created} members ({skipped} skipped) in {time.perf_counter() - started:.1f}s."
+        ))
+
+    @transaction.atomic
+    def import_batch(self, batch, executor):
+        members = {}
+        for row in batch:
+            email = UserModel.objects.normalize_email((row.get('email') or '').strip())
+            if email and email not in members:
+                members[email] = row
+
+        existing = set(UserModel.objects.filter(email__in=members).values_list('email', flat=True))
+        for email in existing:
+            del members[email]
+
+        UserModel.objects.create_users(
+            (
+                {
+                    'email': email,
+                    'password': row.get('password') or None,
+                    'profile': {field: row.get(field) or None for field in PROFILE_FIELDS},
+                }
+                for email, row in members.items()
+            ),
+            batch_size=len(batch),
+            executor=executor,
+        )
+        return len(members)
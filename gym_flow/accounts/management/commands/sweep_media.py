@@ -0,0 +1,79 @@
+import posixpath
+from datetime import timedelta
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from gym_flow.accounts.images import variant_name
+from gym_flow.accounts.models import Profile
+
+
+def walk(storage, directory):
+    directories, files = storage.listdir(directory)
+    for name in files:
+        yield posixpath.join(directory, name)
+    for name in directories:
+        yield from walk(storage, posixpath.join(directory, name))
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete profile pictures and picture variants that no profile references. "
+        "Pictures are shared between profiles by content, so they are only removed here."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--min-age', type=int, default=3600,
+            help="Keep files modified in the last this many seconds, e.g. uploads not committed yet.",
+        )
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--dry-run', action='store_true', help="Only report what would be deleted.")
+
+    def handle(self, *args, min_age, batch_size, dry_run, **options):
+        if batch_size < 1:
+            raise CommandError("--batch-size must be positive.")
+
+        field = Profile._meta.get_field('profile_picture')
+        storage = field.storage
+        if not storage.exists(field.upload_to):
+            self.stdout.write("No pictures stored.")
+            return
+
+        # Read the references before listing files: a file saved after this
+        # point is younger than --min-age, and a deduplicated save refreshes
+        # the existing file's modification time.
+        referenced = set()
+        names = (
+            Profile.objects.exclude(profile_picture='').exclude(profile_picture__isnull=True)
+            .values_list('profile_picture', flat=True)
+        )
+        for name in names.iterator(chunk_size=5000):
+            referenced.add(name)
+            referenced.update(variant_name(name, size) for size in settings.PROFILE_PICTURE_SIZES)
+
+        cutoff = timezone.now() - timedelta(seconds=min_age)
+        scanned = deleted = freed = 0
+
+        def orphans():
+            nonlocal scanned
+            for name in walk(storage, field.upload_to):
+                scanned += 1
+                if name not in referenced and storage.get_modified_time(name) < cutoff:
+                    yield name
+
+        pending = orphans()
+        while batch := list(islice(pending, batch_size)):
+            for name in batch:
+                freed += storage.size(name)
+                if not dry_run:
+                    storage.delete(name)
+            deleted += len(batch)
+            self.stdout.write(f"{deleted} unreferenced files {'found' if dry_run else 'deleted'}, {scanned} scanned")
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {deleted} of {scanned} files ({freed / 2**20:.1f} MB)."
+        ))
@@ -1,5 +1,25 @@
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from itertools import islice
+
+import django
 from django.contrib.auth.base_user import BaseUserManager
 from django.contrib.auth.hashers import make_password
+from django.db import transaction
+
+
+def _init_hashing_worker():
+    # Spawned workers start without a configured Django; forked ones are a no-op.
+    django.setup()
+
+
+def password_hashing_pool(workers=None):
+    if multiprocessing.current_process().daemon:
+        # Daemonic processes (parallel test workers, prefork task workers)
+        # cannot start children; the hashers release the GIL anyway.
+        return ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count(), initializer=_init_hashing_worker)
 
 
 class AppUserManager(BaseUserManager):
@@ -30,3 +50,64 @@ class AppUserManager(BaseUserManager):
             raise ValueError("Superuser must have is_superuser=True.")
 
         return self._create_user(email, password, **extra_fields)
+
+    def create_users(self, users, batch_size=1000, executor=None):
+        """
+        Bulk-create users and their profiles from an iterable of dicts with an
+        ``email``, an optional ``password`` and an optional ``profile`` dict of
+        Profile fields; any other keys are AppUser fields.
+
+        Passwords are hashed in ``executor`` (a process pool across all cores
+        by default). A missing or ``None`` password stores an unusable one,
+        which skips hashing entirely; use it for imported accounts that must
+        reset their password.
+
+        post_save is not sent, so profiles are created here rather than by the
+        create_profile signal.
+        """
+        users = iter(users)
+        owns_executor = executor is None
+        created = []
+
+        try:
+            while batch := list(islice(users, batch_size)):
+                to_hash = [data['password'] for data in batch if data.get('password') is not None]
+                hashes = []
+                if to_hash:
+                    if executor is None:
+                        executor = password_hashing_pool()
+                    hashes = executor.map(make_password, to_hash, chunksize=max(1, len(to_hash) // 64))
+                created.extend(self._bulk_insert(batch, iter(hashes)))
+        finally:
+            if owns_executor and executor is not None:
+                executor.shutdown()
+
+        return created
+
+    @transaction.atomic
+    def _bulk_insert(self, batch, hashes):
+        profile_model = self.model._meta.get_field('profile').related_model
+
+        users, profiles = [], []
+        for data in batch:
+            data = dict(data)
+            email = data.pop('email', None)
+            if not email:
+                raise ValueError("The given email must be set")
+            password = data.pop('password', None)
+            profiles.append(data.pop('profile', None) or {})
+
+            user = self.model(email=self.normalize_email(email), **data)
+            user.password = next(hashes) if password is not None else make_password(None)
+            users.append(user)
+
+        self.bulk_create(users)
+        if any(user.pk is None for user in users):
+            ids = dict(self.filter(email__in=[user.email for user in users]).values_list('email', 'pk'))
+            for user in users:
+                user.pk = ids[user.email]
+
+        profile_model._default_manager.bulk_create(
+            profile_model(user=user, **profile) for user, profile in zip(users, profiles)
+        )
+        return users
@@ -0,0 +1,18 @@
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from gym_flow.accounts.backends import HashingBusy
+
+
+class HashingBusyMiddleware(MiddlewareMixin):
+    """
+    Answers HashingBusy from any view that authenticates, such as the admin
+    login, with a retryable 503 instead of a server error.
+    """
+
+    def process_exception(self, request, exception):
+        if isinstance(exception, HashingBusy):
+            return HttpResponse(
+                f'We are handling a lot of logins. Please try again in {exception.retry_after} seconds.',
+                content_type='text/plain', status=503, headers={'Retry-After': str(exception.retry_after)},
+            )
@@ -0,0 +1,53 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:04
+
+import django.db.models.functions.comparison
+import django.db.models.functions.text
+from django.contrib.postgres.indexes import GinIndex, OpClass
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+from django.db.models.functions import Cast, Upper
+
+
+def search_key(field):
+    return Upper(Cast(field, models.TextField()))
+
+
+# PostgreSQL-only indexes for gym_flow.accounts.search. They are kept out of
+# the models' Meta (and so out of migration state) because SQLite rebuilds
+# tables from Meta.indexes and cannot create them.
+POSTGRES_INDEXES = [
+    ('profile', GinIndex(OpClass(search_key('username'), name='gin_trgm_ops'), name='profile_username_trgm_idx')),
+    ('profile', GinIndex(OpClass(search_key('first_name'), name='gin_trgm_ops'), name='profile_first_name_trgm_idx')),
+    ('profile', GinIndex(OpClass(search_key('last_name'), name='gin_trgm_ops'), name='profile_last_name_trgm_idx')),
+    ('appuser', models.Index(OpClass(search_key('email'), name='text_pattern_ops'), name='appuser_email_prefix_idx')),
+]
+
+
+def add_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in POSTGRES_INDEXES:
+        schema_editor.add_index(apps.get_model('accounts', model_name), index)
+
+
+def remove_postgres_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name, index in POSTGRES_INDEXES:
+        schema_editor.remove_index(apps.get_model('accounts', model_name), index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.RunPython(add_postgres_indexes, remove_postgres_indexes),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(django.db.models.functions.text.Lower(django.db.models.functions.comparison.Coalesce('last_name', models.Value(''))), django.db.models.functions.text.Lower(django.db.models.functions.comparison.Coalesce('first_name', models.Value(''))), models.F('user'), name='profile_directory_idx'),
+        ),
+    ]
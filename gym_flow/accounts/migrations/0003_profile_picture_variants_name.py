@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0002_member_search_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='picture_variants_name',
+            field=models.CharField(blank=True, default='', editable=False, max_length=100),
+        ),
+    ]
@@ -1,9 +1,17 @@
 from django.contrib.auth import get_user_model
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce, Lower
+
+from gym_flow.accounts.images import variant_name
 
 UserModel = get_user_model()
 
 
+def sort_key(field):
+    return Lower(Coalesce(field, Value('')))
+
+
 class Profile(models.Model):
     user = models.OneToOneField(
         to=UserModel,
@@ -39,6 +47,34 @@ class Profile(models.Model):
         blank=True,
         null=True,
     )
+    # The picture whose resized variants have been generated; set by
+    # gym_flow.accounts.images.record_variants.
+    picture_variants_name = models.CharField(
+        max_length=100,
+        blank=True,
+        default='',
+        editable=False,
+    )
+
+    class Meta:
+        indexes = [
+            # Member directory order; see gym_flow.accounts.search.
+            models.Index(sort_key('last_name'), sort_key('first_name'), F('user'), name='profile_directory_idx'),
+        ]
 
     def __str__(self):
         return self.username or self.user.email
+
+    def picture_url(self, size=None):
+        """
+        URL of the ``size`` variant from ``PROFILE_PICTURE_SIZES``, falling
+        back to the original upload until the variants of the current picture
+        have been generated. Never touches the storage.
+        """
+        if not self.profile_picture:
+            return None
+
+        if size is not None and self.picture_variants_name == self.profile_picture.name:
+            return self.profile_picture.storage.url(variant_name(self.profile_picture.name, size))
+
+        return self.profile_picture.url
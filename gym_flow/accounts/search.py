@@ -0,0 +1,103 @@
+"""
+Member directory search.
+
+Members are matched on username, first name, last name and email, by prefix
+and, on PostgreSQL, by pg_trgm word similarity so that typos still match.
+Other databases fall back to a case-insensitive substring match. Results are
+ordered by name and paginated by keyset: the cursor carries the sort key of
+the last row, so every page is an index range scan instead of an OFFSET.
+"""
+from django.conf import settings
+from django.core import signing
+from django.db import connection
+from django.db.models import Q, TextField
+from django.db.models.functions import Cast, Upper
+
+from gym_flow.accounts.models import AppUser, Profile
+from gym_flow.accounts.models.app_profile import sort_key
+
+PROFILE_SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+CURSOR_SALT = 'gym_flow.accounts.search'
+
+
+def search_key(field):
+    # Matches both the expression Django's istartswith lookup compiles to on
+    # PostgreSQL and the trigram indexes in migration 0002.
+    return Upper(Cast(field, TextField()))
+
+
+def directory():
+    return (
+        Profile.objects
+        .select_related('user')
+        .annotate(sort_last_name=sort_key('last_name'), sort_first_name=sort_key('first_name'))
+        .order_by('sort_last_name', 'sort_first_name', 'pk')
+    )
+
+
+def search_profiles(term, queryset=None):
+    queryset = directory() if queryset is None else queryset
+    term = ' '.join(term.split())
+    if not term:
+        return queryset
+
+    # The profile and user tables are searched separately and the matching
+    # pks combined with UNION: ORing predicates on both sides of the join
+    # would leave PostgreSQL no index to use on either.
+    return queryset.filter(pk__in=_profile_matches(term).union(_email_matches(term)))
+
+
+def _profile_matches(term):
+    profiles = Profile.objects.all()
+    matches = Q()
+    for field in PROFILE_SEARCH_FIELDS:
+        matches |= Q(**{f'{field}__istartswith': term})
+
+    if len(term) >= settings.ACCOUNTS_MEMBER_SEARCH_TRIGRAM_MIN_LENGTH:
+        if connection.vendor == 'postgresql':
+            profiles = profiles.alias(**{f'search_{field}': search_key(field) for field in PROFILE_SEARCH_FIELDS})
+            for field in PROFILE_SEARCH_FIELDS:
+                matches |= Q(**{f'search_{field}__trigram_word_similar': term})
+        else:
+            for field in PROFILE_SEARCH_FIELDS:
+                matches |= Q(**{f'{field}__icontains': term})
+
+    return profiles.filter(matches).values('pk')
+
+
+def _email_matches(term):
+    # A profile's pk is its user's pk, so this needs no join.
+    matches = Q(email__istartswith=term)
+    if connection.vendor != 'postgresql' and len(term) >= settings.ACCOUNTS_MEMBER_SEARCH_TRIGRAM_MIN_LENGTH:
+        matches |= Q(email__icontains=term)
+    return AppUser.objects.filter(matches).values('pk')
+
+
+def encode_cursor(profile):
+    return signing.dumps([profile.sort_last_name, profile.sort_first_name, profile.pk], salt=CURSOR_SALT, compress=True)
+
+
+def decode_cursor(cursor):
+    """Raise ``signing.BadSignature`` for a cursor this module did not issue."""
+    return signing.loads(cursor, salt=CURSOR_SALT)
+
+
+def paginate(queryset, cursor=None, limit=None):
+    """
+    Return ``(rows, next_cursor)`` for the page after ``cursor`` of a
+    queryset from ``directory()``; ``next_cursor`` is None on the last page.
+    """
+    limit = limit or settings.ACCOUNTS_MEMBER_SEARCH_PAGE_SIZE
+    if cursor:
+        last_name, first_name, pk = decode_cursor(cursor)
+        queryset = queryset.filter(
+            Q(sort_last_name__gt=last_name)
+            | Q(sort_last_name=last_name, sort_first_name__gt=first_name)
+            | Q(sort_last_name=last_name, sort_first_name=first_name, pk__gt=pk)
+        )
+
+    rows = list(queryset[:limit + 1])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
@@ -1,7 +1,9 @@
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 
+from gym_flow.accounts.backends import invalidate_cached_user
 from gym_flow.accounts.models import Profile
 
 UserModel = get_user_model()
@@ -11,4 +13,22 @@ UserModel = get_user_model()
 def create_profile(sender, instance, created, **kwargs):
     if created:
         Profile.objects.create(user=instance)
-        
\ No newline at end of file
+
+
+def invalidate_now_and_on_commit(user_id):
+    # Until the transaction commits, other requests still read the old row
+    # and may cache it again, so the entry is dropped once more afterwards.
+    invalidate_cached_user(user_id)
+    transaction.on_commit(lambda: invalidate_cached_user(user_id))
+
+
+@receiver(post_save, sender=UserModel)
+@receiver(post_delete, sender=UserModel)
+def invalidate_user_cache(sender, instance, **kwargs):
+    invalidate_now_and_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_delete, sender=Profile)
+def invalidate_profile_cache(sender, instance, **kwargs):
+    invalidate_now_and_on_commit(instance.pk)
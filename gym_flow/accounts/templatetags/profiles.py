@@ -0,0 +1,8 @@
+from django import template
+
+register = template.Library()
+
+
+@register.filter
+def picture_url(profile, size=None):
+    return profile.picture_url(size) or ''
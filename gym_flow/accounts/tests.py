@@ -1,14 +1,50 @@
-from django.contrib.auth import get_user_model
+import asyncio
+import csv
+import hashlib
+import json
+import os
+import struct
+import time
+import tempfile
+import threading
+import zlib
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth.hashers import check_password, get_hasher, make_password
+from django.core.cache import cache
+from django.core.files.base import ContentFile
 from django.core.files.uploadedfile import SimpleUploadedFile
-from django.test import TestCase, Client
+from django.core.management import call_command, CommandError
+from django.db import connection
+from django.test import TestCase, Client, AsyncClient, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
+from PIL import Image
+
+from gym_flow.accounts.backends import HashingBusy, hashing_slots, user_cache_key
+from gym_flow.accounts.export import COLUMNS, export_members
+from gym_flow.accounts.factories import PASSWORD, create_member, create_members
+from gym_flow.accounts.images import generate_and_record, variant_name
+from gym_flow.accounts.throttling import check
+from gym_flow.accounts.uploadhandlers import ProfilePictureUploadHandler
+from gym_flow.accounts.views import ProfileEditView
+from gym_flow.accounts.models import Profile
 from gym_flow.accounts.forms import AppUserCreationForm
+from gym_flow.settings import base
 
 UserModel = get_user_model()
 
 
 # Authentication Tests
 class AuthTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = create_member(email='member@example.com')
+
     def setUp(self):
         self.client = Client()
         self.register_url = reverse('register')
@@ -30,10 +66,9 @@ class AuthTests(TestCase):
         self.assertTrue('_auth_user_id' in self.client.session)
 
     def test_login_user_success(self):
-        UserModel.objects.create_user(email='testuser@example.com', password='testpassword123')
         login_data = {
-            'username': 'testuser@example.com',
-            'password': 'testpassword123',
+            'username': 'member@example.com',
+            'password': PASSWORD,
         }
         response = self.client.post(self.login_url, login_data)
         self.assertEqual(response.status_code, 302)
@@ -41,8 +76,7 @@ class AuthTests(TestCase):
         self.assertTrue('_auth_user_id' in self.client.session)
 
     def test_logout_user_success(self):
-        UserModel.objects.create_user(email='testuser@example.com', password='testpassword123')
-        self.client.login(email='testuser@example.com', password='testpassword123')
+        self.client.force_login(self.member)
         response = self.client.post(self.logout_url)
         self.assertEqual(response.status_code, 302)
         self.assertRedirects(response, self.home_url)
@@ -51,6 +85,10 @@ class AuthTests(TestCase):
 
 # View Tests
 class ViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = create_member(email='member@example.com')
+
     def setUp(self):
         self.client = Client()
         self.register_url = reverse('register')
@@ -98,10 +136,9 @@ class ViewTests(TestCase):
         self.assertContains(response, 'Login')
 
     def test_login_view_post_valid(self):
-        UserModel.objects.create_user(email='testuser@example.com', password='testpassword123')
         login_data = {
-            'username': 'testuser@example.com',
-            'password': 'testpassword123',
+            'username': 'member@example.com',
+            'password': PASSWORD,
         }
         response = self.client.post(self.login_url, login_data)
         self.assertEqual(response.status_code, 302)
@@ -109,20 +146,18 @@ class ViewTests(TestCase):
         self.assertTrue(self.client.session.get('_auth_user_id'))
 
     def test_login_view_post_invalid(self):
-        UserModel.objects.create_user(email='testuser@example.com', password='testpassword123')
         invalid_data = {
-            'username': 'testuser@example.com',
+            'username': 'member@example.com',
             'password': 'wrongpassword',
         }
         response = self.client.post(self.login_url, invalid_data)
         self.assertEqual(response.status_code, 200)
         self.assertTemplateUsed(response, 'accounts/login.html')
-        self.assertContains(response, 'testuser@example.com')  # Check that the form re-renders with username
+        self.assertContains(response, 'member@example.com')  # Check that the form re-renders with username
         self.assertFalse(self.client.session.get('_auth_user_id'))
 
     def test_logout_view_post(self):
-        UserModel.objects.create_user(email='testuser@example.com', password='testpassword123')
-        self.client.login(email='testuser@example.com', password='testpassword123')
+        self.client.force_login(self.member)
         response = self.client.post(self.logout_url)
         self.assertEqual(response.status_code, 302)
         self.assertRedirects(response, self.home_url)
@@ -201,8 +236,11 @@ class UserModelTests(TestCase):
 
 
 class ProfileModelTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_member(email='testuser1@example.com')
+
     def setUp(self):
-        self.user = UserModel.objects.create_user(email='testuser1@example.com', password='testpassword123')
         self.profile = self.user.profile
 
     def test_profile_creation(self):
@@ -240,3 +278,844 @@ class ProfileModelTests(TestCase):
         self.assertFalse(self.profile.last_name)
         self.assertFalse(self.profile.date_of_birth)
         self.assertFalse(self.profile.profile_picture)
+
+
+class ProfileLoadingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_member()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.home_url = reverse('home')
+
+    def test_home_page_cold_cache_loads_user_and_profile_together(self):
+        # The session is read from the cache; AppUser and Profile come from one joined query.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.home_url)
+        self.assertEqual(response.context['user_profile'], self.user.profile)
+
+    def test_home_page_warm_cache_makes_no_queries(self):
+        self.client.get(self.home_url)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.home_url)
+        self.assertTemplateUsed(response, 'common/index.html')
+        self.assertContains(response, 'You are logged in.')
+
+    def test_profile_save_invalidates_cached_user(self):
+        self.client.get(self.home_url)
+        profile = self.user.profile
+        profile.username = 'renamed'
+        profile.save()
+        response = self.client.get(self.home_url)
+        self.assertEqual(response.context['user_profile'].username, 'renamed')
+
+    def test_user_cached_before_commit_is_invalidated_after_it(self):
+        key = user_cache_key(self.user.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            profile = self.user.profile
+            profile.username = 'renamed'
+            profile.save()
+            # A concurrent request still sees the committed row and caches it.
+            cache.set(key, self.user)
+
+        self.assertIsNone(cache.get(key))
+
+
+class ImportMembersCommandTests(TestCase):
+    def write_file(self, name, content):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = Path(tmp_dir.name) / name
+        path.write_text(content, encoding='utf-8')
+        return path
+
+    def test_import_csv_creates_users_and_profiles_in_batches(self):
+        path = self.write_file(
+            'members.csv',
+            'email,first_name,last_name,date_of_birth\n'
+            'one@example.com,Ann,One,1990-01-01\n'
+            'two@example.com,Bob,Two,\n'
+            'three@example.com,Cid,Three,\n',
+        )
+        out = StringIO()
+        call_command('import_members', path, batch_size=2, stdout=out)
+
+        self.assertEqual(UserModel.objects.count(), 3)
+        user = UserModel.objects.get(email='one@example.com')
+        self.assertEqual(user.profile.first_name, 'Ann')
+        self.assertEqual(str(user.profile.date_of_birth), '1990-01-01')
+        self.assertFalse(user.has_usable_password())
+        self.assertIn('3 rows processed', out.getvalue())
+
+    def test_import_jsonl_skips_existing_and_duplicate_emails(self):
+        UserModel.objects.create_user(email='one@example.com', password='testpassword123')
+        path = self.write_file(
+            'members.jsonl',
+            '{"email": "one@example.com"}\n'
+            '{"email": "two@example.com", "password": "testpassword123"}\n'
+            '{"email": "two@example.com"}\n',
+        )
+        call_command('import_members', path, stdout=StringIO())
+
+        self.assertEqual(UserModel.objects.count(), 2)
+        self.assertTrue(UserModel.objects.get(email='two@example.com').check_password('testpassword123'))
+
+    def test_import_resumes_from_start_at(self):
+        path = self.write_file('members.csv', 'email\none@example.com\ntwo@example.com\n')
+        call_command('import_members', path, start_at=1, stdout=StringIO())
+
+        self.assertQuerySetEqual(UserModel.objects.values_list('email', flat=True), ['two@example.com'])
+
+    def test_import_reports_resume_row_on_failure(self):
+        path = self.write_file('members.csv', 'email,date_of_birth\none@example.com,\ntwo@example.com,not-a-date\n')
+        with self.assertRaisesMessage(CommandError, 'resume with --start-at 1'):
+            call_command('import_members', path, batch_size=1, stdout=StringIO())
+
+        self.assertQuerySetEqual(UserModel.objects.values_list('email', flat=True), ['one@example.com'])
+
+
+class BulkCreateUsersTests(TestCase):
+    def test_create_users_hashes_passwords_and_creates_profiles(self):
+        users = UserModel.objects.create_users(
+            [
+                {'email': 'one@EXAMPLE.com', 'password': 'testpassword123', 'profile': {'first_name': 'Ann'}},
+                {'email': 'two@example.com', 'is_staff': True},
+            ],
+            batch_size=1,
+        )
+
+        self.assertEqual([user.email for user in users], ['one@example.com', 'two@example.com'])
+        one = UserModel.objects.get(email='one@example.com')
+        self.assertTrue(one.check_password('testpassword123'))
+        self.assertEqual(one.profile.first_name, 'Ann')
+        two = UserModel.objects.get(email='two@example.com')
+        self.assertFalse(two.has_usable_password())
+        self.assertTrue(two.is_staff)
+        self.assertTrue(two.profile)
+
+    def test_create_users_requires_email(self):
+        with self.assertRaisesMessage(ValueError, 'The given email must be set'):
+            UserModel.objects.create_users([{'password': None}])
+
+
+@override_settings(PASSWORD_HASHERS=base.PASSWORD_HASHERS)
+class LoginHashingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = UserModel.objects.create_user(email='testuser@example.com', password='testpassword123')
+
+    def test_new_passwords_use_scrypt(self):
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+
+    def test_login_upgrades_legacy_hash(self):
+        self.user.password = make_password('testpassword123', hasher='pbkdf2_sha256')
+        self.user.save()
+
+        response = self.client.post(reverse('login'), {
+            'username': 'testuser@example.com',
+            'password': 'testpassword123',
+        })
+
+        self.assertRedirects(response, reverse('home'))
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.password.startswith('scrypt$'))
+
+    @override_settings(ACCOUNTS_HASH_QUEUE_TIMEOUT=0)
+    def test_login_is_retryable_when_no_hashing_slot_is_free(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch('gym_flow.accounts.backends.hashing_slots', return_value=slots):
+            with self.assertRaises(HashingBusy):
+                authenticate(email='testuser@example.com', password='testpassword123')
+            response = self.client.post(reverse('login'), {
+                'username': 'testuser@example.com',
+                'password': 'testpassword123',
+            })
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+        self.assertContains(response, 'We are handling a lot of logins', status_code=503)
+        self.assertEqual(authenticate(email='testuser@example.com', password='testpassword123'), self.user)
+
+    @override_settings(ACCOUNTS_HASH_QUEUE_TIMEOUT=0)
+    def test_admin_login_is_retryable_when_no_hashing_slot_is_free(self):
+        slots = threading.BoundedSemaphore(1)
+        slots.acquire()
+        with mock.patch('gym_flow.accounts.backends.hashing_slots', return_value=slots):
+            response = self.client.post(reverse('admin:login'), {
+                'username': 'testuser@example.com',
+                'password': 'testpassword123',
+            })
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response['Retry-After'], '5')
+
+    def test_hashing_slots_follow_settings(self):
+        with override_settings(ACCOUNTS_MAX_CONCURRENT_HASHES=1):
+            slots = hashing_slots()
+            self.assertIs(hashing_slots(), slots)
+            self.assertTrue(slots.acquire(timeout=0))
+            self.assertFalse(slots.acquire(timeout=0))
+            slots.release()
+
+        with override_settings(ACCOUNTS_MAX_CONCURRENT_HASHES=2):
+            slots = hashing_slots()
+            self.assertTrue(slots.acquire(timeout=0))
+            self.assertTrue(slots.acquire(timeout=0))
+            slots.release()
+            slots.release()
+
+    def test_hash_with_larger_work_factor_than_settings_verifies(self):
+        with override_settings(ACCOUNTS_SCRYPT_WORK_FACTOR=2 ** 16):
+            encoded = make_password('testpassword123')
+
+        self.assertTrue(check_password('testpassword123', encoded))
+
+    def test_hasher_parameters_follow_settings(self):
+        with override_settings(ACCOUNTS_SCRYPT_WORK_FACTOR=2 ** 10, ACCOUNTS_SCRYPT_PARALLELISM=2):
+            encoded = make_password('testpassword123')
+            self.assertTrue(encoded.startswith('scrypt$1024$'))
+            self.assertEqual(encoded.split('$')[4], '2')
+            self.assertTrue(check_password('testpassword123', encoded))
+
+        self.assertTrue(get_hasher().must_update(encoded))
+
+
+def make_image_file(name='photo.png', size=(800, 600), format='PNG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'orange').save(buffer, format=format)
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type=f'image/{format.lower()}')
+
+
+class ProfilePictureTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_member()
+
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name, PROFILE_PICTURE_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client.force_login(self.user)
+
+    def test_upload_saves_original_once_and_generates_variants(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('profile-edit', kwargs={'pk': self.user.pk}),
+                {'username': 'tester', 'profile_picture': make_image_file()},
+            )
+        self.assertRedirects(response, reverse('profile-details', kwargs={'pk': self.user.pk}))
+
+        profile = UserModel.objects.get(pk=self.user.pk).profile
+        self.assertEqual(profile.username, 'tester')
+        for size, max_side in {'thumbnail': 64, 'small': 160, 'medium': 480}.items():
+            self.assertTrue(profile.picture_url(size).endswith(f'_{size}.webp'))
+            with profile.profile_picture.storage.open(variant_name(profile.profile_picture.name, size)) as f:
+                image = Image.open(f)
+                self.assertEqual(image.format, 'WEBP')
+                self.assertEqual(max(image.size), max_side)
+
+    def test_picture_url_falls_back_to_original(self):
+        profile = self.user.profile
+        self.assertIsNone(profile.picture_url('small'))
+
+        profile.profile_picture = make_image_file()
+        profile.save()
+        self.assertEqual(profile.picture_url('small'), profile.profile_picture.url)
+
+    def test_generate_picture_variants_backfills_existing_pictures(self):
+        profile = self.user.profile
+        profile.profile_picture = make_image_file()
+        profile.save()
+
+        out = StringIO()
+        call_command('generate_picture_variants', stdout=out)
+        profile.refresh_from_db()
+
+        self.assertTrue(profile.picture_url('thumbnail').endswith('_thumbnail.webp'))
+        self.assertIn('Generated variants for 1 pictures (0 failed)', out.getvalue())
+
+        call_command('generate_picture_variants', stdout=out)
+        self.assertIn('Generated variants for 0 pictures (0 failed)', out.getvalue())
+
+    def test_cached_profile_sees_generated_variants(self):
+        edit_url = reverse('profile-edit', kwargs={'pk': self.user.pk})
+        with self.captureOnCommitCallbacks(execute=True), mock.patch('gym_flow.accounts.views.schedule_variants'):
+            self.client.post(edit_url, {'username': 'tester', 'profile_picture': make_image_file()})
+        # The request after the upload caches the profile before the variants exist.
+        self.assertNotIn('_medium.webp', self.client.get(edit_url).content.decode())
+
+        generate_and_record(Profile.objects.get(pk=self.user.pk).profile_picture.name)
+
+        self.assertIn('_medium.webp', self.client.get(edit_url).content.decode())
+
+    def test_picture_url_does_not_touch_storage(self):
+        profile = self.user.profile
+        profile.profile_picture = make_image_file()
+        profile.save()
+        generate_and_record(profile.profile_picture.name)
+        profile.refresh_from_db()
+
+        with mock.patch('django.core.files.storage.FileSystemStorage.exists') as exists:
+            variant = profile.picture_url('small')
+            profile.profile_picture = 'profile_pictures/replaced.png'
+            original = profile.picture_url('small')
+
+        exists.assert_not_called()
+        self.assertTrue(variant.endswith('_small.webp'))
+        self.assertEqual(original, profile.profile_picture.url)
+
+
+class ProfilePictureUploadHandlerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_member()
+
+    def setUp(self):
+        self.media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(self.media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root.name, PROFILE_PICTURE_WORKERS=0)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.client.force_login(self.user)
+        self.edit_url = reverse('profile-edit', kwargs={'pk': self.user.pk})
+
+    def uploaded_files(self):
+        root = Path(self.media_root.name, 'profile_pictures')
+        return sorted(str(p.relative_to(root)) for p in root.rglob('*') if p.is_file())
+
+    def test_valid_upload_is_moved_into_place(self):
+        upload = make_image_file('photo.PNG')
+        digest = hashlib.sha256(upload.read()).hexdigest()
+        upload.seek(0)
+        response = self.client.post(self.edit_url, {'username': 'tester', 'profile_picture': upload})
+
+        self.assertEqual(response.status_code, 302)
+        self.user.profile.refresh_from_db()
+        self.assertEqual(self.user.profile.profile_picture.name, f'profile_pictures/{digest[:2]}/{digest}.png')
+        self.assertEqual(self.uploaded_files(), [f'{digest[:2]}/{digest}.png'])
+
+    def test_identical_uploads_share_one_file(self):
+        other = create_member()
+        self.client.post(self.edit_url, {'username': 'tester', 'profile_picture': make_image_file('one.png')})
+        self.client.force_login(other)
+        self.client.post(
+            reverse('profile-edit', kwargs={'pk': other.pk}),
+            {'username': 'other', 'profile_picture': make_image_file('two.png')},
+        )
+
+        self.assertEqual(len(self.uploaded_files()), 1)
+        self.assertEqual(
+            Profile.objects.get(pk=self.user.pk).profile_picture.name,
+            Profile.objects.get(pk=other.pk).profile_picture.name,
+        )
+
+    @override_settings(PROFILE_PICTURE_MAX_UPLOAD_SIZE=1024)
+    def test_oversized_upload_is_rejected(self):
+        response = self.client.post(self.edit_url, {'username': 'tester', 'profile_picture': make_image_file('photo.bmp', format='BMP')})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'profile_picture', 'The file is larger than 1.0\xa0KB.')
+        self.assertEqual(self.uploaded_files(), [])
+
+    @override_settings(PROFILE_PICTURE_MAX_PIXELS=100 * 100)
+    def test_upload_over_pixel_limit_is_rejected(self):
+        response = self.client.post(self.edit_url, {'username': 'tester', 'profile_picture': make_image_file()})
+
+        self.assertFormError(response.context['form'], 'profile_picture', 'The image is 800x600 pixels, which is too large.')
+        self.assertFalse(UserModel.objects.get(pk=self.user.pk).profile.profile_picture)
+
+    def test_unsupported_format_is_rejected(self):
+        response = self.client.post(self.edit_url, {'username': 'tester', 'profile_picture': make_image_file('photo.bmp', format='BMP')})
+
+        self.assertFormError(response.context['form'], 'profile_picture', 'BMP images are not supported.')
+
+    def test_decompression_bomb_header_is_rejected(self):
+        def chunk(kind, body):
+            return struct.pack('>I', len(body)) + kind + body + struct.pack('>I', zlib.crc32(kind + body))
+
+        header = b'\x89PNG\r\n\x1a\n' + chunk(b'IHDR', struct.pack('>IIBBBBB', 20000, 20000, 8, 2, 0, 0, 0))
+        upload = SimpleUploadedFile('bomb.png', header + chunk(b'IDAT', zlib.compress(bytes(100))), 'image/png')
+        response = self.client.post(self.edit_url, {'username': 'tester', 'profile_picture': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFormError(response.context['form'], 'profile_picture', 'The image has too many pixels.')
+        self.assertEqual(self.uploaded_files(), [])
+
+    def test_csrf_is_checked_after_the_handler_is_installed(self):
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        data = {'username': 'tester', 'profile_picture': make_image_file('photo.bmp', format='BMP')}
+
+        self.assertEqual(client.post(self.edit_url, data).status_code, 403)
+
+        client.get(self.edit_url)
+        data = {
+            'username': 'tester', 'profile_picture': make_image_file('photo.bmp', format='BMP'),
+            'csrfmiddlewaretoken': client.cookies[settings.CSRF_COOKIE_NAME].value,
+        }
+        response = client.post(self.edit_url, data)
+        self.assertFormError(response.context['form'], 'profile_picture', 'BMP images are not supported.')
+
+    def test_upload_with_a_bad_csrf_token_is_deleted(self):
+        request = RequestFactory().post(self.edit_url, {
+            'csrfmiddlewaretoken': 'b' * 32, 'username': 'tester', 'profile_picture': make_image_file(),
+        })
+        request.COOKIES[settings.CSRF_COOKIE_NAME] = 'a' * 32
+        view = ProfileEditView()
+        view.setup(request, pk=self.user.pk)
+
+        rejected, form = view.bind_form()
+
+        self.assertEqual(rejected.status_code, 403)
+        self.assertEqual(self.uploaded_files(), [])
+
+    def test_other_views_keep_the_default_handlers(self):
+        staff = create_member(is_staff=True, is_superuser=True)
+        self.client.force_login(staff)
+        upload = SimpleUploadedFile('notes.png', b'not an image', content_type='image/png')
+
+        response = self.client.post(
+            reverse('admin:accounts_profile_change', args=[self.user.pk]),
+            {'username': 'tester', 'profile_picture': upload},
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('profile_picture', response.context['adminform'].form.errors)
+
+    def test_non_image_upload_is_rejected(self):
+        upload = SimpleUploadedFile('notes.png', b'not an image', content_type='image/png')
+        response = self.client.post(self.edit_url, {'username': 'tester', 'profile_picture': upload})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('profile_picture', response.context['form'].errors)
+
+
+class AsyncViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = create_members(2)
+
+    def setUp(self):
+        cache.clear()
+        self.edit_url = reverse('profile-edit', kwargs={'pk': self.user.pk})
+
+    def test_profile_edit_requires_login(self):
+        response = self.client.get(self.edit_url)
+
+        self.assertRedirects(response, f"{reverse('login')}?next={self.edit_url}", fetch_redirect_response=False)
+
+    def test_profile_edit_of_another_member_is_forbidden(self):
+        self.client.force_login(self.other)
+
+        self.assertEqual(self.client.get(self.edit_url).status_code, 403)
+        self.assertEqual(self.client.post(self.edit_url, {'username': 'hijacked'}).status_code, 403)
+        self.assertIsNone(Profile.objects.get(pk=self.user.pk).username)
+
+    def test_profile_edit_of_missing_profile_is_not_found(self):
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.client.get(reverse('profile-edit', kwargs={'pk': 0})).status_code, 404)
+
+    def test_member_without_a_profile_is_not_found(self):
+        Profile.objects.filter(pk=self.user.pk).delete()
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.client.get(self.edit_url).status_code, 404)
+        self.assertEqual(self.client.post(self.edit_url, {'username': 'new'}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('profile-details', kwargs={'pk': self.user.pk})).status_code, 404)
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(reverse('profile-details', kwargs={'pk': self.user.pk})).status_code, 404)
+
+    def test_profile_details(self):
+        response = self.client.get(reverse('profile-details', kwargs={'pk': self.user.pk}))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['object'], self.user)
+
+    async def test_async_client_renders_pages(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+
+        home = await client.get(reverse('home'))
+        edit = await client.get(self.edit_url)
+
+        self.assertContains(home, 'You are logged in.')
+        self.assertEqual(edit.status_code, 200)
+        self.assertEqual(edit.context['user_profile'].pk, self.user.pk)
+
+    async def test_profile_edit_parses_the_body_off_the_event_loop(self):
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        loops = []
+        new_file = ProfilePictureUploadHandler.new_file
+
+        def record_loop(handler, *args, **kwargs):
+            try:
+                loops.append(asyncio.get_running_loop())
+            except RuntimeError:
+                loops.append(None)
+            return new_file(handler, *args, **kwargs)
+
+        with mock.patch.object(ProfilePictureUploadHandler, 'new_file', record_loop):
+            await client.post(self.edit_url, {'username': 'tester', 'profile_picture': make_image_file()})
+
+        self.assertEqual(loops, [None])
+
+
+class MemberSearchTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        UserModel.objects.create_users([
+            {'email': 'anna@example.com', 'profile': {'username': 'anna', 'first_name': 'Anna', 'last_name': 'Smith'}},
+            {'email': 'bob@example.com', 'profile': {'username': 'bobby', 'first_name': 'Bob', 'last_name': 'Smithers'}},
+            {'email': 'carl@example.com', 'profile': {'username': 'carl', 'first_name': 'Carl', 'last_name': 'Jones'}},
+            {'email': 'dora@gym.example', 'profile': {'username': 'dora', 'first_name': 'Dora', 'last_name': None}},
+        ])
+        cls.staff = create_member(email='desk@example.com', is_staff=True)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+        self.url = reverse('member-search')
+
+    def search(self, **params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def emails(self, data):
+        return [member['email'] for member in data['results']]
+
+    def test_prefix_match_on_names_and_email(self):
+        self.assertEqual(self.emails(self.search(q='smi')), ['anna@example.com', 'bob@example.com'])
+        self.assertEqual(self.emails(self.search(q='CARL@')), ['carl@example.com'])
+        self.assertEqual(self.emails(self.search(q='do')), ['dora@gym.example'])
+
+    def test_substring_fallback_matches_inside_names(self):
+        self.assertEqual(self.emails(self.search(q='thers')), ['bob@example.com'])
+
+    def test_keyset_pagination_walks_every_member_once(self):
+        seen = []
+        data = self.search(limit=2)
+        while True:
+            seen.extend(self.emails(data))
+            if not data['next_cursor']:
+                break
+            data = self.search(limit=2, cursor=data['next_cursor'])
+
+        self.assertEqual(seen, [
+            'desk@example.com', 'dora@gym.example', 'carl@example.com', 'anna@example.com', 'bob@example.com',
+        ])
+
+    def test_page_query_count(self):
+        cursor = self.search(limit=2)['next_cursor']
+        with self.assertNumQueries(1):
+            self.client.get(self.url, {'limit': 2, 'cursor': cursor, 'q': 'a'})
+
+    def test_invalid_cursor_is_rejected(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_search_requires_staff(self):
+        member = UserModel.objects.get(email='anna@example.com')
+        self.client.force_login(member)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+
+
+class AdminChangelistTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = create_member(email='admin@example.com', is_staff=True, is_superuser=True)
+        UserModel.objects.create_users(
+            {'email': f'member{number}@example.com', 'profile': {'username': f'member{number}'}}
+            for number in range(5)
+        )
+
+    def setUp(self):
+        self.client.force_login(self.admin)
+        self.url = reverse('admin:accounts_appuser_changelist')
+
+    def test_pages_by_cursor_without_repeating_rows(self):
+        seen = []
+        with mock.patch('gym_flow.accounts.admin.AppUserAdmin.list_per_page', 2):
+            response = self.client.get(self.url)
+            while True:
+                cl = response.context['cl']
+                self.assertTrue(cl.keyset)
+                seen.extend(user.pk for user in cl.result_list)
+                if not cl.next_cursor:
+                    break
+                response = self.client.get(self.url + cl.next_page_url())
+
+        self.assertEqual(seen, sorted(UserModel.objects.values_list('pk', flat=True), reverse=True))
+
+    def test_row_count_does_not_add_queries(self):
+        def queries(per_page):
+            with mock.patch('gym_flow.accounts.admin.AppUserAdmin.list_per_page', per_page):
+                with CaptureQueriesContext(connection) as context:
+                    self.assertEqual(self.client.get(self.url).status_code, 200)
+            return [query['sql'] for query in context]
+
+        queries(2)  # warm the session and user caches
+        self.assertEqual(len(queries(2)), len(queries(6)))
+
+    def test_sorting_by_column_uses_numbered_pages(self):
+        response = self.client.get(self.url, {'o': '1'})
+        self.assertFalse(response.context['cl'].keyset)
+        self.assertEqual(response.context['cl'].result_count, 6)
+
+    def test_invalid_cursor_redirects_with_error_flag(self):
+        response = self.client.get(self.url, {'cursor': 'x'})
+        self.assertRedirects(response, self.url + '?e=1')
+
+    def test_profile_changelist(self):
+        response = self.client.get(reverse('admin:accounts_profile_changelist'), {'q': 'member1'})
+        self.assertContains(response, 'member1@example.com')
+        self.assertNotContains(response, 'member2@example.com')
+
+
+class ProfileViewQueryTests(TestCase):
+    """Pins the database round trips of the profile views on a warm cache."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user, cls.other = create_members(2)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.edit_url = reverse('profile-edit', kwargs={'pk': self.user.pk})
+        self.details_url = reverse('profile-details', kwargs={'pk': self.user.pk})
+        # Warm the session and user caches.
+        self.client.get(reverse('home'))
+
+    def test_edit_page_reuses_the_loaded_profile(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.edit_url)
+        self.assertEqual(response.context['object'].pk, self.user.pk)
+
+    def test_edit_writes_only_changed_fields_once(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.edit_url, {'username': 'renamed', 'first_name': 'Ann'})
+
+        self.assertRedirects(response, self.details_url, fetch_redirect_response=False)
+        self.assertEqual(len(queries), 1)
+        update = queries[0]['sql']
+        self.assertTrue(update.startswith('UPDATE "accounts_profile"'))
+        self.assertIn('"username"', update)
+        self.assertNotIn('"date_joined"', update)
+        self.assertEqual(Profile.objects.get(pk=self.user.pk).username, 'renamed')
+
+    def test_unchanged_edit_does_not_write(self):
+        Profile.objects.filter(pk=self.user.pk).update(username='same')
+        cache.clear()
+        self.client.get(reverse('home'))
+
+        with self.assertNumQueries(0):
+            self.client.post(self.edit_url, {'username': 'same'})
+
+    def test_edit_of_another_profile_is_one_existence_check(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('profile-edit', kwargs={'pk': self.other.pk}))
+        self.assertEqual(response.status_code, 403)
+
+    def test_own_details_page_makes_no_queries(self):
+        with self.assertNumQueries(0):
+            response = self.client.get(self.details_url)
+        self.assertEqual(response.context['object'], self.user)
+
+    def test_other_details_page_is_one_joined_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('profile-details', kwargs={'pk': self.other.pk}))
+        self.assertEqual(response.context['object'].profile.pk, self.other.pk)
+
+
+class MemberExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_member(email='desk@example.com', is_staff=True)
+        UserModel.objects.create_users([
+            {'email': 'anna@example.com', 'profile': {
+                'username': 'anna', 'first_name': 'Anna', 'last_name': 'Smith', 'date_of_birth': '1990-01-02',
+                'profile_picture': 'profile_pictures/anna.png',
+            }},
+            {'email': 'bob@example.com', 'profile': {'first_name': 'Bob, Jr.'}},
+        ])
+
+    def setUp(self):
+        self.url = reverse('member-export')
+
+    def test_csv_is_streamed_with_one_query(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url)
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment; filename="members-', response['Content-Disposition'])
+        with self.assertNumQueries(1):
+            content = b''.join(response.streaming_content).decode()
+
+        rows = list(csv.reader(content.splitlines()))
+        self.assertEqual(rows[0], list(COLUMNS))
+        self.assertEqual([row[0] for row in rows[1:]], ['desk@example.com', 'anna@example.com', 'bob@example.com'])
+        self.assertEqual(rows[2][1:5], ['anna', 'Anna', 'Smith', '1990-01-02'])
+        self.assertEqual(rows[2][6], '/media/profile_pictures/anna.png')
+        self.assertEqual(rows[3][2], 'Bob, Jr.')
+
+    def test_csv_cells_are_not_spreadsheet_formulas(self):
+        UserModel.objects.create_users([{'email': 'eve@example.com', 'profile': {
+            'username': 'eve', 'first_name': '=HYPERLINK("http://evil.example")', 'last_name': '-2+3',
+        }}])
+
+        rows = list(csv.reader(''.join(export_members('csv')).splitlines()))
+
+        self.assertEqual(rows[-1][1:4], ['eve', '\'=HYPERLINK("http://evil.example")', "'-2+3"])
+        self.assertEqual(rows[-1][0], 'eve@example.com')
+
+    async def test_asgi_response_streams_asynchronously(self):
+        client = AsyncClient()
+        await client.aforce_login(self.staff)
+        response = await client.get(self.url, {'format': 'ndjson'})
+
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assertEqual(len(b''.join(chunks).decode().splitlines()), 3)
+
+    def test_ndjson_has_one_object_per_member(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(self.url, {'format': 'ndjson'})
+
+        members = [json.loads(line) for line in b''.join(response.streaming_content).decode().splitlines()]
+        self.assertEqual(len(members), 3)
+        self.assertEqual(members[1]['date_of_birth'], '1990-01-02')
+        self.assertIsNone(members[2]['picture_url'])
+
+    def test_chunks_hold_chunk_size_members(self):
+        chunks = list(export_members('ndjson', chunk_size=2))
+        self.assertEqual([chunk.count('\n') for chunk in chunks], [2, 1])
+
+    def test_export_is_for_staff_only(self):
+        self.assertEqual(self.client.get(self.url).status_code, 302)
+        self.client.force_login(UserModel.objects.get(email='anna@example.com'))
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.client.force_login(self.staff)
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+
+    def test_command_writes_file(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        path = Path(tmp_dir.name) / 'members.csv'
+
+        call_command('export_members', output=str(path), chunk_size=1, stdout=StringIO())
+
+        self.assertEqual(len(path.read_text(encoding='utf-8').splitlines()), 4)
+
+
+class SweepMediaTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = Profile._meta.get_field('profile_picture').storage
+
+    def save(self, name, content, age=7200):
+        name = self.storage.save(name, ContentFile(content))
+        then = time.time() - age
+        os.utime(self.storage.path(name), (then, then))
+        return name
+
+    def test_unreferenced_old_files_are_deleted_in_batches(self):
+        kept = self.save('profile_pictures/kept.png', b'kept')
+        kept_variant = self.save(variant_name(kept, 'small'), b'kept small')
+        legacy = self.save('profile_pictures/ab/legacy.png', b'legacy')
+        orphans = [self.save('profile_pictures/old.png', f'old {number}'.encode()) for number in range(3)]
+        orphans.append(self.save(variant_name(orphans[0], 'small'), b'old small'))
+        fresh = self.save('profile_pictures/fresh.png', b'fresh', age=0)
+        Profile.objects.filter(pk=create_member().pk).update(profile_picture=kept)
+        Profile.objects.filter(pk=create_member().pk).update(profile_picture=legacy)
+
+        out = StringIO()
+        call_command('sweep_media', batch_size=2, dry_run=True, stdout=out)
+        self.assertIn('Would delete 4 of 8 files', out.getvalue())
+        self.assertTrue(all(self.storage.exists(name) for name in orphans))
+
+        out = StringIO()
+        call_command('sweep_media', batch_size=2, stdout=out)
+        self.assertIn('2 unreferenced files deleted', out.getvalue())
+        self.assertIn('Deleted 4 of 8 files', out.getvalue())
+        self.assertFalse(any(self.storage.exists(name) for name in orphans))
+        self.assertTrue(all(self.storage.exists(name) for name in (kept, kept_variant, legacy, fresh)))
+
+    def test_deduplicated_save_protects_an_old_orphan(self):
+        name = self.save('profile_pictures/a.png', b'same')
+        self.assertEqual(self.storage.save('profile_pictures/b.png', ContentFile(b'same')), name)
+
+        call_command('sweep_media', stdout=StringIO())
+        self.assertTrue(self.storage.exists(name))
+
+
+@override_settings(ACCOUNTS_THROTTLE_RATES={
+    'login:ip': (5, 60), 'login:email': (3, 60), 'register:ip': (2, 60), 'register:email': (2, 60),
+})
+class ThrottleTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = create_member(email='member@example.com')
+
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.login_url = reverse('login')
+
+    def login(self, email='member@example.com', ip='10.0.0.1'):
+        return self.client.post(self.login_url, {'username': email, 'password': 'wrong'}, REMOTE_ADDR=ip)
+
+    def test_repeated_logins_to_one_email_are_rejected_before_hashing(self):
+        for number in range(3):
+            self.assertEqual(self.login(ip=f'10.0.0.{number}').status_code, 200)
+
+        with mock.patch('django.contrib.auth.forms.authenticate') as authenticate:
+            response = self.login(ip='10.0.0.9')
+        authenticate.assert_not_called()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(1 <= int(response['Retry-After']) <= 60)
+        self.assertContains(response, 'Too many attempts', status_code=429)
+
+        self.assertEqual(self.login(email='other@example.com', ip='10.0.0.9').status_code, 200)
+
+    def test_one_ip_is_limited_across_emails(self):
+        for number in range(5):
+            self.assertEqual(self.login(email=f'user{number}@example.com').status_code, 200)
+        self.assertEqual(self.login(email='new@example.com').status_code, 429)
+        self.assertEqual(self.login(email='new@example.com', ip='10.0.0.2').status_code, 200)
+
+    def test_register_is_throttled(self):
+        data = {'email': 'new@example.com', 'password1': 'testpassword123', 'password2': 'mismatch'}
+        self.assertEqual(self.client.post(reverse('register'), data).status_code, 200)
+        self.assertEqual(self.client.post(reverse('register'), data).status_code, 200)
+        response = self.client.post(reverse('register'), data)
+        self.assertEqual(response.status_code, 429)
+        self.assertFalse(response.context['form'].is_bound)
+
+    def test_window_slides(self):
+        request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.1')
+        start = 6000.0
+        for _ in range(3):
+            self.assertEqual(check(request, 'login', 'member@example.com', now=start), 0)
+        self.assertGreater(check(request, 'login', 'member@example.com', now=start + 30), 0)
+        # Half of the previous window still counts: 3 * 0.5 + 2 attempts reach the limit of 3.
+        self.assertEqual(check(request, 'login', 'member@example.com', now=start + 90), 0)
+        self.assertEqual(check(request, 'login', 'member@example.com', now=start + 90), 0)
+        self.assertEqual(check(request, 'login', 'member@example.com', now=start + 90), 30)
+        self.assertEqual(check(request, 'login', 'member@example.com', now=start + 180), 0)
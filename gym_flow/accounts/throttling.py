@@ -0,0 +1,82 @@
+"""
+Cache-backed throttling of login and registration attempts.
+
+Each attempt is counted per client IP and per submitted email against the
+``ACCOUNTS_THROTTLE_RATES`` of its action, e.g. ``'login:email': (10, 900)``
+allows ten logins to one account per 15 minutes from any number of IPs. An
+attempt over any limit is rejected before the form is validated, so no
+password is hashed and nothing is written to the database.
+
+Counts use a sliding window approximated from two fixed windows: the
+previous window's count, weighted by how much of it still overlaps the
+sliding window, plus the current one. That is one ``get_many`` and one
+``incr`` per identity, and the counters expire on their own.
+"""
+import hashlib
+import math
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import caches
+
+KEY_PREFIX = 'accounts:throttle'
+
+
+def client_ip(request):
+    return request.META.get(settings.ACCOUNTS_THROTTLE_IP_HEADER) or request.META.get('REMOTE_ADDR') or 'unknown'
+
+
+def identities(request, action, email):
+    yield f'{action}:ip', client_ip(request)
+    email = (email or '').strip().lower()
+    if email:
+        # Hashed to bound the key length and keep addresses out of the cache.
+        yield f'{action}:email', hashlib.sha256(email.encode()).hexdigest()[:32]
+
+
+def check(request, action, email=None, now=None):
+    """
+    Count an attempt at ``action`` and return 0, or return the seconds until
+    a retry may succeed without counting it.
+    """
+    now = time.time() if now is None else now
+    cache = caches[settings.ACCOUNTS_THROTTLE_CACHE_ALIAS]
+
+    limits = []
+    for scope, identity in identities(request, action, email):
+        rate = settings.ACCOUNTS_THROTTLE_RATES.get(scope)
+        if rate is None:
+            continue
+        limit, window = rate
+        bucket = int(now // window)
+        limits.append((
+            limit, window, bucket,
+            f'{KEY_PREFIX}:{scope}:{identity}:{bucket - 1}',
+            f'{KEY_PREFIX}:{scope}:{identity}:{bucket}',
+        ))
+    if not limits:
+        return 0
+
+    counts = cache.get_many([key for *_, previous, current in limits for key in (previous, current)])
+    retry_after = 0
+    for limit, window, bucket, previous, current in limits:
+        overlap = 1 - (now - bucket * window) / window
+        if counts.get(previous, 0) * overlap + counts.get(current, 0) >= limit:
+            retry_after = max(retry_after, math.ceil((bucket + 1) * window - now))
+    if retry_after:
+        return retry_after
+
+    for limit, window, bucket, previous, current in limits:
+        # The counter outlives its window because the next one reads it.
+        if not cache.add(current, 1, timeout=2 * window):
+            try:
+                cache.incr(current)
+            except ValueError:
+                # Expired between add() and incr().
+                cache.set(current, 1, timeout=2 * window)
+    return 0
+
+
+# One thread hop for the whole check instead of one per cache call.
+acheck = sync_to_async(check)
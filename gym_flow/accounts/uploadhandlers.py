@@ -0,0 +1,128 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile, StopFutureHandlers
+from django.template.defaultfilters import filesizeformat
+from PIL import Image, ImageFile
+
+from gym_flow.accounts.models import Profile
+
+# Bytes read while looking for the image header before the upload is rejected
+# as not being an image.
+HEADER_READ_LIMIT = 256 * 1024
+
+
+def upload_errors(request):
+    return getattr(request, '_upload_errors', {})
+
+
+class StreamedUploadedFile(UploadedFile):
+    """
+    An upload written to a temporary file next to its final location, so the
+    storage can move it into place instead of copying it.
+    """
+
+    def __init__(self, name, content_type, charset, content_type_extra, directory):
+        file = tempfile.NamedTemporaryFile(prefix='.upload-', dir=directory)
+        super().__init__(file, name, content_type, 0, charset, content_type_extra)
+
+    def temporary_file_path(self):
+        return self.file.name
+
+    def close(self):
+        try:
+            return self.file.close()
+        except FileNotFoundError:
+            # The storage already moved the file into place.
+            pass
+
+
+class ProfilePictureUploadHandler(FileUploadHandler):
+    """
+    Streams the ``profile_picture`` upload straight into the media directory
+    and validates it as it arrives: the image format and dimensions are
+    checked as soon as the header has been received, and the upload is
+    skipped once it exceeds ``PROFILE_PICTURE_MAX_UPLOAD_SIZE`` bytes or
+    ``PROFILE_PICTURE_MAX_PIXELS`` pixels. Rejections are reported through
+    ``upload_errors(request)``. Other file fields fall through to the next
+    handler.
+    """
+
+    field_name = 'profile_picture'
+
+    def new_file(self, field_name, *args, **kwargs):
+        super().new_file(field_name, *args, **kwargs)
+        self.upload = None
+        if self.field_name != field_name:
+            return
+
+        if self.content_length is not None and self.content_length > settings.PROFILE_PICTURE_MAX_UPLOAD_SIZE:
+            self.reject(self.too_large_message())
+
+        field = Profile._meta.get_field(self.field_name)
+        directory = settings.FILE_UPLOAD_TEMP_DIR
+        if hasattr(field.storage, 'path'):
+            directory = field.storage.path(field.upload_to)
+            os.makedirs(directory, exist_ok=True)
+
+        self.upload = StreamedUploadedFile(
+            self.file_name, self.content_type, self.charset, self.content_type_extra, directory,
+        )
+        self.parser = ImageFile.Parser()
+        raise StopFutureHandlers()
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload is None:
+            return raw_data
+
+        if start + len(raw_data) > settings.PROFILE_PICTURE_MAX_UPLOAD_SIZE:
+            self.reject(self.too_large_message())
+
+        if self.parser is not None:
+            self.check_header(raw_data, start)
+
+        self.upload.write(raw_data)
+
+    def file_complete(self, file_size):
+        if self.upload is None:
+            return None
+
+        self.upload.seek(0)
+        self.upload.size = file_size
+        return self.upload
+
+    def check_header(self, raw_data, start):
+        try:
+            self.parser.feed(raw_data)
+        except (Image.DecompressionBombError, Image.DecompressionBombWarning):
+            # Pillow refuses headers far above PROFILE_PICTURE_MAX_PIXELS
+            # before the size can be read; the warning only raises under -W error.
+            self.reject("The image has too many pixels.")
+        image = self.parser.image
+        if image is None:
+            if start + len(raw_data) > HEADER_READ_LIMIT:
+                self.reject("Upload a valid image. The file you uploaded was either not an image or a corrupted image.")
+            return
+
+        # Only the header was needed; stop decoding.
+        self.parser = None
+        if image.format not in settings.PROFILE_PICTURE_FORMATS:
+            self.reject(f"{image.format} images are not supported.")
+
+        width, height = image.size
+        if width * height > settings.PROFILE_PICTURE_MAX_PIXELS:
+            self.reject(f"The image is {width}x{height} pixels, which is too large.")
+
+    def too_large_message(self):
+        return f"The file is larger than {filesizeformat(settings.PROFILE_PICTURE_MAX_UPLOAD_SIZE)}."
+
+    def reject(self, message):
+        if self.upload is not None:
+            self.upload.close()
+            self.upload = None
+        if not hasattr(self.request, '_upload_errors'):
+            self.request._upload_errors = {}
+        self.request._upload_errors[self.field_name] = message
+        raise SkipFile()
@@ -6,7 +6,10 @@ urlpatterns = [
     path('login/', views.AppUserLoginView.as_view(), name='login'),
     path('register/', views.AppUserRegisterView.as_view(), name='register'),
     path('logout/', views.LogoutView.as_view(), name='logout'),
+    path('members/search/', views.MemberSearchView.as_view(), name='member-search'),
+    path('members/export/', views.MemberExportView.as_view(), name='member-export'),
     path('profile/<int:pk>/', include([
         path('', views.ProfileEditView.as_view(), name='profile-edit'),
+        path('details/', views.ProfileDetailView.as_view(), name='profile-details'),
     ]))
 ]
\ No newline at end of file
@@ -0,0 +1,10 @@
+async def aresolve_user(request):
+    """
+    Resolve the user with the async auth API and pin it on ``request.user``.
+
+    Templates are rendered afterwards in a worker thread, and the auth and
+    user_profile context processors read ``request.user``; pinning the user
+    lets them reuse this lookup instead of running a second, sync one.
+    """
+    request.user = await request.auser()
+    return request.user
@@ -1,65 +1,254 @@
-from django.contrib.auth import get_user_model, login
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.contrib.auth.views import LoginView
-from django.shortcuts import get_object_or_404
-from django.urls import reverse_lazy
-from django.views.generic import CreateView, UpdateView, DetailView
-
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model, alogin
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.contrib.auth.views import LoginView, LogoutView, redirect_to_login
+from django.core import signing
+from django.core.exceptions import PermissionDenied
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponseBadRequest, HttpResponseRedirect, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views.decorators.csrf import csrf_exempt
+from django.views.generic import CreateView, UpdateView, DetailView, View
+
+from gym_flow.accounts.backends import HashingBusy
+from gym_flow.accounts.export import FORMATS, aexport_members, export_members
 from gym_flow.accounts.forms import AppUserCreationForm, ProfileEditForm
+from gym_flow.accounts.images import schedule_variants
+from gym_flow.accounts.uploadhandlers import ProfilePictureUploadHandler, upload_errors
 from gym_flow.accounts.models import Profile
+from gym_flow.accounts.search import search_profiles, paginate
+from gym_flow.accounts.throttling import acheck, check
+from gym_flow.accounts.utils import aresolve_user
 
 UserModel = get_user_model()
 
 
-class AppUserLoginView(LoginView):
+class ThrottledFormMixin:
+    """
+    Renders the form page with status 429 for throttled attempts, or 503 when
+    the server is too busy to check them.
+    """
+
+    def throttled(self, retry_after, busy=False):
+        # An unbound form: validating the submitted one would authenticate.
+        form = self.get_form_class()(**{**self.get_form_kwargs(), 'data': None, 'files': None})
+        response = self.render_to_response(
+            self.get_context_data(form=form, retry_after=retry_after, busy=busy), status=503 if busy else 429,
+        )
+        response.headers['Retry-After'] = str(retry_after)
+        return response
+
+
+class AppUserLoginView(ThrottledFormMixin, LoginView):
     template_name = 'accounts/login.html'
 
+    def post(self, request, *args, **kwargs):
+        retry_after = check(request, 'login', request.POST.get('username'))
+        if retry_after:
+            return self.throttled(retry_after)
+        try:
+            return super().post(request, *args, **kwargs)
+        except HashingBusy as exc:
+            return self.throttled(exc.retry_after, busy=True)
 
-class AppUserRegisterView(CreateView):
+
+class AppUserRegisterView(ThrottledFormMixin, CreateView):
     model = UserModel
     form_class = AppUserCreationForm
     template_name = 'accounts/register.html'
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
+    async def get(self, request, *args, **kwargs):
+        self.object = None
+        return self.render_to_response(self.get_context_data())
 
-        login(self.request, self.object)
+    async def post(self, request, *args, **kwargs):
+        self.object = None
+        retry_after = await acheck(request, 'register', request.POST.get('email'))
+        if retry_after:
+            return self.throttled(retry_after)
 
-        return response
+        form = self.get_form()
+        # Validation checks email uniqueness and hashes the password; both
+        # are sync, so they run in a worker thread.
+        if await sync_to_async(form.is_valid)():
+            return await self.form_valid(form)
+        return self.form_invalid(form)
+
+    put = post
+
+    async def form_valid(self, form):
+        self.object = await sync_to_async(form.save)()
+        await alogin(self.request, self.object)
+        return HttpResponseRedirect(self.get_success_url())
 
     def get_success_url(self):
         return reverse_lazy('home', )
 
 
-class ProfileEditView(UpdateView, LoginRequiredMixin, UserPassesTestMixin):
+# Exempt so the middleware does not parse the body before the view installs
+# its upload handler; post() runs the same check afterwards.
+@method_decorator(csrf_exempt, name='dispatch')
+class ProfileEditView(UpdateView):
     model = Profile
     form_class = ProfileEditForm
     template_name = 'accounts/profile-edit.html'
 
-    def test_func(self):
-        profile = get_object_or_404(Profile, pk=self.kwargs['pk'])
-        return self.request.user == profile.user
+    async def aget_object(self):
+        user = await aresolve_user(self.request)
+        if not user.is_authenticated:
+            return None
+
+        # Members only edit their own profile, which the auth backend already
+        # loaded with the user; other ids only need an existence check.
+        if self.kwargs['pk'] != user.pk:
+            if await Profile.objects.filter(pk=self.kwargs['pk']).aexists():
+                raise PermissionDenied
+            raise Http404("No profile found matching the query")
+        try:
+            return user.profile
+        except Profile.DoesNotExist:
+            raise Http404("No profile found matching the query")
+
+    async def get(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        if self.object is None:
+            return redirect_to_login(request.get_full_path())
+        return self.render_to_response(self.get_context_data())
+
+    async def post(self, request, *args, **kwargs):
+        self.object = await self.aget_object()
+        if self.object is None:
+            return redirect_to_login(request.get_full_path())
+
+        rejected, form = await sync_to_async(self.bind_form)()
+        if rejected is not None:
+            return rejected
+        if form.is_valid():
+            return await self.form_valid(form)
+        return self.form_invalid(form)
+
+    put = post
+
+    def bind_form(self):
+        """
+        Return ``(csrf_failure, None)`` or ``(None, validated_form)``. Reading
+        the body streams the picture to disk and parses its header, so this
+        runs in a worker thread.
+        """
+        self.request.upload_handlers.insert(0, ProfilePictureUploadHandler(self.request))
+        rejected = CsrfViewMiddleware(self.post).process_view(self.request, None, (), {})
+        if rejected is not None:
+            # A missing cookie or a foreign Origin or Referer is refused
+            # before the body is read, but the form token can only be
+            # compared once the picture has been streamed to disk, so delete
+            # it now rather than when the response is closed.
+            self.request.close()
+            return rejected, None
+
+        form = self.get_form()
+        form.is_valid()
+        for field, message in upload_errors(self.request).items():
+            form.add_error(field, message)
+        return None, form
 
     def get_success_url(self):
         return reverse_lazy(
             'profile-details', kwargs={'pk': self.object.pk, }
         )
 
-    def form_valid(self, form):
-        response = super().form_valid(form)
-        # Save the new profile picture
-        if self.request.FILES.get('profile_picture'):
-            self.object.profile_picture = self.request.FILES['profile_picture']
-            self.object.save()
-        return response
+    async def form_valid(self, form):
+        # The form already assigns the uploaded picture, so this is the only
+        # write, and it only touches the fields the member changed.
+        self.object = form.save(commit=False)
+        if form.changed_data:
+            await self.object.asave(update_fields=form.changed_data)
+        if 'profile_picture' in form.changed_data and self.object.profile_picture:
+            await sync_to_async(schedule_variants)(self.object.profile_picture.name)
+        return HttpResponseRedirect(self.get_success_url())
 
 
 class ProfileDetailView(DetailView):
     model = UserModel
     template_name = 'accounts/profile-details.html'
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        user = self.request.user
+    async def get(self, request, *args, **kwargs):
+        user = await aresolve_user(request)
+        if user.pk == kwargs['pk']:
+            # Already loaded with its profile by the auth backend.
+            self.object = user
+        else:
+            try:
+                self.object = await UserModel.objects.select_related('profile').aget(pk=kwargs['pk'])
+            except UserModel.DoesNotExist:
+                raise Http404("No user found matching the query")
+        try:
+            self.object.profile
+        except Profile.DoesNotExist:
+            raise Http404("No profile found matching the query")
+        return self.render_to_response(self.get_context_data(object=self.object))
+
+
+class MemberSearchView(UserPassesTestMixin, View):
+    """
+    Front-desk member lookup: ``?q=<name or email>&cursor=<next_cursor>``.
+    """
 
-        return context
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        try:
+            limit = min(
+                int(request.GET.get('limit') or settings.ACCOUNTS_MEMBER_SEARCH_PAGE_SIZE),
+                settings.ACCOUNTS_MEMBER_SEARCH_MAX_PAGE_SIZE,
+            )
+            profiles, next_cursor = paginate(
+                search_profiles(request.GET.get('q', '')),
+                cursor=request.GET.get('cursor'),
+                limit=max(limit, 1),
+            )
+        except (ValueError, signing.BadSignature):
+            return JsonResponse({'error': "Invalid limit or cursor."}, status=400)
+
+        return JsonResponse({
+            'results': [
+                {
+                    'id': profile.pk,
+                    'email': profile.user.email,
+                    'username': profile.username,
+                    'first_name': profile.first_name,
+                    'last_name': profile.last_name,
+                    'url': reverse('profile-details', kwargs={'pk': profile.pk}),
+                }
+                for profile in profiles
+            ],
+            'next_cursor': next_cursor,
+        })
+
+
+class MemberExportView(UserPassesTestMixin, View):
+    """
+    Full member export for staff, streamed as it is read:
+    ``?format=csv`` (default) or ``?format=ndjson``.
+    """
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        format = request.GET.get('format', 'csv')
+        if format not in FORMATS:
+            return HttpResponseBadRequest(f"Unknown format; use one of {', '.join(FORMATS)}.")
+
+        filename = f"members-{timezone.localdate():%Y%m%d}.{format}"
+        # Each server consumes only its own kind of iterator without buffering it.
+        chunks = aexport_members(format) if isinstance(request, ASGIRequest) else export_members(format)
+        return StreamingHttpResponse(
+            chunks,
+            content_type=FORMATS[format],
+            headers={'Content-Disposition': f'attachment; filename="{filename}"'},
+        )
@@ -3,6 +3,20 @@ ASGI config for gym_flow project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The home and profile views are async, so they run on the event loop without
+a thread hand-off per request. Serve it with either of (neither server is a
+project requirement):
+
+    pip install "uvicorn[standard]"
+    GYM_FLOW_ENV=prod uvicorn gym_flow.asgi:application --host 0.0.0.0 --port 8000 --workers 4
+
+    pip install daphne
+    GYM_FLOW_ENV=prod daphne -b 0.0.0.0 -p 8000 gym_flow.asgi:application
+
+Under ASGI, database connections are not reused between requests, so this
+module turns CONN_MAX_AGE off; set DB_POOL_MAX_SIZE to use the psycopg
+connection pool instead.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
 """
@@ -12,5 +26,13 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gym_flow.settings')
+os.environ['GYM_FLOW_ASGI'] = '1'
 
 application = get_asgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATES_WARM_ON_STARTUP:
+    from gym_flow.common.templates import warm_templates
+
+    warm_templates()
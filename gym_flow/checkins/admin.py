@@ -0,0 +1,14 @@
+from django.contrib import admin
+
+from gym_flow.checkins.models import CheckIn
+from gym_flow.common.admin import KeysetPaginationMixin
+
+
+@admin.register(CheckIn)
+class CheckInAdmin(KeysetPaginationMixin, admin.ModelAdmin):
+    list_display = ('scanned_at', 'user', 'direction', 'gate')
+    list_filter = ('direction', )
+    list_select_related = ('user', )
+    search_fields = ('^user__email', '^gate')
+    ordering = ('-pk', )
+    raw_id_fields = ('user', )
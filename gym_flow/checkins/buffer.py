@@ -0,0 +1,141 @@
+"""
+In-process write buffer for check-in events.
+
+Turnstiles produce many tiny writes. Instead of one INSERT and commit per
+scan, events are queued in memory and written with a single ``bulk_create``
+once ``CHECKINS_BUFFER_SIZE`` events are waiting or ``CHECKINS_FLUSH_INTERVAL``
+seconds have passed, whichever comes first.
+
+A card scanned again at the same turnstile direction within
+``CHECKINS_DEDUP_WINDOW`` seconds is dropped here. Each process has its own
+buffer, so that check only sees that process's scans; retried uploads of the
+same event are caught across processes by the unique ``event_id``.
+
+A batch that fails to write goes back to the front of the queue and is
+retried on the next flush. Events still in the buffer are lost if the
+process is killed; they are flushed on a normal interpreter exit.
+"""
+import atexit
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connections, transaction
+
+from gym_flow.checkins.models import CheckIn
+
+logger = logging.getLogger(__name__)
+
+UserModel = get_user_model()
+
+
+class CheckInBuffer:
+    def __init__(self, max_size, flush_interval, dedup_window):
+        self.max_size = max_size
+        self.flush_interval = flush_interval
+        self.dedup_window = timedelta(seconds=dedup_window)
+
+        self._pending = []
+        self._last_seen = {}
+        self._lock = threading.Lock()
+        # Only one flush writes at a time, so batches are stored in order.
+        self._flush_lock = threading.Lock()
+        self._timer = None
+
+    def add(self, checkin):
+        """
+        Queue an unsaved CheckIn. Return False if it is a duplicate scan.
+        """
+        key = (checkin.user_id, checkin.direction)
+        with self._lock:
+            last = self._last_seen.get(key)
+            if last is not None and abs(checkin.scanned_at - last) < self.dedup_window:
+                return False
+            self._last_seen[key] = checkin.scanned_at
+            self._pending.append(checkin)
+            full = len(self._pending) >= self.max_size
+            if not full:
+                self._schedule_flush()
+
+        if full:
+            # This runs in whichever request filled the buffer; its events
+            # are queued either way, so a failed write must not fail it.
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing buffered check-ins failed")
+        return True
+
+    def _schedule_flush(self):
+        if self._timer is None and self.flush_interval:
+            self._timer = threading.Timer(self.flush_interval, self._flush_on_timer)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _flush_on_timer(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Flushing buffered check-ins failed")
+        finally:
+            # The timer thread opened its own database connection.
+            connections.close_all()
+
+    def flush(self):
+        """Write all queued check-ins and return how many were stored."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                self._forget_old_scans()
+
+            if not batch:
+                return 0
+            try:
+                return self._write(batch)
+            except Exception:
+                with self._lock:
+                    self._pending[:0] = batch
+                    self._schedule_flush()
+                raise
+
+    def _forget_old_scans(self):
+        if len(self._last_seen) < self.max_size * 10:
+            return
+        newest = max(self._last_seen.values())
+        self._last_seen = {
+            key: seen for key, seen in self._last_seen.items() if newest - seen < self.dedup_window
+        }
+
+    def _write(self, batch):
+        # A scan for a deleted or unknown member must not fail the whole batch.
+        known = set(
+            UserModel.objects.filter(pk__in={checkin.user_id for checkin in batch}).values_list('pk', flat=True)
+        )
+        batch = [checkin for checkin in batch if checkin.user_id in known]
+
+        with transaction.atomic():
+            CheckIn.objects.bulk_create(batch, batch_size=self.max_size, ignore_conflicts=True)
+        return len(batch)
+
+
+_buffer = None
+_buffer_lock = threading.Lock()
+
+
+def checkin_buffer():
+    global _buffer
+
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = CheckInBuffer(
+                max_size=settings.CHECKINS_BUFFER_SIZE,
+                flush_interval=settings.CHECKINS_FLUSH_INTERVAL,
+                dedup_window=settings.CHECKINS_DEDUP_WINDOW,
+            )
+            atexit.register(_buffer.flush)
+        return _buffer
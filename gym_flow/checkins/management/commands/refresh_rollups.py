@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from gym_flow.checkins import rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Fold check-ins recorded since the last run into the occupancy and "
+        "daily visit rollups. Use --interval to keep running as a background task."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rebuild', action='store_true', help="Discard the rollups and rebuild them from scratch.")
+        parser.add_argument('--chunk-size', type=int, default=100_000, help="Check-in ids folded per transaction.")
+        parser.add_argument('--interval', type=float, default=0, help="Seconds between refreshes; 0 runs once.")
+
+    def handle(self, *args, rebuild, chunk_size, interval, **options):
+        progress = lambda count: self.stdout.write(f"{count} check-ins folded")
+
+        if rebuild:
+            processed = rollups.rebuild(chunk_size=chunk_size, progress=progress)
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt rollups from {processed} check-ins."))
+            if not interval:
+                return
+
+        while True:
+            processed = rollups.refresh(chunk_size=chunk_size, progress=progress if not interval else None)
+            if processed or not interval:
+                self.stdout.write(self.style.SUCCESS(f"Folded {processed} new check-ins."))
+            if not interval:
+                return
+            close_old_connections()
+            time.sleep(interval)
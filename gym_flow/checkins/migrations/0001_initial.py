@@ -0,0 +1,31 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:09
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CheckIn',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('direction', models.CharField(choices=[('in', 'In'), ('out', 'Out')], default='in', max_length=3)),
+                ('gate', models.CharField(max_length=30)),
+                ('scanned_at', models.DateTimeField()),
+                ('event_id', models.UUIDField(blank=True, null=True, unique=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checkins', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', 'scanned_at'], name='checkin_user_scanned_idx'), models.Index(fields=['scanned_at'], name='checkin_scanned_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,105 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+UserModel = get_user_model()
+
+
+class CheckIn(models.Model):
+    class Direction(models.TextChoices):
+        IN = 'in', 'In'
+        OUT = 'out', 'Out'
+
+    user = models.ForeignKey(
+        to=UserModel,
+        on_delete=models.CASCADE,
+        related_name='checkins',
+    )
+    direction = models.CharField(
+        max_length=3,
+        choices=Direction.choices,
+        default=Direction.IN,
+    )
+    gate = models.CharField(
+        max_length=30,
+    )
+    scanned_at = models.DateTimeField()
+    # Set by the turnstile or kiosk so a retried upload is stored only once.
+    event_id = models.UUIDField(
+        unique=True,
+        blank=True,
+        null=True,
+    )
+    recorded_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'scanned_at'], name='checkin_user_scanned_idx'),
+            models.Index(fields=['scanned_at'], name='checkin_scanned_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.direction} {self.gate} {self.scanned_at:%Y-%m-%d %H:%M:%S}'
+
+
+class OccupancyMinute(models.Model):
+    """
+    Entries and exits per minute, and members inside at the end of the
+    minute counted from the start of that (local) day.
+    """
+    minute = models.DateTimeField(
+        unique=True,
+    )
+    entries = models.PositiveIntegerField(
+        default=0,
+    )
+    exits = models.PositiveIntegerField(
+        default=0,
+    )
+    occupancy = models.IntegerField(
+        default=0,
+    )
+
+    def __str__(self):
+        return f'{self.minute:%Y-%m-%d %H:%M} {self.occupancy}'
+
+
+class DailyVisits(models.Model):
+    day = models.DateField()
+    user = models.ForeignKey(
+        to=UserModel,
+        on_delete=models.CASCADE,
+        related_name='daily_visits',
+    )
+    visits = models.PositiveIntegerField(
+        default=0,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'user'], name='daily_visits_day_user_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'day'], name='daily_visits_user_day_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.day} {self.user_id} {self.visits}'
+
+
+class RollupWatermark(models.Model):
+    """Highest CheckIn id already folded into the rollups."""
+    name = models.CharField(
+        max_length=30,
+        primary_key=True,
+    )
+    last_id = models.BigIntegerField(
+        default=0,
+    )
+    refreshed_at = models.DateTimeField(
+        auto_now=True,
+    )
+
+    def __str__(self):
+        return f'{self.name} {self.last_id}'
@@ -0,0 +1,177 @@
+"""
+Occupancy and attendance rollups built from check-ins.
+
+``refresh()`` folds check-ins with an id above the stored watermark into
+``OccupancyMinute`` and ``DailyVisits`` and moves the watermark, so each run
+only reads new events. Check-ins recorded in the last
+``CHECKINS_ROLLUP_LAG`` seconds are left for the next run: ids are assigned
+before commit, so a slow transaction could otherwise commit a lower id
+after the watermark has passed it.
+
+Late scans (a kiosk uploading yesterday's events) land in the minute and day
+they happened; the occupancy of every later minute of that day is
+recomputed. ``rebuild()`` throws the rollups away and refreshes from the
+first check-in.
+
+The query functions read the rollups only. ``current_occupancy()`` also
+adds today's check-ins past the watermark, which is a short index scan.
+"""
+from collections import Counter, defaultdict
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q, Sum
+from django.db.models.functions import TruncDate, TruncHour, TruncMinute
+from django.utils import timezone
+
+from gym_flow.checkins.models import CheckIn, DailyVisits, OccupancyMinute, RollupWatermark
+
+WATERMARK = 'checkins'
+
+
+def day_start(day):
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def local_day(moment):
+    return timezone.localtime(moment).date()
+
+
+def refresh(chunk_size=100_000, progress=None):
+    """Fold new check-ins into the rollups and return how many were read."""
+    cutoff = timezone.now() - timedelta(seconds=settings.CHECKINS_ROLLUP_LAG)
+    last_id = RollupWatermark.objects.get_or_create(name=WATERMARK)[0].last_id
+    upto = CheckIn.objects.filter(pk__gt=last_id, recorded_at__lte=cutoff).aggregate(upto=Max('pk'))['upto']
+
+    processed = 0
+    while upto is not None and last_id < upto:
+        chunk_end = min(last_id + chunk_size, upto)
+        processed += _fold(last_id, chunk_end)
+        last_id = chunk_end
+        if progress:
+            progress(processed)
+    return processed
+
+
+def rebuild(chunk_size=100_000, progress=None):
+    with transaction.atomic():
+        OccupancyMinute.objects.all().delete()
+        DailyVisits.objects.all().delete()
+        RollupWatermark.objects.update_or_create(name=WATERMARK, defaults={'last_id': 0})
+    return refresh(chunk_size=chunk_size, progress=progress)
+
+
+@transaction.atomic
+def _fold(after_id, upto_id):
+    watermark = RollupWatermark.objects.select_for_update().get(name=WATERMARK)
+    if watermark.last_id != after_id:
+        # Another refresh got here first; the caller's next chunk starts from its watermark.
+        return 0
+
+    events = CheckIn.objects.filter(pk__gt=after_id, pk__lte=upto_id).order_by()
+    processed = events.count()
+    if processed:
+        _fold_minutes(events)
+        _fold_daily_visits(events)
+
+    watermark.last_id = upto_id
+    watermark.save(update_fields=['last_id', 'refreshed_at'])
+    return processed
+
+
+def _fold_minutes(events):
+    counts = defaultdict(Counter)
+    rows = events.annotate(bucket=TruncMinute('scanned_at')).values('bucket', 'direction').annotate(n=Count('pk'))
+    for row in rows:
+        counts[row['bucket']][row['direction']] += row['n']
+
+    by_day = defaultdict(dict)
+    for minute, directions in counts.items():
+        by_day[local_day(minute)][minute] = directions
+
+    # Occupancy is a running total per day, so every minute after the
+    # earliest changed one in a touched day may move. Whole days are read
+    # and the changed minutes written back with one upsert.
+    changed = []
+    for day, day_counts in by_day.items():
+        buckets = {
+            bucket.minute: bucket for bucket in OccupancyMinute.objects.filter(
+                minute__gte=day_start(day), minute__lt=day_start(day + timedelta(days=1))
+            )
+        }
+        for minute, directions in day_counts.items():
+            bucket = buckets.setdefault(minute, OccupancyMinute(minute=minute))
+            bucket.entries += directions[CheckIn.Direction.IN]
+            bucket.exits += directions[CheckIn.Direction.OUT]
+
+        inside = 0
+        for minute in sorted(buckets):
+            bucket = buckets[minute]
+            inside += bucket.entries - bucket.exits
+            if minute in day_counts or bucket.occupancy != inside:
+                bucket.occupancy = inside
+                changed.append(bucket)
+
+    OccupancyMinute.objects.bulk_create(
+        changed, batch_size=1000,
+        update_conflicts=True, unique_fields=['minute'], update_fields=['entries', 'exits', 'occupancy'],
+    )
+
+
+def _fold_daily_visits(events):
+    counts = {
+        (row['day'], row['user']): row['n']
+        for row in events.filter(direction=CheckIn.Direction.IN)
+        .annotate(day=TruncDate('scanned_at')).values('day', 'user').annotate(n=Count('pk'))
+    }
+    if not counts:
+        return
+
+    existing = {
+        (row.day, row.user_id): row.visits
+        for row in DailyVisits.objects.filter(
+            day__in={day for day, _ in counts}, user__in={user for _, user in counts}
+        ).only('day', 'user', 'visits')
+    }
+    DailyVisits.objects.bulk_create(
+        [
+            DailyVisits(day=day, user_id=user_id, visits=existing.get((day, user_id), 0) + visits)
+            for (day, user_id), visits in counts.items()
+        ],
+        batch_size=1000,
+        update_conflicts=True, unique_fields=['day', 'user'], update_fields=['visits'],
+    )
+
+
+def current_occupancy(now=None):
+    """Members inside right now: today's rollup plus unprocessed check-ins."""
+    now = now or timezone.now()
+    today = day_start(local_day(now))
+
+    latest = OccupancyMinute.objects.filter(minute__gte=today, minute__lte=now).order_by('-minute').first()
+    inside = latest.occupancy if latest else 0
+
+    last_id = RollupWatermark.objects.filter(name=WATERMARK).values_list('last_id', flat=True).first() or 0
+    tail = CheckIn.objects.filter(pk__gt=last_id, scanned_at__gte=today, scanned_at__lte=now).aggregate(
+        entries=Count('pk', filter=Q(direction=CheckIn.Direction.IN)),
+        exits=Count('pk', filter=Q(direction=CheckIn.Direction.OUT)),
+    )
+    return max(inside + tail['entries'] - tail['exits'], 0)
+
+
+def visits_per_hour(start, end):
+    """``[(hour, entries), ...]`` for ``start <= minute < end``."""
+    return list(
+        OccupancyMinute.objects.filter(minute__gte=start, minute__lt=end)
+        .annotate(hour=TruncHour('minute')).values('hour')
+        .annotate(entries=Sum('entries')).order_by('hour').values_list('hour', 'entries')
+    )
+
+
+def visits_per_day(start, end, user=None):
+    """``[(day, visits), ...]`` for ``start <= day < end``, optionally for one member."""
+    rows = DailyVisits.objects.filter(day__gte=start, day__lt=end)
+    if user is not None:
+        rows = rows.filter(user=user)
+    return list(rows.values('day').annotate(total=Sum('visits')).order_by('day').values_list('day', 'total'))
@@ -0,0 +1,233 @@
+import json
+import threading
+import uuid
+from datetime import datetime, timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from gym_flow.accounts.factories import create_member, create_members
+from gym_flow.checkins import rollups
+from gym_flow.checkins.buffer import CheckInBuffer
+from gym_flow.checkins.models import CheckIn, DailyVisits, OccupancyMinute
+
+UserModel = get_user_model()
+
+
+class CheckInBufferTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_member(password=None)
+
+    def setUp(self):
+        self.buffer = CheckInBuffer(max_size=3, flush_interval=0, dedup_window=10)
+        self.now = timezone.now()
+
+    def checkin(self, seconds=0, user_id=None, direction=CheckIn.Direction.IN, **kwargs):
+        return CheckIn(
+            user_id=user_id or self.user.pk, direction=direction, gate='north',
+            scanned_at=self.now + timedelta(seconds=seconds), **kwargs
+        )
+
+    def test_events_are_written_in_one_batch_on_flush(self):
+        self.assertTrue(self.buffer.add(self.checkin()))
+        self.assertTrue(self.buffer.add(self.checkin(direction=CheckIn.Direction.OUT)))
+        self.assertEqual(CheckIn.objects.count(), 0)
+
+        with self.assertNumQueries(4):  # member lookup, savepoint, insert, release
+            self.assertEqual(self.buffer.flush(), 2)
+        self.assertEqual(CheckIn.objects.count(), 2)
+        self.assertEqual(self.buffer.flush(), 0)
+
+    def test_full_buffer_flushes(self):
+        for minutes in range(3):
+            self.buffer.add(self.checkin(seconds=minutes * 60))
+        self.assertEqual(CheckIn.objects.count(), 3)
+
+    def test_repeated_scan_within_window_is_dropped(self):
+        self.assertTrue(self.buffer.add(self.checkin()))
+        self.assertFalse(self.buffer.add(self.checkin(seconds=5)))
+        self.assertTrue(self.buffer.add(self.checkin(seconds=15)))
+        self.buffer.flush()
+        self.assertEqual(CheckIn.objects.count(), 2)
+
+    def test_unknown_members_and_retried_events_are_skipped(self):
+        event_id = uuid.uuid4()
+        CheckIn.objects.create(user=self.user, gate='north', scanned_at=self.now, event_id=event_id)
+
+        self.buffer.add(self.checkin(seconds=60, event_id=event_id))
+        self.buffer.add(self.checkin(seconds=60, user_id=self.user.pk + 100))
+        self.buffer.flush()
+        self.assertEqual(CheckIn.objects.count(), 1)
+
+    def test_failed_write_keeps_the_batch_queued(self):
+        self.buffer.add(self.checkin())
+        self.buffer.add(self.checkin(direction=CheckIn.Direction.OUT))
+        failure = DatabaseError('connection lost')
+
+        with mock.patch.object(CheckIn.objects, 'bulk_create', side_effect=failure):
+            with self.assertLogs('gym_flow.checkins.buffer', 'ERROR'):
+                # The event that fills the buffer is still accepted.
+                self.assertTrue(self.buffer.add(self.checkin(seconds=60)))
+            with self.assertRaises(DatabaseError):
+                self.buffer.flush()
+
+        self.assertEqual(self.buffer.flush(), 3)
+        self.assertEqual(CheckIn.objects.count(), 3)
+
+    def test_timer_flushes_a_partial_buffer(self):
+        buffer = CheckInBuffer(max_size=100, flush_interval=0.01, dedup_window=10)
+        flushed = threading.Event()
+        with mock.patch.object(buffer, 'flush', side_effect=lambda: flushed.set()):
+            buffer.add(self.checkin())
+            self.assertTrue(flushed.wait(5))
+
+
+@override_settings(CHECKINS_GATE_TOKENS=['gate-secret'])
+class CheckInIngestViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_member(password=None)
+
+    def setUp(self):
+        self.url = reverse('checkin-ingest')
+        self.buffer = CheckInBuffer(max_size=100, flush_interval=0, dedup_window=10)
+        patcher = mock.patch('gym_flow.checkins.views.checkin_buffer', return_value=self.buffer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def post(self, payload, token='gate-secret'):
+        return self.client.post(self.url, json.dumps(payload), content_type='application/json', HTTP_X_GATE_TOKEN=token)
+
+    def test_batch_is_queued_and_duplicates_counted(self):
+        response = self.post({'events': [
+            {'user_id': self.user.pk, 'gate': 'north', 'scanned_at': '2025-03-20T08:00:00Z'},
+            {'user_id': self.user.pk, 'gate': 'north', 'scanned_at': '2025-03-20T08:00:02Z'},
+            {'user_id': self.user.pk, 'gate': 'north', 'direction': 'out', 'scanned_at': '2025-03-20T09:00:00Z'},
+        ]})
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.json(), {'accepted': 2, 'duplicates': 1})
+        self.buffer.flush()
+        self.assertEqual(list(CheckIn.objects.order_by('scanned_at').values_list('direction', flat=True)), ['in', 'out'])
+
+    def test_single_event_defaults_to_now(self):
+        response = self.post({'user_id': self.user.pk, 'gate': 'kiosk-1'})
+        self.assertEqual(response.status_code, 202)
+        self.buffer.flush()
+        self.assertEqual(CheckIn.objects.get().direction, CheckIn.Direction.IN)
+
+    def test_invalid_events_are_rejected(self):
+        self.assertEqual(self.post({'gate': 'north'}).status_code, 400)
+        self.assertEqual(self.post({'user_id': self.user.pk, 'gate': 'north', 'direction': 'up'}).status_code, 400)
+        self.assertEqual(self.post({'user_id': self.user.pk, 'gate': 'north', 'scanned_at': 'noon'}).status_code, 400)
+        self.assertEqual(self.post({'events': ['x']}).status_code, 400)
+
+    def test_gate_token_is_required(self):
+        self.assertEqual(self.post({'user_id': self.user.pk, 'gate': 'north'}, token='wrong').status_code, 403)
+
+
+@override_settings(CHECKINS_ROLLUP_LAG=0)
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.ann, cls.bob = create_members(2, password=None)
+
+    def setUp(self):
+        self.morning = timezone.make_aware(datetime(2025, 3, 20, 8, 0))
+
+    def scan(self, user, minutes, direction=CheckIn.Direction.IN):
+        return CheckIn.objects.create(
+            user=user, direction=direction, gate='north', scanned_at=self.morning + timedelta(minutes=minutes)
+        )
+
+    def occupancy(self):
+        return list(OccupancyMinute.objects.order_by('minute').values_list('entries', 'exits', 'occupancy'))
+
+    def test_refresh_folds_only_new_checkins(self):
+        self.scan(self.ann, 0)
+        self.scan(self.bob, 0)
+        self.assertEqual(rollups.refresh(), 2)
+        self.assertEqual(self.occupancy(), [(2, 0, 2)])
+
+        self.scan(self.ann, 30, CheckIn.Direction.OUT)
+        self.assertEqual(rollups.refresh(), 1)
+        self.assertEqual(rollups.refresh(), 0)
+        self.assertEqual(self.occupancy(), [(2, 0, 2), (0, 1, 1)])
+        self.assertEqual(rollups.current_occupancy(self.morning + timedelta(hours=1)), 1)
+
+    def test_late_scan_updates_later_minutes(self):
+        self.scan(self.ann, 0)
+        self.scan(self.ann, 60, CheckIn.Direction.OUT)
+        rollups.refresh()
+
+        self.scan(self.bob, 30)
+        rollups.refresh()
+        self.assertEqual(self.occupancy(), [(1, 0, 1), (1, 0, 2), (0, 1, 1)])
+
+    def test_occupancy_resets_each_day(self):
+        self.scan(self.ann, 0)
+        self.scan(self.bob, 24 * 60)
+        rollups.refresh()
+        self.assertEqual([row[2] for row in self.occupancy()], [1, 1])
+
+    def test_daily_visits_and_queries(self):
+        self.scan(self.ann, 0)
+        self.scan(self.ann, 120)
+        self.scan(self.bob, 90)
+        self.scan(self.bob, 24 * 60)
+        rollups.refresh()
+        self.scan(self.ann, 180)
+        rollups.refresh()
+
+        day = self.morning.date()
+        self.assertEqual(DailyVisits.objects.get(day=day, user=self.ann).visits, 3)
+        self.assertEqual(rollups.visits_per_day(day, day + timedelta(days=2)), [(day, 4), (day + timedelta(days=1), 1)])
+        self.assertEqual(rollups.visits_per_day(day, day + timedelta(days=2), user=self.bob)[0], (day, 1))
+        self.assertEqual(
+            [entries for _, entries in rollups.visits_per_hour(self.morning, self.morning + timedelta(days=1))],
+            [1, 1, 1, 1],
+        )
+
+    def test_current_occupancy_includes_unprocessed_checkins(self):
+        self.scan(self.ann, 0)
+        rollups.refresh()
+        self.scan(self.bob, 5)
+        self.assertEqual(rollups.current_occupancy(self.morning + timedelta(minutes=10)), 2)
+
+    def test_recent_checkins_wait_for_the_lag(self):
+        self.scan(self.ann, 0)
+        with override_settings(CHECKINS_ROLLUP_LAG=60):
+            self.assertEqual(rollups.refresh(), 0)
+        self.assertEqual(rollups.refresh(), 1)
+
+    def test_rebuild_matches_incremental_refresh(self):
+        for minutes in range(0, 300, 7):
+            self.scan(self.ann if minutes % 2 else self.bob, minutes, 'in' if minutes % 3 else 'out')
+            if minutes % 5 == 0:
+                rollups.refresh(chunk_size=2)
+        rollups.refresh()
+        incremental = self.occupancy(), list(DailyVisits.objects.values_list('day', 'user', 'visits'))
+
+        out = StringIO()
+        call_command('refresh_rollups', '--rebuild', stdout=out)
+        self.assertIn('Rebuilt rollups from 43 check-ins', out.getvalue())
+        self.assertEqual((self.occupancy(), list(DailyVisits.objects.values_list('day', 'user', 'visits'))), incremental)
+
+    def test_occupancy_endpoint_is_for_staff(self):
+        url = reverse('checkin-occupancy')
+        self.client.force_login(self.ann)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.client.force_login(create_member(password=None, is_staff=True))
+        CheckIn.objects.create(user=self.ann, gate='north', scanned_at=timezone.now())
+        rollups.refresh()
+        data = self.client.get(url).json()
+        self.assertEqual(data['occupancy'], 1)
+        self.assertEqual(data['visits_per_hour'][0]['entries'], 1)
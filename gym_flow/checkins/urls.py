@@ -0,0 +1,8 @@
+from django.urls import path
+
+from gym_flow.checkins import views
+
+urlpatterns = [
+    path('', views.CheckInIngestView.as_view(), name='checkin-ingest'),
+    path('occupancy/', views.OccupancyView.as_view(), name='checkin-occupancy'),
+]
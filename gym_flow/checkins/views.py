@@ -0,0 +1,95 @@
+import json
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.mixins import UserPassesTestMixin
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.crypto import constant_time_compare
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from gym_flow.checkins import rollups
+from gym_flow.checkins.buffer import checkin_buffer
+from gym_flow.checkins.models import CheckIn
+
+GATE_TOKEN_HEADER = 'X-Gate-Token'
+
+
+def parse_event(event):
+    """Build an unsaved CheckIn from a decoded event, raising ValueError."""
+    if not isinstance(event, dict):
+        raise ValueError("Each event must be an object.")
+    if 'user_id' not in event:
+        raise ValueError("Every event needs a user_id.")
+
+    direction = event.get('direction', CheckIn.Direction.IN)
+    if direction not in CheckIn.Direction.values:
+        raise ValueError(f"Unknown direction {direction!r}.")
+
+    gate = event.get('gate')
+    if not isinstance(gate, str) or not gate or len(gate) > CheckIn._meta.get_field('gate').max_length:
+        raise ValueError("A gate identifier is required.")
+
+    scanned_at = timezone.now()
+    if event.get('scanned_at'):
+        scanned_at = parse_datetime(str(event['scanned_at']))
+        if scanned_at is None:
+            raise ValueError("scanned_at must be an ISO 8601 timestamp.")
+        if timezone.is_naive(scanned_at):
+            scanned_at = timezone.make_aware(scanned_at)
+
+    return CheckIn(
+        user_id=int(event['user_id']),
+        direction=direction,
+        gate=gate,
+        scanned_at=scanned_at,
+        event_id=uuid.UUID(str(event['event_id'])) if event.get('event_id') else None,
+    )
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class CheckInIngestView(View):
+    """
+    Accepts ``{"events": [...]}`` or a single event from turnstiles and
+    kiosks. Events are buffered and written in batches, so a 202 means
+    queued, not stored.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        token = request.headers.get(GATE_TOKEN_HEADER, '')
+        if not any(constant_time_compare(token, allowed) for allowed in settings.CHECKINS_GATE_TOKENS):
+            return JsonResponse({'error': "Invalid gate token."}, status=403)
+
+        try:
+            payload = json.loads(request.body)
+            events = payload['events'] if isinstance(payload, dict) and 'events' in payload else [payload]
+            checkins = [parse_event(event) for event in events]
+        except (ValueError, TypeError, KeyError) as exc:
+            return JsonResponse({'error': str(exc) or "Malformed check-in payload."}, status=400)
+
+        buffer = checkin_buffer()
+        accepted = sum(buffer.add(checkin) for checkin in checkins)
+        return JsonResponse({'accepted': accepted, 'duplicates': len(checkins) - accepted}, status=202)
+
+
+class OccupancyView(UserPassesTestMixin, View):
+    """Dashboard numbers for staff, read from the rollups."""
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request, *args, **kwargs):
+        now = timezone.now()
+        today = rollups.day_start(rollups.local_day(now))
+        return JsonResponse({
+            'occupancy': rollups.current_occupancy(now),
+            'visits_per_hour': [
+                {'hour': hour, 'entries': entries}
+                for hour, entries in rollups.visits_per_hour(today, today + timedelta(days=1))
+            ],
+        })
@@ -1,3 +1,75 @@
 from django.contrib import admin
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.views.main import ChangeList
+from django.core.exceptions import ValidationError
 
-# Register your models here.
+from gym_flow.common.pagination import EstimatedCountPaginator
+
+CURSOR_VAR = 'cursor'
+
+
+class KeysetChangeList(ChangeList):
+    """
+    Changelist that pages by primary key instead of OFFSET while it is sorted
+    by primary key only, so the hundredth page costs the same as the first.
+    Sorting by any other column falls back to the regular numbered pages.
+    """
+
+    def get_queryset(self, request, exclude_parameters=None):
+        # The cursor is not a lookup and must not leak into sort/filter links.
+        self.cursor = request.GET.get(CURSOR_VAR)
+        self.params.pop(CURSOR_VAR, None)
+        self.filter_params.pop(CURSOR_VAR, None)
+        queryset = super().get_queryset(request, exclude_parameters)
+        if self.model_admin.list_only:
+            queryset = queryset.only(*self.model_admin.list_only)
+        return queryset
+
+    def get_results(self, request):
+        # The admin's own ordering can appear more than once in order_by.
+        ordering = set(self.queryset.query.order_by)
+        self.keyset = ordering in ({'pk'}, {'-pk'}) and not self.show_all
+        if not self.keyset:
+            return super().get_results(request)
+
+        queryset = self.queryset
+        if self.cursor:
+            try:
+                pk = self.lookup_opts.pk.to_python(self.cursor)
+            except ValidationError:
+                raise IncorrectLookupParameters
+            queryset = queryset.filter(pk__lt=pk) if ordering == {'-pk'} else queryset.filter(pk__gt=pk)
+
+        rows = list(queryset[:self.list_per_page + 1])
+        result_list = rows[:self.list_per_page]
+        self.next_cursor = result_list[-1].pk if len(rows) > self.list_per_page else None
+
+        self.paginator = self.model_admin.get_paginator(request, self.queryset, self.list_per_page)
+        self.result_count = self.paginator.count
+        self.show_full_result_count = self.model_admin.show_full_result_count
+        self.full_result_count = self.root_queryset.count() if self.show_full_result_count else None
+        self.show_admin_actions = not self.show_full_result_count or bool(self.full_result_count)
+        self.result_list = result_list
+        self.can_show_all = False
+        self.multi_page = bool(self.cursor or self.next_cursor)
+
+    def first_page_url(self):
+        return self.get_query_string(remove=[CURSOR_VAR])
+
+    def next_page_url(self):
+        return self.get_query_string({CURSOR_VAR: self.next_cursor})
+
+
+class KeysetPaginationMixin:
+    """
+    ModelAdmin mixin for large tables: keyset pages, estimated counts and,
+    through ``list_only``, a column projection for the changelist rows.
+    ``list_editable`` is not supported since rows are not a queryset.
+    """
+    change_list_template = 'admin/keyset_change_list.html'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    list_only = ()
+
+    def get_changelist(self, request, **kwargs):
+        return KeysetChangeList
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'gym_flow.common'
+
+    def ready(self):
+        import gym_flow.common.checks
@@ -0,0 +1,204 @@
+import asyncio
+import hashlib
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction, sync_to_async
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import urlencode
+
+from gym_flow.accounts.utils import aresolve_user
+
+PAGE_CACHE_VERSION_KEY = 'common:page:version'
+
+
+def page_cache():
+    return caches[settings.COMMON_PAGE_CACHE_ALIAS]
+
+
+def page_cache_version(cache):
+    cache.add(PAGE_CACHE_VERSION_KEY, 1, None)
+    return cache.get(PAGE_CACHE_VERSION_KEY, 1)
+
+
+async def apage_cache_version(cache):
+    await cache.aadd(PAGE_CACHE_VERSION_KEY, 1, None)
+    return await cache.aget(PAGE_CACHE_VERSION_KEY, 1)
+
+
+def purge_page_cache():
+    """
+    Invalidate every cached page, e.g. after a deploy. Pages are invalidated
+    by bumping the version in their keys, so nothing has to be enumerated.
+    """
+    cache = page_cache()
+    cache.set(PAGE_CACHE_VERSION_KEY, page_cache_version(cache) + 1, None)
+
+
+def page_cache_key(request, version, query_params=()):
+    # Only the listed query parameters are part of the key; any other query
+    # string would otherwise let every visitor create entries at will.
+    query = urlencode(sorted(
+        (name, value) for name in query_params for value in request.GET.getlist(name)
+    ))
+    url = request.build_absolute_uri(request.path) + (f'?{query}' if query else '')
+    path = hashlib.md5(url.encode(), usedforsecurity=False).hexdigest()
+    return f'common:page:v{version}:{request.method}:{path}'
+
+
+def is_cacheable(request, response):
+    return (
+        response.status_code == 200
+        and not response.streaming
+        and not response.cookies
+        # The page rendered a CSRF token, which is specific to this visitor.
+        and not request.META.get('CSRF_COOKIE_NEEDS_UPDATE')
+    )
+
+
+def is_fresh(entry):
+    return entry is not None and entry['fresh_until'] > time.time()
+
+
+def make_entry(response):
+    return {
+        'fresh_until': time.time() + settings.COMMON_PAGE_CACHE_TIMEOUT,
+        'content': response.content,
+        'status': response.status_code,
+        'headers': dict(response.headers),
+    }
+
+
+def entry_timeout():
+    return settings.COMMON_PAGE_CACHE_TIMEOUT + settings.COMMON_PAGE_CACHE_STALE_TIMEOUT
+
+
+def cached_response(entry):
+    return HttpResponse(entry['content'], status=entry['status'], headers=entry['headers'])
+
+
+def cache_anonymous_page(view=None, *, query_params=()):
+    """
+    Cache the rendered page for anonymous GET/HEAD requests. Works for both
+    sync and async views, as ``@cache_anonymous_page`` or
+    ``@cache_anonymous_page(query_params=('page',))`` for a view whose output
+    depends on those query parameters; all others are ignored.
+
+    Authenticated requests always reach the view. Entries stay fresh for
+    ``COMMON_PAGE_CACHE_TIMEOUT`` seconds and may then be served stale for
+    another ``COMMON_PAGE_CACHE_STALE_TIMEOUT`` seconds while one request,
+    holding a short lock, renders the replacement. Concurrent misses wait for
+    that request instead of all rendering the page at once.
+    """
+    if view is None:
+        return lambda view: cache_anonymous_page(view, query_params=query_params)
+    if iscoroutinefunction(view):
+        return async_cache_anonymous_page(view, query_params)
+
+    def render_and_store(cache, key, request, *args, **kwargs):
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response = response.render()
+        if is_cacheable(request, response):
+            cache.set(key, make_entry(response), entry_timeout())
+        return response
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or request.user.is_authenticated:
+            return view(request, *args, **kwargs)
+
+        cache = page_cache()
+        key = page_cache_key(request, page_cache_version(cache), query_params)
+        lock_key = f'{key}:lock'
+        lock_timeout = settings.COMMON_PAGE_CACHE_LOCK_TIMEOUT
+
+        entry = cache.get(key)
+        if is_fresh(entry):
+            response = cached_response(entry)
+        elif cache.add(lock_key, 1, lock_timeout):
+            try:
+                response = render_and_store(cache, key, request, *args, **kwargs)
+            finally:
+                cache.delete(lock_key)
+        elif entry is not None:
+            response = cached_response(entry)
+        else:
+            entry = wait_for_entry(cache, key, lock_timeout)
+            if entry is not None:
+                response = cached_response(entry)
+            else:
+                response = render_and_store(cache, key, request, *args, **kwargs)
+
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    return wrapper
+
+
+def async_cache_anonymous_page(view, query_params=()):
+    async def render_and_store(cache, key, request, *args, **kwargs):
+        response = await view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            # Template rendering and context processors are sync code.
+            response = await sync_to_async(response.render)()
+        if is_cacheable(request, response):
+            await cache.aset(key, make_entry(response), entry_timeout())
+        return response
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD') or (await aresolve_user(request)).is_authenticated:
+            return await view(request, *args, **kwargs)
+
+        cache = page_cache()
+        key = page_cache_key(request, await apage_cache_version(cache), query_params)
+        lock_key = f'{key}:lock'
+        lock_timeout = settings.COMMON_PAGE_CACHE_LOCK_TIMEOUT
+
+        entry = await cache.aget(key)
+        if is_fresh(entry):
+            response = cached_response(entry)
+        elif await cache.aadd(lock_key, 1, lock_timeout):
+            try:
+                response = await render_and_store(cache, key, request, *args, **kwargs)
+            finally:
+                await cache.adelete(lock_key)
+        elif entry is not None:
+            response = cached_response(entry)
+        else:
+            entry = await await_entry(cache, key, lock_timeout)
+            if entry is not None:
+                response = cached_response(entry)
+            else:
+                response = await render_and_store(cache, key, request, *args, **kwargs)
+
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    return wrapper
+
+
+def wait_for_entry(cache, key, timeout):
+    # Another request holds the lock and is rendering this page.
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry
+    return None
+
+
+async def await_entry(cache, key, timeout):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await cache.aget(key)
+        if entry is not None:
+            return entry
+    return None
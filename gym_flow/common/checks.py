@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+W001 = Warning(
+    "DEBUG is on, which keeps every SQL query in memory and renders expensive error pages.",
+    id='common.W001',
+)
+W002 = Warning(
+    "The default database opens a new connection for every request.",
+    hint="Set CONN_MAX_AGE (DB_CONN_MAX_AGE) or enable a connection pool (DB_POOL_MAX_SIZE).",
+    id='common.W002',
+)
+W003 = Warning(
+    "The default cache is local to each process or disabled, so cached pages, users and sessions "
+    "are not shared between workers.",
+    hint="Use a shared backend such as Redis or Memcached.",
+    id='common.W003',
+)
+W004 = Warning(
+    "Sessions are read from and written to the database on every request.",
+    hint="Use a cache-backed SESSION_ENGINE.",
+    id='common.W004',
+)
+W005 = Warning(
+    "Templates are not loaded through the cached template loader.",
+    id='common.W005',
+)
+W006 = Warning(
+    "Static files are not stored with hashed names, so browsers cannot cache them long-term.",
+    hint="Use a ManifestStaticFilesStorage-based STORAGES['staticfiles'] backend.",
+    id='common.W006',
+)
+W007 = Warning(
+    "Templates are compiled lazily on the first request of each worker.",
+    hint="Set TEMPLATES_WARM_ON_STARTUP = True.",
+    id='common.W007',
+)
+W008 = Warning(
+    "Media files are sent by the application server, which under ASGI reads each file into memory first.",
+    hint="Set COMMON_MEDIA_SENDFILE_HEADER (MEDIA_SENDFILE_HEADER) so the web server sends them.",
+    id='common.W008',
+)
+
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+def uses_cached_template_loader():
+    for engine in settings.TEMPLATES:
+        for loader in engine.get('OPTIONS', {}).get('loaders', []):
+            name = loader[0] if isinstance(loader, (list, tuple)) else loader
+            if name == 'django.template.loaders.cached.Loader':
+                return True
+    return False
+
+
+@register('performance', deploy=True)
+def check_performance_settings(app_configs, **kwargs):
+    """
+    Flag settings that are fine for development but slow in production.
+    Reported by ``manage.py check --deploy``.
+    """
+    errors = []
+    database = settings.DATABASES['default']
+
+    if settings.DEBUG:
+        errors.append(W001)
+    if not database.get('CONN_MAX_AGE') and not database.get('OPTIONS', {}).get('pool'):
+        errors.append(W002)
+    if settings.CACHES['default']['BACKEND'] in LOCAL_CACHE_BACKENDS:
+        errors.append(W003)
+    if settings.SESSION_ENGINE == 'django.contrib.sessions.backends.db':
+        errors.append(W004)
+    if not uses_cached_template_loader():
+        errors.append(W005)
+    if 'Manifest' not in settings.STORAGES['staticfiles']['BACKEND']:
+        errors.append(W006)
+    if not settings.TEMPLATES_WARM_ON_STARTUP:
+        errors.append(W007)
+    if not settings.COMMON_MEDIA_SENDFILE_HEADER:
+        errors.append(W008)
+    return errors
@@ -0,0 +1,86 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from benchmarks import bench_request_paths as suite
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test the home, register, login, logout and profile-edit request paths and report "
+        "throughput, latency percentiles and queries per request. See benchmarks.bench_request_paths."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--scenario', action='append', choices=list(suite.SCENARIOS), dest='scenarios',
+            help="Run only this scenario; repeat for several. Defaults to all.",
+        )
+        parser.add_argument('--requests', type=int, default=200, help="Timed requests per scenario.")
+        parser.add_argument('--concurrency', type=int, default=1, help="Worker threads, one member each.")
+        parser.add_argument('--warmup', type=int, default=10, help="Untimed requests per worker first.")
+        parser.add_argument('--output', help="Save the results as JSON to this file.")
+        parser.add_argument(
+            '--compare', nargs='+', metavar='RESULTS',
+            help="Compare this run to a saved BASELINE, or two saved runs: BASELINE CURRENT.",
+        )
+        parser.add_argument('--threshold', type=float, default=10.0, help="Allowed slowdown in percent.")
+
+    def handle(self, *args, compare, threshold, output, **options):
+        if compare and len(compare) > 2:
+            raise CommandError("--compare takes a baseline and, optionally, a second results file.")
+
+        if compare and len(compare) == 2:
+            current = self.load(compare[1])
+        else:
+            if options['requests'] < 1 or options['concurrency'] < 1:
+                raise CommandError("--requests and --concurrency must be positive.")
+            self.stdout.write(
+                f"{'scenario':<14} {'requests':>8} {'errors':>6} {'req/s':>8}"
+                f" {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>7}"
+            )
+            current = suite.run_suite(
+                scenarios=options['scenarios'] or tuple(suite.SCENARIOS),
+                requests=options['requests'],
+                concurrency=options['concurrency'],
+                warmup=options['warmup'],
+                progress=self.report,
+            )
+            failed = suite.failed_scenarios(current)
+            if failed:
+                raise CommandError(
+                    f"Requests failed in {', '.join(failed)}; the timings are not comparable and were not saved."
+                )
+            if output:
+                with open(output, 'w') as results:
+                    json.dump(current, results, indent=2)
+                self.stdout.write(f"Saved results to {output}.")
+
+        if compare:
+            self.compare(self.load(compare[0]), current, threshold)
+
+    def report(self, scenario, stats):
+        self.stdout.write(
+            f"{scenario:<14} {stats['requests']:>8} {stats['errors']:>6} {stats['throughput_rps']:>8.1f}"
+            f" {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} {stats['p99_ms']:>8.1f}"
+            f" {stats['queries_per_request']:>7.1f}"
+        )
+
+    def load(self, path):
+        try:
+            with open(path) as results:
+                return json.load(results)
+        except (OSError, ValueError) as error:
+            raise CommandError(f"Cannot read results from {path}: {error}")
+
+    def compare(self, baseline, current, threshold):
+        rows = suite.compare(baseline, current, threshold)
+        self.stdout.write(f"\n{'scenario':<14} {'metric':<20} {'baseline':>10} {'current':>10} {'change':>8}")
+        for scenario, metric, old, new, change, regressed in rows:
+            line = f"{scenario:<14} {metric:<20} {old:>10.1f} {new:>10.1f} {change:>+7.1f}%"
+            self.stdout.write(self.style.ERROR(f"{line}  REGRESSION") if regressed else line)
+
+        regressions = sum(row[-1] for row in rows)
+        if regressions:
+            raise CommandError(f"{regressions} regression(s) beyond {threshold:g}% against the baseline.")
+        self.stdout.write(self.style.SUCCESS(f"No regressions beyond {threshold:g}%."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from gym_flow.common.cache import purge_page_cache
+
+
+class Command(BaseCommand):
+    help = "Invalidate cached pages. Run after every deploy."
+
+    def handle(self, *args, **options):
+        purge_page_cache()
+        self.stdout.write(self.style.SUCCESS("Page cache purged."))
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils.module_loading import import_string
+
+from gym_flow.common.sessions import SessionStore
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete expired sessions in small batches instead of one long DELETE. "
+        "Cached entries expire from the cache on their own."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--pause', type=float, default=0, help="Seconds to sleep between batches.")
+
+    def handle(self, *args, batch_size, pause, **options):
+        engine = import_string(f'{settings.SESSION_ENGINE}.SessionStore')
+        if not issubclass(engine, SessionStore):
+            raise CommandError(f"{settings.SESSION_ENGINE} does not support batched purges; use clearsessions.")
+
+        deleted = engine.clear_expired(
+            batch_size=batch_size,
+            pause=pause,
+            progress=lambda count: self.stdout.write(f"{count} expired sessions deleted"),
+        )
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired sessions."))
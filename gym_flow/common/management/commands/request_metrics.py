@@ -0,0 +1,43 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from gym_flow.common import metrics
+
+
+class Command(BaseCommand):
+    help = (
+        "Show rolling per-view latency, SQL and template percentiles recorded by "
+        "RequestMetricsMiddleware across all running processes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sort', choices=metrics.METRICS, default='total_ms', help="Order views by this p95.")
+        parser.add_argument('--json', action='store_true', help="Print the raw percentiles as JSON.")
+        parser.add_argument('--reset', action='store_true', help="Discard all published samples.")
+
+    def handle(self, *args, sort, reset, **options):
+        if reset:
+            metrics.reset()
+            self.stdout.write(self.style.SUCCESS("Request metrics reset."))
+            return
+
+        report = metrics.collect()
+        if options['json']:
+            self.stdout.write(json.dumps(report, indent=2))
+            return
+        if not report:
+            self.stdout.write("No requests recorded. Is COMMON_REQUEST_METRICS enabled?")
+            return
+
+        self.stdout.write(
+            f"{'view':<32} {'requests':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}"
+            f" {'sql p50':>7} {'sql p95':>7} {'sql ms p95':>10} {'tpl ms p95':>10}"
+        )
+        for view, stats in sorted(report.items(), key=lambda item: -item[1][sort]['p95']):
+            total = stats['total_ms']
+            self.stdout.write(
+                f"{view:<32} {stats['requests']:>8} {total['p50']:>8.1f} {total['p95']:>8.1f} {total['p99']:>8.1f}"
+                f" {stats['sql_count']['p50']:>7} {stats['sql_count']['p95']:>7}"
+                f" {stats['sql_ms']['p95']:>10.1f} {stats['template_ms']['p95']:>10.1f}"
+            )
@@ -0,0 +1,63 @@
+import time
+from collections import defaultdict
+from unittest import mock
+
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand
+from django.template import RequestContext
+from django.template.loader_tags import IncludeNode
+from django.test import RequestFactory
+
+from gym_flow.common.templates import compile_template, django_engine, project_templates
+
+
+class Command(BaseCommand):
+    help = (
+        "Report compile and render times for every project template, and the "
+        "time spent in each {% include %} while rendering them."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=100)
+
+    def handle(self, *args, iterations, **options):
+        engine = django_engine()
+        include_times = defaultdict(float)
+        include_calls = defaultdict(int)
+        include_render = IncludeNode.render
+
+        def timed_include(node, context):
+            started = time.perf_counter()
+            try:
+                return include_render(node, context)
+            finally:
+                name = node.template.token.strip('\'"')
+                include_times[name] += time.perf_counter() - started
+                include_calls[name] += 1
+
+        self.stdout.write(f"{'template':<36} {'compile ms':>10} {'render ms':>10}")
+        with mock.patch.object(IncludeNode, 'render', timed_include):
+            for name in project_templates(engine):
+                compile_ms = compile_template(name, engine) * 1000
+                template = engine.get_template(name)
+                try:
+                    render_ms = self.time_render(template, iterations) * 1000
+                except Exception as exc:
+                    self.stdout.write(f"{name:<36} {compile_ms:>10.3f} {'error':>10}  ({type(exc).__name__}: {exc})")
+                    continue
+                self.stdout.write(f"{name:<36} {compile_ms:>10.3f} {render_ms:>10.3f}")
+
+        if include_times:
+            self.stdout.write(f"\n{'include':<36} {'calls':>10} {'total ms':>10} {'ms/call':>10}")
+            for name, seconds in sorted(include_times.items(), key=lambda item: -item[1]):
+                calls = include_calls[name]
+                self.stdout.write(f"{name:<36} {calls:>10} {seconds * 1000:>10.3f} {seconds * 1000 / calls:>10.4f}")
+
+    def time_render(self, template, iterations):
+        request = RequestFactory().get('/')
+        request.user = AnonymousUser()
+
+        started = time.perf_counter()
+        for _ in range(iterations):
+            template.render(RequestContext(request))
+        return (time.perf_counter() - started) / iterations
@@ -0,0 +1,220 @@
+"""
+Per-view request metrics collected by ``RequestMetricsMiddleware``.
+
+For every request the middleware records total latency, the number and
+duration of SQL queries and the time spent rendering templates (which
+includes any queries the templates trigger), keyed by the resolved URL name.
+Each process keeps the last ``COMMON_REQUEST_METRICS_WINDOW`` samples per
+view and publishes them to the cache every
+``COMMON_REQUEST_METRICS_PUBLISH_INTERVAL`` seconds; ``collect()`` merges
+what every live process published into rolling percentiles.
+
+A request that runs the same SQL statement ``COMMON_N_PLUS_ONE_THRESHOLD``
+times or more is logged as a likely N+1 query.
+"""
+import logging
+import os
+import socket
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from contextvars import ContextVar
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.template.backends.django import Template
+
+logger = logging.getLogger(__name__)
+
+METRICS = ('total_ms', 'sql_count', 'sql_ms', 'template_ms')
+REGISTRY_KEY = 'common:metrics:processes'
+# Published samples of a process that stopped publishing expire after this.
+PROCESS_TIMEOUT = 300
+
+_current = ContextVar('gym_flow_request_sample', default=None)
+
+
+class RequestSample:
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.statements = Counter()
+        self.rendering = False
+
+    def activate(self):
+        return _current.set(self)
+
+    @staticmethod
+    def deactivate(token):
+        _current.reset(token)
+
+
+def sql_wrapper(execute, sql, params, many, context):
+    sample = _current.get()
+    if sample is None:
+        return execute(sql, params, many, context)
+
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        sample.sql_time += time.perf_counter() - started
+        sample.sql_count += 1
+        sample.statements[sql] += 1
+
+
+def _add_sql_wrapper(connection, **kwargs):
+    if sql_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(sql_wrapper)
+
+
+def _timed_render(render):
+    @wraps(render)
+    def wrapper(self, context=None, request=None):
+        sample = _current.get()
+        # Only the outermost render is timed; includes are part of it.
+        if sample is None or sample.rendering:
+            return render(self, context, request)
+
+        sample.rendering = True
+        started = time.perf_counter()
+        try:
+            return render(self, context, request)
+        finally:
+            sample.template_time += time.perf_counter() - started
+            sample.rendering = False
+
+    wrapper.timed = True
+    return wrapper
+
+
+_installed = False
+_install_lock = threading.Lock()
+
+
+def install():
+    """Hook SQL execution and template rendering; safe to call repeatedly."""
+    global _installed
+
+    with _install_lock:
+        if _installed:
+            return
+        # Connections get the wrapper as they connect; this covers the ones
+        # this thread already opened.
+        connection_created.connect(_add_sql_wrapper, dispatch_uid='gym_flow.common.metrics')
+        for connection in connections.all(initialized_only=True):
+            _add_sql_wrapper(connection)
+        if not getattr(Template.render, 'timed', False):
+            Template.render = _timed_render(Template.render)
+        _installed = True
+
+
+def percentiles(values):
+    values = sorted(values)
+    if not values:
+        return {}
+    pick = lambda pct: values[min(len(values) - 1, int(len(values) * pct / 100))]
+    return {'p50': pick(50), 'p95': pick(95), 'p99': pick(99), 'max': values[-1]}
+
+
+class MetricsStore:
+    def __init__(self, window, publish_interval, cache_alias):
+        self.window = window
+        self.publish_interval = publish_interval
+        self.cache_alias = cache_alias
+        self.key = f'common:metrics:{socket.gethostname()}:{os.getpid()}'
+        self.samples = defaultdict(lambda: deque(maxlen=self.window))
+        self.lock = threading.Lock()
+        self.published_at = time.monotonic()
+
+    def record(self, view, sample, total):
+        row = (
+            round(total * 1000, 3),
+            sample.sql_count,
+            round(sample.sql_time * 1000, 3),
+            round(sample.template_time * 1000, 3),
+        )
+        with self.lock:
+            self.samples[view].append(row)
+            due = time.monotonic() - self.published_at >= self.publish_interval
+            if due:
+                self.published_at = time.monotonic()
+        if due:
+            self.publish()
+
+    def publish(self):
+        with self.lock:
+            snapshot = {view: list(rows) for view, rows in self.samples.items()}
+
+        cache = caches[self.cache_alias]
+        cache.set(self.key, snapshot, PROCESS_TIMEOUT)
+        now = time.time()
+        # Read-modify-write: a process dropped by a concurrent update is
+        # added back on its next publish.
+        registry = {
+            key: seen for key, seen in (cache.get(REGISTRY_KEY) or {}).items() if now - seen < PROCESS_TIMEOUT
+        }
+        registry[self.key] = now
+        cache.set(REGISTRY_KEY, registry, None)
+
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def metrics_store():
+    global _store
+
+    with _store_lock:
+        if _store is None:
+            _store = MetricsStore(
+                window=settings.COMMON_REQUEST_METRICS_WINDOW,
+                publish_interval=settings.COMMON_REQUEST_METRICS_PUBLISH_INTERVAL,
+                cache_alias=settings.COMMON_REQUEST_METRICS_CACHE_ALIAS,
+            )
+        return _store
+
+
+def record(view, sample, total):
+    metrics_store().record(view, sample, total)
+
+    statement, repeats = max(sample.statements.items(), key=lambda item: item[1], default=(None, 0))
+    if repeats >= settings.COMMON_N_PLUS_ONE_THRESHOLD:
+        logger.warning(
+            "Possible N+1 query in %s: %d of %d queries were %s",
+            view, repeats, sample.sql_count, statement[:300],
+        )
+
+
+def collect():
+    """
+    Return ``{view: {'requests': n, 'total_ms': {'p50': ...}, ...}}`` over
+    the samples every live process has published.
+    """
+    if _store is not None:
+        _store.publish()
+
+    cache = caches[settings.COMMON_REQUEST_METRICS_CACHE_ALIAS]
+    merged = defaultdict(list)
+    for snapshot in cache.get_many(list(cache.get(REGISTRY_KEY) or {})).values():
+        for view, rows in snapshot.items():
+            merged[view].extend(rows)
+
+    return {
+        view: {'requests': len(rows)} | {
+            metric: percentiles(row[index] for row in rows) for index, metric in enumerate(METRICS)
+        }
+        for view, rows in sorted(merged.items())
+    }
+
+
+def reset():
+    cache = caches[settings.COMMON_REQUEST_METRICS_CACHE_ALIAS]
+    cache.delete_many(list(cache.get(REGISTRY_KEY) or {}) + [REGISTRY_KEY])
+    if _store is not None:
+        with _store.lock:
+            _store.samples.clear()
@@ -0,0 +1,177 @@
+import json
+import mimetypes
+import os
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+from gym_flow.common import metrics
+
+# In order of preference when the client accepts several.
+ENCODINGS = (
+    ('br', '.br'),
+    ('gzip', '.gz'),
+)
+
+
+def accepted_encodings(header):
+    accepted = set()
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        if params.replace(' ', '') not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+            accepted.add(coding.strip().lower())
+    return accepted
+
+
+async def aread_chunks(file, chunk_size):
+    read = sync_to_async(file.read, thread_sensitive=False)
+    while chunk := await read(chunk_size):
+        yield chunk
+
+
+class StaticFilesMiddleware:
+    """
+    Serve collected static files from ``STATIC_ROOT`` when no CDN or web
+    server sits in front of the app (``COMMON_SERVE_STATIC``).
+
+    Files are indexed once at startup. Fingerprinted names from the static
+    manifest are served with a one-year ``immutable`` Cache-Control; other
+    files get ``COMMON_STATIC_MAX_AGE``. Precompressed ``.br``/``.gz``
+    siblings are served when the client accepts them. Under ASGI the stat,
+    open and reads run in worker threads and the body is streamed, rather
+    than the ASGI handler buffering the whole file.
+    """
+    sync_capable = True
+    async_capable = True
+
+    immutable_max_age = 365 * 24 * 60 * 60
+
+    def __init__(self, get_response):
+        if not settings.COMMON_SERVE_STATIC or not settings.STATIC_ROOT:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        self.prefix = '/' + settings.STATIC_URL.lstrip('/')
+        self.files = self.index(str(settings.STATIC_ROOT))
+
+    def index(self, root):
+        files = {}
+        for directory, _, names in os.walk(root):
+            for name in names:
+                path = os.path.join(directory, name)
+                files[os.path.relpath(path, root).replace(os.sep, '/')] = path
+
+        immutable = set()
+        if 'staticfiles.json' in files:
+            with open(files['staticfiles.json'], encoding='utf-8') as f:
+                immutable = set(json.load(f).get('paths', {}).values())
+
+        return {
+            name: (path, name in immutable, [(encoding, files[name + suffix]) for encoding, suffix in ENCODINGS if name + suffix in files])
+            for name, path in files.items()
+            if not name.endswith(('.br', '.gz')) or name[:-3] not in files
+        }
+
+    def lookup(self, request):
+        if request.method in ('GET', 'HEAD') and request.path_info.startswith(self.prefix):
+            return self.files.get(request.path_info[len(self.prefix):])
+        return None
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        entry = self.lookup(request)
+        if entry is not None:
+            return self.serve(request, *entry)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        entry = self.lookup(request)
+        if entry is None:
+            return await self.get_response(request)
+
+        response = await sync_to_async(self.serve, thread_sensitive=False)(request, *entry)
+        if isinstance(response, FileResponse):
+            response.streaming_content = aread_chunks(response.file_to_stream, response.block_size)
+        return response
+
+    def serve(self, request, path, immutable, variants):
+        accepted = accepted_encodings(request.headers.get('Accept-Encoding', ''))
+        content_type, _ = mimetypes.guess_type(path)
+        encoding = None
+        for name, variant in variants:
+            if name in accepted:
+                encoding, path = name, variant
+                break
+
+        stat = os.stat(path)
+        etag = f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'), content_type=content_type or 'application/octet-stream')
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+
+        max_age = self.immutable_max_age if immutable else settings.COMMON_STATIC_MAX_AGE
+        response.headers['Cache-Control'] = f'public, max-age={max_age}' + (', immutable' if immutable else '')
+        response.headers['ETag'] = etag
+        response.headers['Last-Modified'] = http_date(stat.st_mtime)
+        if variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
+
+
+class RequestMetricsMiddleware:
+    """
+    Opt-in (``COMMON_REQUEST_METRICS``) per-view latency, SQL and template
+    timings; see ``gym_flow.common.metrics``. Keep it first in MIDDLEWARE so
+    the total covers the other middleware too.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        if not settings.COMMON_REQUEST_METRICS:
+            raise MiddlewareNotUsed()
+
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+        metrics.install()
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        sample = metrics.RequestSample()
+        token = sample.activate()
+        started = time.perf_counter()
+        try:
+            return self.get_response(request)
+        finally:
+            metrics.RequestSample.deactivate(token)
+            self.record(request, sample, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        sample = metrics.RequestSample()
+        token = sample.activate()
+        started = time.perf_counter()
+        try:
+            return await self.get_response(request)
+        finally:
+            metrics.RequestSample.deactivate(token)
+            self.record(request, sample, time.perf_counter() - started)
+
+    @staticmethod
+    def record(request, sample, total):
+        match = getattr(request, 'resolver_match', None)
+        metrics.record(match.view_name if match else '<unresolved>', sample, total)
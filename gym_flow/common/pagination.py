@@ -0,0 +1,45 @@
+"""
+Pagination helpers for large tables.
+
+``COUNT(*)`` on PostgreSQL reads every visible row, so on a table with
+millions of members it costs as much as the page itself. For unfiltered
+querysets the planner's row estimate from ``pg_class`` is used instead once
+it passes ``COMMON_ESTIMATED_COUNT_THRESHOLD``; filtered querysets and other
+databases still get an exact count.
+"""
+from functools import cached_property
+
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+
+
+def estimated_count(queryset):
+    """
+    Planner estimate of the rows in an unfiltered ``queryset``, or None
+    when no estimate is available.
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql' or queryset.query.has_filters() or queryset.query.is_sliced:
+        return None
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)',
+            [connection.ops.quote_name(queryset.model._meta.db_table)],
+        )
+        row = cursor.fetchone()
+    # reltuples is -1 until the table has been vacuumed or analyzed.
+    if row is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        if hasattr(self.object_list, 'query'):
+            estimate = estimated_count(self.object_list)
+            if estimate is not None and estimate >= settings.COMMON_ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return super().count
@@ -0,0 +1,77 @@
+"""
+Test runner that times every test and lists the slowest ones after the run.
+
+Tests run in parallel (``--parallel``) are timed in their worker process and
+the timings are sent back with the other result events.
+"""
+import time
+import unittest
+
+from django.conf import settings
+from django.test.runner import DiscoverRunner, ParallelTestSuite, RemoteTestResult, RemoteTestRunner
+
+
+class TimedTextTestResult(unittest.TextTestResult):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.timings = {}
+
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.addTestTime(test, time.perf_counter() - self._started)
+
+    def addTestTime(self, test, elapsed):
+        # In parallel runs this is replayed after stopTest and replaces the
+        # (meaningless) replay time with the worker's measurement.
+        self.timings[test.id()] = elapsed
+
+
+class TimedRemoteTestResult(RemoteTestResult):
+    def startTest(self, test):
+        self._started = time.perf_counter()
+        super().startTest(test)
+
+    def stopTest(self, test):
+        super().stopTest(test)
+        self.events.append(('addTestTime', self.test_index, time.perf_counter() - self._started))
+
+
+class TimedRemoteTestRunner(RemoteTestRunner):
+    resultclass = TimedRemoteTestResult
+
+
+class TimedParallelTestSuite(ParallelTestSuite):
+    runner_class = TimedRemoteTestRunner
+
+
+class TimedTestRunner(DiscoverRunner):
+    parallel_test_suite = TimedParallelTestSuite
+
+    def __init__(self, slowest=None, **kwargs):
+        super().__init__(**kwargs)
+        self.slowest = getattr(settings, 'TEST_SLOWEST', 10) if slowest is None else slowest
+
+    @classmethod
+    def add_arguments(cls, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            '--slowest', type=int, metavar='N',
+            help="List the N slowest tests after the run (0 to disable; default TEST_SLOWEST).",
+        )
+
+    def get_resultclass(self):
+        return super().get_resultclass() or TimedTextTestResult
+
+    def run_suite(self, suite, **kwargs):
+        result = super().run_suite(suite, **kwargs)
+        timings = getattr(result, 'timings', None)
+        if self.slowest and timings:
+            slowest = sorted(timings.items(), key=lambda item: -item[1])[:self.slowest]
+            self.log(f"\nSlowest {len(slowest)} of {len(timings)} tests ({sum(timings.values()):.2f}s in tests):")
+            for test_id, elapsed in slowest:
+                self.log(f"{elapsed:8.3f}s  {test_id}")
+        return result
@@ -0,0 +1,78 @@
+"""
+Cached, database-backed sessions that skip redundant writes.
+
+Reads come from the cache and only fall back to ``django_session`` on a miss,
+as with Django's ``cached_db`` engine. On top of that, a session marked as
+modified whose contents are identical to what was loaded is not written
+again, unless ``SESSION_SAVE_EVERY_REQUEST`` asks for a sliding expiry.
+"""
+import hashlib
+import json
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.cached_db import SessionStore as CachedDBStore
+from django.utils import timezone
+
+
+def fingerprint(data):
+    return hashlib.sha1(json.dumps(data, sort_keys=True, default=str).encode(), usedforsecurity=False).hexdigest()
+
+
+class SessionStore(CachedDBStore):
+    _loaded_fingerprint = None
+
+    def load(self):
+        data = super().load()
+        self._loaded_fingerprint = fingerprint(data) if data else None
+        return data
+
+    async def aload(self):
+        data = await super().aload()
+        self._loaded_fingerprint = fingerprint(data) if data else None
+        return data
+
+    def is_unchanged(self, must_create):
+        return (
+            not must_create
+            and not settings.SESSION_SAVE_EVERY_REQUEST
+            and self.session_key is not None
+            and self._loaded_fingerprint is not None
+            and self._loaded_fingerprint == fingerprint(self._get_session())
+        )
+
+    def save(self, must_create=False):
+        if self.is_unchanged(must_create):
+            return
+        super().save(must_create)
+        self._loaded_fingerprint = fingerprint(self._get_session())
+
+    async def asave(self, must_create=False):
+        if self.is_unchanged(must_create):
+            return
+        await super().asave(must_create)
+        self._loaded_fingerprint = fingerprint(self._get_session())
+
+    @classmethod
+    def clear_expired(cls, batch_size=1000, pause=0, progress=None):
+        """
+        Delete expired sessions ``batch_size`` rows at a time, optionally
+        sleeping ``pause`` seconds between batches, so the purge never holds
+        long locks on ``django_session``. Returns the number of rows deleted.
+        """
+        model = cls.get_model_class()
+        now = timezone.now()
+        deleted = 0
+
+        while True:
+            keys = list(
+                model.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:batch_size]
+            )
+            if not keys:
+                return deleted
+
+            deleted += model.objects.filter(session_key__in=keys).delete()[0]
+            if progress is not None:
+                progress(deleted)
+            if pause:
+                time.sleep(pause)
@@ -0,0 +1,203 @@
+import gzip
+import hashlib
+import os
+import posixpath
+import re
+import tempfile
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+from django.core.files.move import file_move_safe
+from django.core.files.storage import FileSystemStorage
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+CSS_IMPORT_RE = re.compile(r"""@import\s+(?:url\()?\s*['"]?([^'")\s]+)['"]?\s*\)?\s*;""")
+CSS_URL_RE = re.compile(r"""url\(\s*(['"]?)([^'")]+)\1\s*\)""")
+CSS_COMMENT_RE = re.compile(r'/\*.*?\*/', re.DOTALL)
+CSS_SPACE_RE = re.compile(r'\s+')
+CSS_PUNCTUATION_RE = re.compile(r'\s*([{};,>])\s*')
+# A space before ':' can be significant in selectors (``a :hover``), so only
+# the space after it is dropped.
+CSS_COLON_RE = re.compile(r':\s+')
+
+# <dir>/<first two hex digits>/<sha256><rest>; see ContentAddressedStorage.
+CONTENT_ADDRESS_RE = re.compile(r'(?:^|/)(?P<fanout>[0-9a-f]{2})/(?P<digest>(?P=fanout)[0-9a-f]{62})(?P<rest>[^/]*)$')
+
+# Formats that are already compressed gain nothing from gzip or brotli.
+INCOMPRESSIBLE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.webp', '.woff', '.woff2', '.gz', '.br', '.zip')
+
+
+def minify_css(content):
+    content = CSS_COMMENT_RE.sub('', content)
+    content = CSS_SPACE_RE.sub(' ', content)
+    content = CSS_PUNCTUATION_RE.sub(r'\1', content)
+    content = CSS_COLON_RE.sub(':', content)
+    return content.replace(';}', '}').strip()
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that, during collectstatic:
+
+    * inlines local ``@import`` rules so each stylesheet is one request, and
+      minifies every stylesheet;
+    * fingerprints file names through the manifest, as the parent does;
+    * writes ``.gz`` (and ``.br`` when the ``brotli`` package is installed)
+      siblings next to every hashed file worth compressing.
+    """
+
+    compress_min_size = 256
+
+    def post_process(self, paths, dry_run=False, **options):
+        if dry_run:
+            return
+
+        # Bundle from the source storages: collectstatic skips copying a
+        # source that is older than its collected copy, and the collected
+        # copy of a stylesheet is the previous bundle. Hashing reads from
+        # ``paths``, so point it at the bundles written here.
+        sources = dict(paths)
+        paths = dict(paths)
+        for name in sorted(paths):
+            if name.endswith('.css'):
+                self.replace(name, minify_css(self.bundle_css(name, sources)).encode())
+                paths[name] = (self, name)
+
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+
+        for hashed_name in sorted(hashed_names):
+            self.compress(hashed_name)
+
+    def bundle_css(self, name, sources, seen=None):
+        """Inline the local imports of ``name``, read from its ``(storage, path)`` in ``sources``."""
+        seen = seen or set()
+        seen.add(name)
+        storage, path = sources[name]
+        with storage.open(path) as f:
+            content = f.read().decode()
+
+        def inline(match):
+            target = match.group(1)
+            if '://' in target or target.startswith('/'):
+                return match.group(0)
+            path = posixpath.normpath(posixpath.join(posixpath.dirname(name), target))
+            if path in seen or path not in sources:
+                return match.group(0)
+            return self.rebase_urls(self.bundle_css(path, sources, seen), posixpath.dirname(path), posixpath.dirname(name))
+
+        return CSS_IMPORT_RE.sub(inline, content)
+
+    def rebase_urls(self, content, source_dir, target_dir):
+        def rebase(match):
+            quote, url = match.groups()
+            if url.startswith(('/', '#', 'data:')) or '://' in url:
+                return match.group(0)
+            path = posixpath.normpath(posixpath.join(source_dir, url))
+            return f'url({quote}{posixpath.relpath(path, target_dir or ".")}{quote})'
+
+        return CSS_URL_RE.sub(rebase, content)
+
+    def replace(self, name, content):
+        self.delete(name)
+        self._save(name, ContentFile(content))
+
+    def compress(self, name):
+        if name.endswith(INCOMPRESSIBLE_EXTENSIONS):
+            return
+        with self.open(name) as f:
+            content = f.read()
+        if len(content) < self.compress_min_size:
+            return
+
+        encoded = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+        if brotli is not None:
+            encoded['.br'] = brotli.compress(content)
+
+        for suffix, data in encoded.items():
+            if len(data) < len(content):
+                self.replace(name + suffix, data)
+
+
+def content_address(name):
+    """
+    ``(digest, is_original)`` for a content-addressed name, where derived
+    files (``<digest>_small.webp``) are not originals; ``None`` otherwise.
+    """
+    match = CONTENT_ADDRESS_RE.search(name)
+    if match is None:
+        return None
+    return match['digest'], '_' not in match['rest']
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """
+    Media storage that files every upload under the SHA-256 of its content:
+    ``profile_pictures/photo.png`` is stored as
+    ``profile_pictures/3f/3fa9…e1.png``. Identical uploads share one file and
+    names never collide, so nothing is ever suffixed or overwritten with
+    different content, and the files can be cached forever.
+
+    Names that are already content addressed are saved as given, which is
+    how files derived from a stored file (resized variants) are kept next to
+    it. Files are never deleted when a reference changes, because other rows
+    may share them; ``sweep_media`` removes the ones nothing references.
+    """
+
+    def get_available_name(self, name, max_length=None):
+        # The final name is chosen from the content in _save().
+        return name
+
+    def _save(self, name, content):
+        if content_address(name) is None:
+            name = self.content_name(name, content)
+            full_path = self.path(name)
+            if os.path.exists(full_path):
+                # Refresh the modification time so a sweep that started
+                # before this reference is committed leaves the file alone.
+                os.utime(full_path)
+                return name
+
+        self._store(self.path(name), content)
+        return name.replace('\\', '/')
+
+    def content_name(self, name, content):
+        digest = hashlib.sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+
+        directory, basename = posixpath.split(name.replace('\\', '/'))
+        extension = os.path.splitext(basename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def _store(self, full_path, content):
+        directory = os.path.dirname(full_path)
+        os.makedirs(directory, mode=self.directory_permissions_mode or 0o777, exist_ok=True)
+
+        # Written beside the target and renamed over it, so readers never see
+        # a partial file and a concurrent save of the same content is harmless.
+        if hasattr(content, 'temporary_file_path'):
+            file_move_safe(content.temporary_file_path(), full_path, allow_overwrite=True)
+        else:
+            fd, temporary_path = tempfile.mkstemp(prefix='.save-', dir=directory)
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    for chunk in content.chunks():
+                        f.write(chunk if isinstance(chunk, bytes) else chunk.encode())
+                os.replace(temporary_path, full_path)
+            except BaseException:
+                if os.path.exists(temporary_path):
+                    os.remove(temporary_path)
+                raise
+
+        if self.file_permissions_mode is not None:
+            os.chmod(full_path, self.file_permissions_mode)
@@ -0,0 +1,51 @@
+import os
+import time
+
+from django.template import TemplateDoesNotExist, engines
+
+
+def django_engine():
+    return next(engine.engine for engine in engines.all() if hasattr(engine, 'engine'))
+
+
+def project_templates(engine=None):
+    """
+    Names of the templates under the engine's ``DIRS``, i.e. the project's own
+    ``templates/`` tree rather than every app's bundled templates.
+    """
+    engine = engine or django_engine()
+    names = []
+    for directory in engine.dirs:
+        for root, _, files in os.walk(directory):
+            for file in files:
+                if file.endswith('.html'):
+                    names.append(os.path.relpath(os.path.join(root, file), directory).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def compile_template(name, engine=None):
+    """
+    Compile ``name`` from source, bypassing the cached loader, and return the
+    seconds it took.
+    """
+    engine = engine or django_engine()
+    for loader in engine.template_loaders:
+        for origin in loader.get_template_sources(name):
+            try:
+                source = loader.get_contents(origin)
+            except TemplateDoesNotExist:
+                continue
+            started = time.perf_counter()
+            engine.from_string(source)
+            return time.perf_counter() - started
+    raise LookupError(name)
+
+
+def warm_templates():
+    """
+    Load every project template through the configured loaders so a cached
+    loader holds them compiled before the first request.
+    """
+    engine = django_engine()
+    for name in project_templates(engine):
+        engine.get_template(name)
@@ -1,3 +1,484 @@
-from django.test import TestCase
+import gzip
+import json
+import runpy
+import shutil
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.management import CommandError, call_command
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.templatetags.static import static
+from django.test import TestCase, RequestFactory, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from gym_flow.accounts.factories import create_member, create_members
+from gym_flow.common import metrics
+from gym_flow.common.cache import cache_anonymous_page, page_cache_key, page_cache_version
+from gym_flow.common.checks import check_performance_settings
+from gym_flow.common.middleware import StaticFilesMiddleware
+from gym_flow.common.pagination import EstimatedCountPaginator, estimated_count
+from gym_flow.common.sessions import SessionStore
+from gym_flow.common.storage import ContentAddressedStorage, content_address, minify_css
+from gym_flow.common.templates import django_engine, project_templates, warm_templates
+
+UserModel = get_user_model()
+
+
+class AnonymousPageCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.home_url = reverse('home')
+
+    def test_anonymous_home_page_is_served_from_cache(self):
+        first = self.client.get(self.home_url)
+        second = self.client.get(self.home_url)
+
+        self.assertTemplateUsed(first, 'common/index.html')
+        self.assertTemplateNotUsed(second, 'common/index.html')
+        self.assertEqual(first.content, second.content)
+        self.assertIn('Cookie', second['Vary'])
+
+    def test_authenticated_home_page_is_not_cached(self):
+        self.client.get(self.home_url)
+        self.client.force_login(create_member())
+
+        response = self.client.get(self.home_url)
+
+        self.assertTemplateUsed(response, 'common/index.html')
+        self.assertContains(response, 'You are logged in.')
+
+    def test_purge_page_cache_forces_a_render(self):
+        self.client.get(self.home_url)
+        call_command('purge_page_cache', stdout=StringIO())
+
+        response = self.client.get(self.home_url)
+
+        self.assertTemplateUsed(response, 'common/index.html')
+
+    def test_stale_page_is_served_while_another_request_renders(self):
+        self.client.get(self.home_url)
+        request = RequestFactory().get(self.home_url)
+        key = page_cache_key(request, page_cache_version(cache))
+        entry = cache.get(key)
+        entry['fresh_until'] = time.time() - 1
+        cache.set(key, entry)
+        cache.add(f'{key}:lock', 1)
+
+        response = self.client.get(self.home_url)
+
+        self.assertTemplateNotUsed(response, 'common/index.html')
+        self.assertEqual(response.content, entry['content'])
+
+    def test_unlisted_query_parameters_share_the_entry(self):
+        request = RequestFactory().get('/members/?utm_source=mail&page=2')
+        same = RequestFactory().get('/members/?page=2&x=1')
+        other = RequestFactory().get('/members/?page=3')
+
+        self.assertEqual(page_cache_key(request, 1), page_cache_key(RequestFactory().get('/members/'), 1))
+        self.assertEqual(page_cache_key(request, 1, ('page',)), page_cache_key(same, 1, ('page',)))
+        self.assertNotEqual(page_cache_key(request, 1, ('page',)), page_cache_key(other, 1, ('page',)))
+
+    def test_page_with_csrf_token_is_not_cached(self):
+        calls = []
+
+        @cache_anonymous_page
+        def view(request):
+            calls.append(request)
+            return HttpResponse(get_token(request))
+
+        for _ in range(2):
+            request = RequestFactory().get('/csrf/')
+            request.user = AnonymousUser()
+            view(request)
+
+        self.assertEqual(len(calls), 2)
+
+
+class TemplateWarmupTests(TestCase):
+    def test_project_templates_lists_the_templates_directory(self):
+        names = project_templates()
+
+        self.assertIn('common/base.html', names)
+        self.assertIn('accounts/login.html', names)
+        self.assertNotIn('admin/base.html', names)
+
+    def test_warm_templates_fills_the_cached_loader(self):
+        loader = django_engine().template_loaders[0]
+        loader.reset()
+
+        warm_templates()
+
+        self.assertTrue(set(project_templates()) <= set(loader.get_template_cache))
+
+    def test_template_timings_reports_includes(self):
+        out = StringIO()
+        call_command('template_timings', iterations=1, stdout=out)
+
+        self.assertIn('common/index.html', out.getvalue())
+        self.assertIn('common/header.html', out.getvalue().split('include')[-1])
+
+
+class PerformanceCheckTests(TestCase):
+    def check_ids(self):
+        return [warning.id for warning in check_performance_settings(None)]
+
+    @override_settings(
+        DEBUG=True,
+        SESSION_ENGINE='django.contrib.sessions.backends.db',
+        TEMPLATES_WARM_ON_STARTUP=False,
+    )
+    def test_development_settings_are_flagged(self):
+        ids = self.check_ids()
+
+        for warning_id in ('common.W001', 'common.W003', 'common.W004', 'common.W006', 'common.W007', 'common.W008'):
+            self.assertIn(warning_id, ids)
+
+    @override_settings(
+        DEBUG=False,
+        CACHES={'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': 'redis://'}},
+        SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+        TEMPLATES_WARM_ON_STARTUP=True,
+        STORAGES={
+            'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+            'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.ManifestStaticFilesStorage'},
+        },
+        COMMON_MEDIA_SENDFILE_HEADER='X-Accel-Redirect',
+    )
+    def test_production_profile_passes(self):
+        with mock.patch.dict('django.conf.settings.DATABASES', {'default': {'CONN_MAX_AGE': 60}}):
+            self.assertEqual(self.check_ids(), [])
+
+
+class DatabaseSettingsTests(TestCase):
+    def database(self, **environ):
+        with mock.patch.dict('os.environ', environ):
+            return runpy.run_module('gym_flow.settings.base')['DATABASES']['default']
+
+    def test_connections_persist_under_wsgi(self):
+        self.assertEqual(self.database(DB_CONN_MAX_AGE='60', GYM_FLOW_ASGI='')['CONN_MAX_AGE'], 60)
+
+    def test_connections_do_not_persist_under_asgi(self):
+        self.assertEqual(self.database(DB_CONN_MAX_AGE='60', GYM_FLOW_ASGI='1')['CONN_MAX_AGE'], 0)
+
+
+class SessionStoreTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        session = SessionStore()
+        session['member'] = 1
+        session.create()
+        self.session_key = session.session_key
+
+    def test_unchanged_session_is_not_rewritten(self):
+        session = SessionStore(self.session_key)
+        session['member'] = 1
+
+        with self.assertNumQueries(0):
+            session.save()
+
+    def test_changed_session_is_written(self):
+        session = SessionStore(self.session_key)
+        session['member'] = 2
+        session.save()
+
+        cache.clear()
+        self.assertEqual(SessionStore(self.session_key)['member'], 2)
+
+    @override_settings(SESSION_SAVE_EVERY_REQUEST=True)
+    def test_unchanged_session_is_written_for_sliding_expiry(self):
+        session = SessionStore(self.session_key)
+        session['member'] = 1
+
+        with mock.patch('django.contrib.sessions.backends.cached_db.SessionStore.save') as save:
+            session.save()
+
+        save.assert_called_once_with(False)
+
+    def test_purge_sessions_deletes_expired_sessions_in_batches(self):
+        expired = timezone.now() - timezone.timedelta(days=1)
+        Session.objects.bulk_create(
+            Session(session_key=f'expired{i}', session_data='', expire_date=expired) for i in range(5)
+        )
+        out = StringIO()
+
+        call_command('purge_sessions', batch_size=2, stdout=out)
+
+        self.assertQuerySetEqual(Session.objects.values_list('session_key', flat=True), [self.session_key])
+        self.assertIn('2 expired sessions deleted', out.getvalue())
+        self.assertIn('Deleted 5 expired sessions.', out.getvalue())
+
+
+class StaticPipelineTests(TestCase):
+    def setUp(self):
+        static_root = tempfile.TemporaryDirectory()
+        self.addCleanup(static_root.cleanup)
+        self.static_root = Path(static_root.name)
+        settings_override = override_settings(
+            STATIC_ROOT=static_root.name,
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'gym_flow.common.storage.CompressedManifestStaticFilesStorage'},
+            },
+            COMMON_SERVE_STATIC=True,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        call_command('collectstatic', interactive=False, verbosity=0)
+
+    def test_stylesheets_are_bundled_minified_and_fingerprinted(self):
+        hashed = static('css/styles.css')
+        self.assertRegex(hashed, r'^/static/css/styles\.[0-9a-f]{12}\.css$')
+
+        bundle = (self.static_root / hashed.removeprefix('/static/')).read_text()
+        self.assertNotIn('@import', bundle)
+        self.assertIn('.logo-link{text-decoration:none;color:inherit}', bundle)
+        self.assertEqual(gzip.decompress((self.static_root / f"{hashed.removeprefix('/static/')}.gz").read_bytes()).decode(), bundle)
+
+    def test_base_template_links_hashed_names(self):
+        cache.clear()
+        response = self.client.get(reverse('home'))
+
+        self.assertContains(response, static('css/styles.css'))
+        self.assertContains(response, static('favicon.ico'))
+        self.assertNotContains(response, '/static/css/styles.css"')
+
+    def test_middleware_serves_precompressed_immutable_files(self):
+        middleware = StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+        request = RequestFactory().get(static('css/styles.css'), HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        response = middleware(request)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_middleware_serves_unhashed_names_with_short_max_age(self):
+        middleware = StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+
+        response = middleware(RequestFactory().get('/static/css/styles.css'))
+
+        self.assertNotIn('Content-Encoding', response)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=3600')
+        self.assertEqual(middleware(RequestFactory().get('/static/missing.css')).status_code, 404)
+
+    async def test_middleware_streams_asynchronously_under_asgi(self):
+        async def get_response(request):
+            return HttpResponse(status=404)
+
+        middleware = StaticFilesMiddleware(get_response)
+        path = static('css/styles.css')
+
+        response = await middleware(RequestFactory().get(path))
+
+        self.assertTrue(response.is_async)
+        body = b''.join([chunk async for chunk in response])
+        response.close()
+        self.assertEqual(body, (self.static_root / path.removeprefix('/static/')).read_bytes())
+        self.assertEqual(int(response['Content-Length']), len(body))
+        self.assertEqual((await middleware(RequestFactory().get('/static/missing.css'))).status_code, 404)
+
+    def test_changed_import_is_bundled_on_the_next_collect(self):
+        source = tempfile.TemporaryDirectory()
+        self.addCleanup(source.cleanup)
+        shutil.copytree(settings.BASE_DIR / 'static', source.name, dirs_exist_ok=True)
+        with override_settings(STATICFILES_DIRS=[source.name]):
+            call_command('collectstatic', interactive=False, verbosity=0)
+            first = static('css/styles.css')
+            with open(Path(source.name) / 'css' / 'common' / 'base.css', 'a') as f:
+                f.write('.added-rule { color: red; }\n')
+
+            call_command('collectstatic', interactive=False, verbosity=0)
+            second = static('css/styles.css')
+
+        self.assertNotEqual(first, second)
+        self.assertIn('.added-rule{color:red}', (self.static_root / second.removeprefix('/static/')).read_text())
+
+    def test_minify_css_keeps_descendant_pseudo_selectors(self):
+        self.assertEqual(minify_css('a :hover {\n  color: red; /* note */\n}'), 'a :hover{color:red}')
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_members(2, password=None)
+
+    def test_exact_count_without_an_estimate(self):
+        queryset = UserModel.objects.order_by('pk')
+        self.assertIsNone(estimated_count(queryset))
+        self.assertEqual(EstimatedCountPaginator(queryset, 1).count, 2)
+
+    @override_settings(COMMON_ESTIMATED_COUNT_THRESHOLD=1000)
+    def test_large_estimate_replaces_count(self):
+        queryset = UserModel.objects.order_by('pk')
+        with mock.patch('gym_flow.common.pagination.estimated_count', return_value=250_000):
+            with self.assertNumQueries(0):
+                self.assertEqual(EstimatedCountPaginator(queryset, 1).count, 250_000)
+
+        with mock.patch('gym_flow.common.pagination.estimated_count', return_value=10):
+            self.assertEqual(EstimatedCountPaginator(queryset, 1).count, 2)
+
+
+@override_settings(COMMON_REQUEST_METRICS=True, COMMON_REQUEST_METRICS_PUBLISH_INTERVAL=3600)
+class RequestMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.staff = create_member(password=None, is_staff=True)
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse('login'))
+        self.client.get(reverse('login'))
+        self.client.force_login(self.staff)
+        self.client.get(reverse('profile-details', kwargs={'pk': self.staff.pk}))
+
+        report = metrics.collect()
+        self.assertEqual(report['login']['requests'], 2)
+        self.assertGreater(report['login']['template_ms']['p50'], 0)
+        self.assertGreaterEqual(report['profile-details']['sql_count']['max'], 1)
+        self.assertGreater(report['profile-details']['total_ms']['p50'], 0)
+
+    def test_async_views_are_recorded(self):
+        cache.clear()
+        self.client.get(reverse('home'))
+        self.assertEqual(metrics.collect()['home']['requests'], 1)
+
+    @override_settings(COMMON_N_PLUS_ONE_THRESHOLD=3)
+    def test_repeated_statement_is_logged(self):
+        sample = metrics.RequestSample()
+        sample.sql_count = 4
+        sample.statements.update({'SELECT ... WHERE id = %s': 3, 'SELECT 1': 1})
+
+        with self.assertLogs('gym_flow.common.metrics', 'WARNING') as logs:
+            metrics.record('profile-edit', sample, 0.01)
+        self.assertIn('Possible N+1 query in profile-edit: 3 of 4 queries', logs.output[0])
+
+    def test_report_command_and_endpoint(self):
+        self.client.get(reverse('login'))
+
+        out = StringIO()
+        call_command('request_metrics', stdout=out)
+        self.assertIn('login', out.getvalue())
+
+        self.assertEqual(self.client.get(reverse('request-metrics')).status_code, 302)
+        self.client.force_login(self.staff)
+        self.assertIn('login', self.client.get(reverse('request-metrics')).json())
+
+        call_command('request_metrics', '--reset', stdout=StringIO())
+        self.assertNotIn('login', metrics.collect())
+
+    @override_settings(COMMON_REQUEST_METRICS=False)
+    def test_disabled_by_default(self):
+        self.client.get(reverse('login'))
+        self.assertEqual(metrics.collect(), {})
+
+
+class BenchmarkCompareTests(TestCase):
+    def results(self, **overrides):
+        stats = {
+            'requests': 100, 'errors': 0, 'throughput_rps': 200.0,
+            'p50_ms': 4.0, 'p95_ms': 6.0, 'p99_ms': 8.0, 'queries_per_request': 2.0,
+        }
+        return {'meta': {}, 'results': {'profile-edit': stats | overrides}}
+
+    def save(self, directory, name, results):
+        path = Path(directory) / name
+        path.write_text(json.dumps(results))
+        return str(path)
+
+    def test_unchanged_runs_pass(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = self.save(directory, 'baseline.json', self.results())
+            current = self.save(directory, 'current.json', self.results(p95_ms=6.3, throughput_rps=190.0))
+            out = StringIO()
+            call_command('benchmark_requests', '--compare', baseline, current, stdout=out)
+        self.assertIn('No regressions', out.getvalue())
+
+    def test_slower_run_and_extra_queries_are_regressions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = self.save(directory, 'baseline.json', self.results())
+            current = self.save(directory, 'current.json', self.results(p95_ms=9.0, queries_per_request=3.0))
+            out = StringIO()
+            with self.assertRaisesMessage(CommandError, '2 regression(s) beyond 10%'):
+                call_command('benchmark_requests', '--compare', baseline, current, stdout=out)
+        self.assertIn('p95_ms', out.getvalue())
+        self.assertIn('queries_per_request', out.getvalue())
+
+    def test_failed_requests_are_regressions(self):
+        with tempfile.TemporaryDirectory() as directory:
+            baseline = self.save(directory, 'baseline.json', self.results())
+            current = self.save(directory, 'current.json', self.results(errors=100, p95_ms=1.0))
+            out = StringIO()
+            with self.assertRaisesMessage(CommandError, '1 regression(s)'):
+                call_command('benchmark_requests', '--compare', baseline, current, stdout=out)
+        self.assertIn('errors', out.getvalue())
+
+    def test_run_with_failed_requests_is_not_saved(self):
+        failing = self.results(errors=3)
+        with tempfile.TemporaryDirectory() as directory:
+            output = Path(directory) / 'run.json'
+            with mock.patch('benchmarks.bench_request_paths.run_suite', return_value=failing):
+                with self.assertRaisesMessage(CommandError, 'Requests failed in profile-edit'):
+                    call_command('benchmark_requests', '--output', str(output), stdout=StringIO())
+            self.assertFalse(output.exists())
+
+
+class ContentAddressedMediaTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.TemporaryDirectory()
+        self.addCleanup(media_root.cleanup)
+        settings_override = override_settings(MEDIA_ROOT=media_root.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.storage = ContentAddressedStorage()
+        self.name = self.storage.save('profile_pictures/Photo.PNG', ContentFile(b'picture'))
+        self.digest = content_address(self.name)[0]
+
+    def test_identical_content_is_stored_once(self):
+        self.assertEqual(self.name, f'profile_pictures/{self.digest[:2]}/{self.digest}.png')
+        self.assertEqual(self.storage.save('profile_pictures/copy.png', ContentFile(b'picture')), self.name)
+        self.assertNotEqual(self.storage.save('profile_pictures/copy.png', ContentFile(b'other')), self.name)
+        self.assertEqual(self.storage.listdir(f'profile_pictures/{self.digest[:2]}')[1], [f'{self.digest}.png'])
+
+    def test_derived_names_are_kept(self):
+        variant = self.name.replace('.png', '_small.webp')
+        self.assertEqual(self.storage.save(variant, ContentFile(b'small')), variant)
+        self.assertEqual(self.storage.save(variant, ContentFile(b'smaller')), variant)
+        self.assertEqual(content_address(variant), (self.digest, False))
+        with self.storage.open(variant) as f:
+            self.assertEqual(f.read(), b'smaller')
+
+    def test_original_is_served_as_immutable(self):
+        response = self.client.get(f'/media/{self.name}')
+
+        self.assertEqual(b''.join(response.streaming_content), b'picture')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(response['ETag'], f'"{self.digest}"')
+        self.assertEqual(self.client.get(f'/media/{self.name}', HTTP_IF_NONE_MATCH=f'"{self.digest}"').status_code, 304)
+
+    @override_settings(COMMON_MEDIA_SENDFILE_HEADER='X-Accel-Redirect')
+    def test_transfer_is_handed_to_nginx(self):
+        response = self.client.get(f'/media/{self.name}')
+
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], f'/protected-media/{self.name}')
+
+    def test_missing_hidden_and_outside_files_are_not_found(self):
+        Path(self.storage.path('profile_pictures/.upload-x')).write_bytes(b'partial')
+        for path in ('profile_pictures/missing.png', 'profile_pictures/.upload-x', '../secret', 'profile_pictures'):
+            self.assertEqual(self.client.get(f'/media/{path}').status_code, 404, path)
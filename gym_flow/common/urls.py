@@ -4,4 +4,5 @@ from gym_flow.common import views
 
 urlpatterns = [
     path("", views.home_page, name="home"),
+    path("metrics/", views.request_metrics, name="request-metrics"),
 ]
@@ -1,5 +1,68 @@
-from django.shortcuts import render
+import mimetypes
+import os
+import stat
+from urllib.parse import quote
 
-# Create your views here.
-def home_page(request):
-    return render(request, template_name="common/index.html")
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import default_storage
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, JsonResponse
+from django.template.response import TemplateResponse
+from django.utils.http import http_date
+from django.views.decorators.http import require_safe
+
+from gym_flow.common import metrics
+from gym_flow.common.cache import cache_anonymous_page
+from gym_flow.common.storage import content_address
+
+
+@cache_anonymous_page
+async def home_page(request):
+    return TemplateResponse(request, template="common/index.html")
+
+
+@staff_member_required
+def request_metrics(request):
+    return JsonResponse(metrics.collect())
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve a file from the default storage, handing the transfer to the web
+    server when COMMON_MEDIA_SENDFILE_HEADER is set.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        # In-progress uploads and other hidden files.
+        raise Http404
+    try:
+        full_path = default_storage.path(path)
+        file_stat = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404
+    if not stat.S_ISREG(file_stat.st_mode):
+        raise Http404
+
+    address = content_address(path)
+    immutable = address is not None and address[1]
+    etag = f'"{address[0]}"' if immutable else f'"{int(file_stat.st_mtime):x}-{file_stat.st_size:x}"'
+    content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+    header = settings.COMMON_MEDIA_SENDFILE_HEADER
+
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    elif header.lower() == 'x-accel-redirect':
+        response = HttpResponse(content_type=content_type)
+        response.headers[header] = settings.COMMON_MEDIA_ACCEL_PREFIX + quote(path)
+    elif header:
+        response = HttpResponse(content_type=content_type)
+        response.headers[header] = full_path
+    else:
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+
+    max_age = 365 * 24 * 60 * 60 if immutable else settings.COMMON_MEDIA_MAX_AGE
+    response.headers['Cache-Control'] = f'public, max-age={max_age}' + (', immutable' if immutable else '')
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(file_stat.st_mtime)
+    return response
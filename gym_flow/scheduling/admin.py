@@ -0,0 +1,28 @@
+from django.contrib import admin
+
+from gym_flow.scheduling.models import Booking, ClassSession
+
+
+@admin.register(ClassSession)
+class ClassSessionAdmin(admin.ModelAdmin):
+    list_display = ('title', 'starts_at', 'instructor', 'booked', 'capacity', 'booking_opens_at')
+    list_select_related = ('instructor', )
+    readonly_fields = ('booked', )
+    search_fields = ('^title', )
+    date_hierarchy = 'starts_at'
+    raw_id_fields = ('instructor', )
+
+
+@admin.register(Booking)
+class BookingAdmin(admin.ModelAdmin):
+    list_display = ('session', 'user', 'created_at')
+    list_select_related = ('session', 'user')
+    raw_id_fields = ('session', 'user')
+
+    def has_add_permission(self, request):
+        # Bookings made or moved here would bypass the capacity counter;
+        # deleting one frees its place through the post_delete receiver.
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,9 @@
+from django.apps import AppConfig
+
+
+class SchedulingConfig(AppConfig):
+    default_auto_field = 'django.db.models.BigAutoField'
+    name = 'gym_flow.scheduling'
+
+    def ready(self):
+        import gym_flow.scheduling.signals
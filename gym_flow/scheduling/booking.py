@@ -0,0 +1,69 @@
+"""
+Booking with capacity control that holds up under a booking-opens rush.
+
+``book()`` inserts the booking and then increments ``ClassSession.booked``
+with a single conditional ``UPDATE ... WHERE booked < capacity``. The
+database checks and increments in one statement under the session's row
+lock, so concurrent bookers cannot oversell, and they only queue on that one
+row for the few milliseconds until commit rather than on a table lock or
+an application-level lock. If the class is full the whole transaction,
+booking included, rolls back.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from gym_flow.scheduling.models import Booking, ClassSession
+
+
+class BookingError(Exception):
+    message = "This class cannot be booked."
+
+
+class ClassFull(BookingError):
+    message = "This class is full."
+
+
+class AlreadyBooked(BookingError):
+    message = "You have already booked this class."
+
+
+class BookingClosed(BookingError):
+    message = "Booking for this class is not open."
+
+
+def book(session_id, user):
+    """Book ``user`` onto the session and return the Booking."""
+    now = timezone.now()
+    with transaction.atomic():
+        try:
+            # The savepoint keeps the outer transaction usable after a
+            # unique violation, so the error below can be raised cleanly.
+            with transaction.atomic():
+                booking = Booking.objects.create(session_id=session_id, user=user)
+        except IntegrityError:
+            if Booking.objects.filter(session_id=session_id, user=user).exists():
+                raise AlreadyBooked
+            raise ClassSession.DoesNotExist
+
+        updated = ClassSession.objects.filter(
+            pk=session_id,
+            booked__lt=F('capacity'),
+            booking_opens_at__lte=now,
+            starts_at__gt=now,
+        ).update(booked=F('booked') + 1)
+
+        if not updated:
+            session = ClassSession.objects.get(pk=session_id)
+            if session.booking_opens_at > now or session.starts_at <= now:
+                raise BookingClosed
+            raise ClassFull
+    return booking
+
+
+def cancel(session_id, user):
+    """Cancel the booking and free its place; return False if there was none."""
+    with transaction.atomic():
+        # The post_delete receiver in gym_flow.scheduling.signals frees the place.
+        deleted, _ = Booking.objects.filter(session_id=session_id, user=user).delete()
+    return bool(deleted)
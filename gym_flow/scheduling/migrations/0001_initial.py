@@ -0,0 +1,55 @@
+# Generated by Django 5.1.7 on 2026-10-18 19:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ClassSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.CharField(max_length=100)),
+                ('starts_at', models.DateTimeField()),
+                ('ends_at', models.DateTimeField()),
+                ('booking_opens_at', models.DateTimeField()),
+                ('capacity', models.PositiveIntegerField()),
+                ('booked', models.PositiveIntegerField(default=0, editable=False)),
+                ('instructor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='taught_sessions', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Booking',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to=settings.AUTH_USER_MODEL)),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bookings', to='scheduling.classsession')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='classsession',
+            index=models.Index(fields=['starts_at'], name='session_starts_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='classsession',
+            constraint=models.CheckConstraint(condition=models.Q(('booked__lte', models.F('capacity'))), name='session_not_overbooked'),
+        ),
+        migrations.AddIndex(
+            model_name='booking',
+            index=models.Index(fields=['user', 'session'], name='booking_user_session_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='booking',
+            constraint=models.UniqueConstraint(fields=('session', 'user'), name='booking_session_user_uniq'),
+        ),
+    ]
@@ -0,0 +1,69 @@
+from django.contrib.auth import get_user_model
+from django.db import models
+
+UserModel = get_user_model()
+
+
+class ClassSession(models.Model):
+    title = models.CharField(
+        max_length=100,
+    )
+    instructor = models.ForeignKey(
+        to=UserModel,
+        on_delete=models.SET_NULL,
+        related_name='taught_sessions',
+        blank=True,
+        null=True,
+    )
+    starts_at = models.DateTimeField()
+    ends_at = models.DateTimeField()
+    booking_opens_at = models.DateTimeField()
+    capacity = models.PositiveIntegerField()
+    # Maintained by gym_flow.scheduling.booking with conditional updates;
+    # never assign it directly.
+    booked = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+    )
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(condition=models.Q(booked__lte=models.F('capacity')), name='session_not_overbooked'),
+        ]
+        indexes = [
+            models.Index(fields=['starts_at'], name='session_starts_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.title} {self.starts_at:%Y-%m-%d %H:%M}'
+
+    @property
+    def spots_left(self):
+        return self.capacity - self.booked
+
+
+class Booking(models.Model):
+    session = models.ForeignKey(
+        to=ClassSession,
+        on_delete=models.CASCADE,
+        related_name='bookings',
+    )
+    user = models.ForeignKey(
+        to=UserModel,
+        on_delete=models.CASCADE,
+        related_name='bookings',
+    )
+    created_at = models.DateTimeField(
+        auto_now_add=True,
+    )
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['session', 'user'], name='booking_session_user_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'session'], name='booking_user_session_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.session_id}'
@@ -0,0 +1,12 @@
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
+
+from gym_flow.scheduling.models import Booking, ClassSession
+
+
+@receiver(post_delete, sender=Booking)
+def free_place(sender, instance, **kwargs):
+    # Every way a booking goes away (cancel(), the admin, cascades from its
+    # member or class) hands its place back.
+    ClassSession.objects.filter(pk=instance.session_id).update(booked=F('booked') - 1)
@@ -0,0 +1,166 @@
+import threading
+import unittest
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from gym_flow.accounts.factories import create_member, create_members
+from gym_flow.scheduling import booking
+from gym_flow.scheduling.models import Booking, ClassSession
+
+UserModel = get_user_model()
+
+
+def make_session(capacity=2, opens_in=-60, starts_in=3600):
+    now = timezone.now()
+    return ClassSession.objects.create(
+        title='Spin', capacity=capacity,
+        booking_opens_at=now + timedelta(seconds=opens_in),
+        starts_at=now + timedelta(seconds=starts_in),
+        ends_at=now + timedelta(seconds=starts_in + 3600),
+    )
+
+
+class BookingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.session = make_session()
+        cls.ann, cls.bob, cls.cat = create_members(3, password=None)
+
+    def test_booking_takes_a_place(self):
+        booking.book(self.session.pk, self.ann)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.booked, 1)
+        self.assertTrue(Booking.objects.filter(session=self.session, user=self.ann).exists())
+
+    def test_full_class_rejects_and_keeps_no_booking(self):
+        booking.book(self.session.pk, self.ann)
+        booking.book(self.session.pk, self.bob)
+        with self.assertRaises(booking.ClassFull):
+            booking.book(self.session.pk, self.cat)
+
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.booked, 2)
+        self.assertFalse(Booking.objects.filter(user=self.cat).exists())
+
+    def test_booking_twice_is_rejected(self):
+        booking.book(self.session.pk, self.ann)
+        with self.assertRaises(booking.AlreadyBooked):
+            booking.book(self.session.pk, self.ann)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.booked, 1)
+
+    def test_booking_window(self):
+        with self.assertRaises(booking.BookingClosed):
+            booking.book(make_session(opens_in=60).pk, self.ann)
+        with self.assertRaises(booking.BookingClosed):
+            booking.book(make_session(starts_in=-60).pk, self.ann)
+
+    def test_cancel_frees_the_place(self):
+        booking.book(self.session.pk, self.ann)
+        booking.book(self.session.pk, self.bob)
+        self.assertTrue(booking.cancel(self.session.pk, self.ann))
+        self.assertFalse(booking.cancel(self.session.pk, self.ann))
+
+        booking.book(self.session.pk, self.cat)
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.booked, 2)
+
+    def test_deleting_bookings_any_way_frees_places(self):
+        for member in (self.ann, self.bob):
+            booking.book(self.session.pk, member)
+
+        self.bob.delete()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.booked, 1)
+
+        Booking.objects.filter(session=self.session).delete()
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.booked, 0)
+
+    def test_admin_cannot_add_or_change_bookings(self):
+        staff = create_member(is_staff=True, is_superuser=True)
+        booking.book(self.session.pk, self.ann)
+        self.client.force_login(staff)
+        entry = Booking.objects.get()
+
+        self.assertEqual(self.client.get(reverse('admin:scheduling_booking_add')).status_code, 403)
+        self.client.post(reverse('admin:scheduling_booking_change', args=[entry.pk]), {'session': make_session().pk})
+        entry.refresh_from_db()
+        self.assertEqual(entry.session_id, self.session.pk)
+
+        self.client.post(reverse('admin:scheduling_booking_delete', args=[entry.pk]), {'post': 'yes'})
+        self.session.refresh_from_db()
+        self.assertEqual(self.session.booked, 0)
+
+
+class ScheduleViewTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.member = create_member()
+        cls.session = make_session(capacity=1)
+
+    def test_book_and_cancel_through_views(self):
+        self.client.force_login(self.member)
+        response = self.client.post(reverse('class-book', kwargs={'pk': self.session.pk}), follow=True)
+        self.assertContains(response, 'Your place is booked.')
+        self.assertContains(response, '0 of 1 places left')
+
+        response = self.client.post(reverse('class-book', kwargs={'pk': self.session.pk}), follow=True)
+        self.assertContains(response, 'You have already booked this class.')
+
+        response = self.client.post(reverse('class-cancel', kwargs={'pk': self.session.pk}), follow=True)
+        self.assertContains(response, '1 of 1 places left')
+
+    def test_booking_requires_login(self):
+        response = self.client.post(reverse('class-book', kwargs={'pk': self.session.pk}))
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(Booking.objects.count(), 0)
+
+    def test_unknown_class(self):
+        self.client.force_login(self.member)
+        self.assertEqual(self.client.post(reverse('class-book', kwargs={'pk': 0})).status_code, 404)
+
+    def test_schedule_query_count_does_not_grow_with_sessions(self):
+        self.client.force_login(self.member)
+        self.client.get(reverse('class-schedule'))
+        with self.assertNumQueries(3):  # count, sessions, own bookings
+            self.client.get(reverse('class-schedule'))
+        for _ in range(3):
+            make_session()
+        with self.assertNumQueries(3):
+            self.client.get(reverse('class-schedule'))
+
+
+@unittest.skipIf(connection.vendor == 'sqlite', "SQLite serializes all writers, so there is no race to test.")
+class ConcurrentBookingTests(TransactionTestCase):
+    def test_parallel_bookers_never_oversell(self):
+        session = make_session(capacity=5)
+        members = create_members(30, password=None)
+        start = threading.Barrier(len(members))
+        outcomes = []
+
+        def attempt(member):
+            start.wait()
+            try:
+                booking.book(session.pk, member)
+                outcomes.append(True)
+            except booking.ClassFull:
+                outcomes.append(False)
+            finally:
+                connections.close_all()
+
+        threads = [threading.Thread(target=attempt, args=(member, )) for member in members]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        session.refresh_from_db()
+        self.assertEqual(outcomes.count(True), 5)
+        self.assertEqual(session.booked, 5)
+        self.assertEqual(Booking.objects.filter(session=session).count(), 5)
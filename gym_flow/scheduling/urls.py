@@ -0,0 +1,11 @@
+from django.urls import path, include
+
+from gym_flow.scheduling import views
+
+urlpatterns = [
+    path('', views.ClassScheduleView.as_view(), name='class-schedule'),
+    path('<int:pk>/', include([
+        path('book/', views.BookClassView.as_view(), name='class-book'),
+        path('cancel/', views.CancelBookingView.as_view(), name='class-cancel'),
+    ])),
+]
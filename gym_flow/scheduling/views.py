@@ -0,0 +1,62 @@
+from django.contrib import messages
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.http import Http404, HttpResponseRedirect
+from django.urls import reverse_lazy
+from django.utils import timezone
+from django.views import View
+from django.views.generic import ListView
+
+from gym_flow.scheduling import booking
+from gym_flow.scheduling.models import Booking, ClassSession
+
+
+class ClassScheduleView(ListView):
+    model = ClassSession
+    template_name = 'scheduling/schedule.html'
+    context_object_name = 'sessions'
+    paginate_by = 50
+
+    def get_queryset(self):
+        return (
+            ClassSession.objects
+            .filter(starts_at__gt=timezone.now())
+            .select_related('instructor__profile')
+            .order_by('starts_at', 'pk')
+        )
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['booked_ids'] = set()
+        if self.request.user.is_authenticated:
+            context['booked_ids'] = set(
+                Booking.objects.filter(
+                    user=self.request.user, session__in=[session.pk for session in context['sessions']]
+                ).values_list('session_id', flat=True)
+            )
+        return context
+
+
+class BookClassView(LoginRequiredMixin, View):
+    http_method_names = ['post']
+    success_url = reverse_lazy('class-schedule')
+
+    def post(self, request, *args, **kwargs):
+        try:
+            booking.book(kwargs['pk'], request.user)
+        except ClassSession.DoesNotExist:
+            raise Http404("No class found matching the query")
+        except booking.BookingError as exc:
+            messages.error(request, exc.message)
+        else:
+            messages.success(request, "Your place is booked.")
+        return HttpResponseRedirect(self.success_url)
+
+
+class CancelBookingView(LoginRequiredMixin, View):
+    http_method_names = ['post']
+    success_url = reverse_lazy('class-schedule')
+
+    def post(self, request, *args, **kwargs):
+        if booking.cancel(kwargs['pk'], request.user):
+            messages.success(request, "Your booking is cancelled.")
+        return HttpResponseRedirect(self.success_url)
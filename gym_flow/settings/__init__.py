@@ -0,0 +1,20 @@
+"""
+Settings are split per environment; GYM_FLOW_ENV selects which module is
+loaded on top of ``base``:
+
+    dev   local development (default)
+    prod  production performance profile
+    test  fast local test runs on SQLite
+"""
+import os
+
+GYM_FLOW_ENV = os.environ.get('GYM_FLOW_ENV', 'dev')
+
+if GYM_FLOW_ENV == 'prod':
+    from .prod import *  # noqa: F401,F403
+elif GYM_FLOW_ENV == 'test':
+    from .test import *  # noqa: F401,F403
+elif GYM_FLOW_ENV == 'dev':
+    from .dev import *  # noqa: F401,F403
+else:
+    raise ImportError(f"Unknown GYM_FLOW_ENV {GYM_FLOW_ENV!r}; expected 'dev', 'prod' or 'test'.")
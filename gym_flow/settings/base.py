@@ -0,0 +1,326 @@
+"""
+Django settings for gym_flow project shared by every environment.
+
+Generated by 'django-admin startproject' using Django 5.1.7.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/5.1/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/5.1/ref/settings/
+"""
+
+import os
+from pathlib import Path
+
+from django.urls import reverse_lazy
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# See https://docs.djangoproject.com/en/5.1/howto/deployment/checklist/
+
+DEBUG = False
+
+ALLOWED_HOSTS = [host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host]
+
+
+USER_APPS = [
+    'gym_flow.accounts',
+    'gym_flow.checkins',
+    'gym_flow.common',
+    'gym_flow.scheduling',
+]
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'django.contrib.postgres',
+] + USER_APPS
+
+MIDDLEWARE = [
+    'gym_flow.common.middleware.RequestMetricsMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'gym_flow.common.middleware.StaticFilesMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'gym_flow.accounts.middleware.HashingBusyMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'gym_flow.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates']
+        ,
+        'OPTIONS': {
+            # Compiled templates are kept per process; the dev autoreloader
+            # still clears them when a template changes.
+            'loaders': [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+                'gym_flow.accounts.context_processors.user_profile',
+            ],
+        },
+    },
+]
+
+WSGI_APPLICATION = 'gym_flow.wsgi.application'
+
+# Compile every template under templates/ when a WSGI/ASGI worker boots.
+TEMPLATES_WARM_ON_STARTUP = False
+
+
+# Database
+# https://docs.djangoproject.com/en/5.1/ref/settings/#databases
+
+DATABASES = {
+    "default": {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.environ.get("DB_NAME", "gym_flow_db"),
+        "USER": os.environ.get("DB_USER", "postgres"),
+        "PASSWORD": os.environ.get("DB_PASSWORD", "password"),
+        "HOST": os.environ.get("DB_HOST", "127.0.0.1"),
+        "PORT": os.environ.get("DB_PORT", "5432"),
+        # Keep each worker thread's connection open between requests instead of
+        # paying the TCP and auth handshake every time; the health check
+        # replaces connections the server dropped.
+        "CONN_MAX_AGE": int(os.environ.get("DB_CONN_MAX_AGE", 60)),
+        "CONN_HEALTH_CHECKS": True,
+        "OPTIONS": {
+            "connect_timeout": int(os.environ.get("DB_CONNECT_TIMEOUT", 5)),
+        },
+    }
+}
+
+DB_STATEMENT_TIMEOUT_MS = int(os.environ.get("DB_STATEMENT_TIMEOUT_MS", 30_000))
+if DB_STATEMENT_TIMEOUT_MS:
+    DATABASES["default"]["OPTIONS"]["options"] = f"-c statement_timeout={DB_STATEMENT_TIMEOUT_MS}"
+
+# gym_flow.asgi sets this before loading settings. Async views run their
+# queries in threads that do not outlive the request, so a persistent
+# connection would never be reused; it would stay open until CONN_MAX_AGE.
+RUNNING_UNDER_ASGI = os.environ.get("GYM_FLOW_ASGI") == "1"
+
+# A shared connection pool per process instead of one persistent connection
+# per thread. Django only pools with psycopg 3 (psycopg[pool] in
+# requirements.txt), and pooled connections must not also be persistent.
+DB_POOL_MAX_SIZE = int(os.environ.get("DB_POOL_MAX_SIZE", 0))
+if DB_POOL_MAX_SIZE or RUNNING_UNDER_ASGI:
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+if DB_POOL_MAX_SIZE:
+    DATABASES["default"]["OPTIONS"]["pool"] = {
+        "min_size": int(os.environ.get("DB_POOL_MIN_SIZE", 2)),
+        "max_size": DB_POOL_MAX_SIZE,
+        "max_lifetime": int(os.environ.get("DB_POOL_MAX_LIFETIME", 3600)),
+        "timeout": int(os.environ.get("DB_POOL_TIMEOUT", 10)),
+    }
+
+
+# Password validation
+# https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+# The first hasher is used for new passwords; the others only verify existing
+# hashes, which are upgraded to the first one on the next successful login.
+PASSWORD_HASHERS = [
+    'gym_flow.accounts.hashers.TunedScryptPasswordHasher',
+    'gym_flow.accounts.hashers.TunedArgon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+]
+if os.environ.get('GYM_FLOW_PASSWORD_HASHER') == 'argon2':
+    PASSWORD_HASHERS[:2] = reversed(PASSWORD_HASHERS[:2])
+
+# Django's scrypt default (N=2**14, r=8, p=5) takes ~310 ms per hash on one
+# core; N=2**15, r=8, p=1 takes ~145 ms and uses 32 MiB instead of 16, for a
+# similar memory-time cost per guess (python -m benchmarks.bench_hashing
+# --parameters). Changing these rehashes passwords on the next login.
+ACCOUNTS_SCRYPT_WORK_FACTOR = 2 ** 15
+ACCOUNTS_SCRYPT_BLOCK_SIZE = 8
+ACCOUNTS_SCRYPT_PARALLELISM = 1
+# Django's Argon2 defaults; benchmark them before preferring Argon2.
+ACCOUNTS_ARGON2_TIME_COST = 2
+ACCOUNTS_ARGON2_MEMORY_COST = 102400
+ACCOUNTS_ARGON2_PARALLELISM = 8
+
+# Password hashes computed at once per worker process; extra logins wait up to
+# ACCOUNTS_HASH_QUEUE_TIMEOUT seconds for a slot and are then answered with
+# 503 and Retry-After.
+ACCOUNTS_MAX_CONCURRENT_HASHES = os.cpu_count() or 1
+ACCOUNTS_HASH_QUEUE_TIMEOUT = 10
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/5.1/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/5.1/howto/static-files/
+
+STATIC_URL = 'static/'
+
+STATICFILES_DIRS = [
+    BASE_DIR / 'static',
+]
+
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+# Serve STATIC_ROOT from the app itself (see StaticFilesMiddleware); turn on
+# when no CDN or web server handles /static/.
+COMMON_SERVE_STATIC = os.environ.get('SERVE_STATIC', '') == '1'
+COMMON_STATIC_MAX_AGE = 60 * 60
+
+MEDIA_URL = 'media/'
+
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Media is stored under the SHA-256 of its content, so identical uploads are
+# kept once; `manage.py sweep_media` deletes files nothing references.
+STORAGES = {
+    'default': {
+        'BACKEND': 'gym_flow.common.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+}
+
+# Media is served by gym_flow.common.views.serve_media. Behind nginx, set
+# MEDIA_SENDFILE_HEADER=X-Accel-Redirect and alias COMMON_MEDIA_ACCEL_PREFIX
+# to MEDIA_ROOT in an internal location, so Django only resolves the request
+# and nginx sends the file:
+#
+#     location /protected-media/ { internal; alias /srv/gym_flow/media/; }
+#
+# Apache (mod_xsendfile) and lighttpd take X-Sendfile with the file's path.
+# Without a header the file is streamed by the application server (and, under
+# ASGI, read into memory first); check --deploy warns about that.
+COMMON_MEDIA_SENDFILE_HEADER = os.environ.get('MEDIA_SENDFILE_HEADER', '')
+COMMON_MEDIA_ACCEL_PREFIX = '/protected-media/'
+# Content-addressed originals are cached for a year; other media for this long.
+COMMON_MEDIA_MAX_AGE = 60 * 60
+
+# Resized WebP variants generated for every profile picture: name -> longest side in px.
+PROFILE_PICTURE_SIZES = {
+    'thumbnail': 64,
+    'small': 160,
+    'medium': 480,
+}
+PROFILE_PICTURE_WEBP_QUALITY = 80
+# Background threads generating variants; 0 generates them in the request after commit.
+PROFILE_PICTURE_WORKERS = 2
+
+# Profile picture uploads to ProfileEditView are streamed into MEDIA_ROOT and
+# rejected as soon as they exceed these limits; other uploads, the admin's
+# included, use Django's default handlers and the model form's validation.
+PROFILE_PICTURE_MAX_UPLOAD_SIZE = 5 * 1024 * 1024
+PROFILE_PICTURE_MAX_PIXELS = 40_000_000
+PROFILE_PICTURE_FORMATS = ('JPEG', 'PNG', 'WEBP', 'GIF')
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/5.1/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+AUTH_USER_MODEL = 'accounts.AppUser'
+AUTHENTICATION_BACKENDS = [
+    'gym_flow.accounts.backends.ProfileModelBackend',
+]
+ACCOUNTS_USER_CACHE_TIMEOUT = 300
+
+# Login and registration throttling (gym_flow.accounts.throttling):
+# scope -> (attempts, seconds), counted per client IP and per submitted email
+# in the cache. Leave a scope out to stop limiting it. Behind a proxy that
+# passes the client address in a header, set ACCOUNTS_THROTTLE_IP_HEADER to
+# its META key, e.g. 'HTTP_X_REAL_IP'.
+ACCOUNTS_THROTTLE_RATES = {
+    'login:ip': (30, 60),
+    'login:email': (10, 15 * 60),
+    'register:ip': (10, 60 * 60),
+    'register:email': (3, 60 * 60),
+}
+ACCOUNTS_THROTTLE_CACHE_ALIAS = 'default'
+ACCOUNTS_THROTTLE_IP_HEADER = os.environ.get('THROTTLE_IP_HEADER', 'REMOTE_ADDR')
+
+# Member directory search (gym_flow.accounts.search). Terms shorter than the
+# trigram minimum only use prefix matching.
+ACCOUNTS_MEMBER_SEARCH_PAGE_SIZE = 25
+ACCOUNTS_MEMBER_SEARCH_MAX_PAGE_SIZE = 100
+ACCOUNTS_MEMBER_SEARCH_TRIGRAM_MIN_LENGTH = 3
+
+# Members fetched per cursor round trip and written per chunk by the
+# streaming member export (gym_flow.accounts.export).
+ACCOUNTS_EXPORT_CHUNK_SIZE = 2000
+
+# Check-in ingestion (gym_flow.checkins.buffer). Gates authenticate with one
+# of CHECKINS_GATE_TOKENS in the X-Gate-Token header.
+CHECKINS_GATE_TOKENS = [token for token in os.environ.get('CHECKINS_GATE_TOKENS', '').split(',') if token]
+CHECKINS_BUFFER_SIZE = 500
+CHECKINS_FLUSH_INTERVAL = 1.0
+CHECKINS_DEDUP_WINDOW = 10
+# Check-ins younger than this many seconds wait for the next rollup refresh.
+CHECKINS_ROLLUP_LAG = 5
+
+# Sessions are read through the cache and unchanged sessions are not rewritten.
+SESSION_ENGINE = 'gym_flow.common.sessions'
+
+# Above this many rows, unfiltered admin changelists show the planner's
+# estimate instead of running COUNT(*) (gym_flow.common.pagination).
+COMMON_ESTIMATED_COUNT_THRESHOLD = 100_000
+
+# Per-view request metrics (gym_flow.common.metrics), off unless
+# REQUEST_METRICS=1. Read them with `manage.py request_metrics` or, as
+# staff, from /metrics/.
+COMMON_REQUEST_METRICS = os.environ.get('REQUEST_METRICS', '') == '1'
+COMMON_REQUEST_METRICS_WINDOW = 1000
+COMMON_REQUEST_METRICS_PUBLISH_INTERVAL = 10
+COMMON_REQUEST_METRICS_CACHE_ALIAS = 'default'
+COMMON_N_PLUS_ONE_THRESHOLD = 10
+
+# Anonymous page cache used by gym_flow.common.cache.cache_anonymous_page.
+COMMON_PAGE_CACHE_ALIAS = 'default'
+COMMON_PAGE_CACHE_TIMEOUT = 60
+COMMON_PAGE_CACHE_STALE_TIMEOUT = 300
+COMMON_PAGE_CACHE_LOCK_TIMEOUT = 10
+LOGIN_REDIRECT_URL = reverse_lazy('home')
+LOGOUT_REDIRECT_URL = reverse_lazy('home')
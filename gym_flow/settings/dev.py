@@ -0,0 +1,14 @@
+import os
+
+from .base import *  # noqa: F401,F403
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get(
+    'DJANGO_SECRET_KEY',
+    'django-insecure-jy0pp*kh_uq!gcqkkza6))in)6^z_$jwe_4up!9yo389o*3py0',
+)
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = True
+
+ALLOWED_HOSTS = ALLOWED_HOSTS or ['localhost', '127.0.0.1', '[::1]']
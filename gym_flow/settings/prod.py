@@ -0,0 +1,28 @@
+import os
+
+from .base import *  # noqa: F401,F403
+
+SECRET_KEY = os.environ['DJANGO_SECRET_KEY']
+
+DEBUG = False
+
+# A cache shared by every worker, so cached pages, users and sessions are not
+# duplicated (and invalidated) per process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_URL', 'redis://127.0.0.1:6379/0'),
+        'TIMEOUT': 300,
+    },
+}
+
+TEMPLATES_WARM_ON_STARTUP = True
+
+STORAGES = {
+    'default': {
+        'BACKEND': 'gym_flow.common.storage.ContentAddressedStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'gym_flow.common.storage.CompressedManifestStaticFilesStorage',
+    },
+}
@@ -0,0 +1,34 @@
+"""
+Opt-in settings for quick local test runs on an in-memory SQLite database:
+
+    GYM_FLOW_ENV=test python manage.py test --parallel    # one database per core
+    GYM_FLOW_ENV=test python manage.py test --slowest 20  # list the 20 slowest tests
+
+Trigram search, estimated counts, upserts, server-side cursors and the
+booking concurrency test only run against PostgreSQL, so CI and a plain
+``python manage.py test`` use the dev settings.
+"""
+from .base import *  # noqa: F401,F403
+
+SECRET_KEY = 'django-insecure-test-only'
+
+DATABASES = {
+    'default': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': ':memory:',
+    },
+}
+
+# Hashing strength is irrelevant to the tests and dominated their run time.
+# Tests of the production hashers override PASSWORD_HASHERS themselves.
+PASSWORD_HASHERS = [
+    'django.contrib.auth.hashers.MD5PasswordHasher',
+]
+
+# Throttle counters live in the cache, which outlives each test; the
+# throttling tests set their own rates.
+ACCOUNTS_THROTTLE_RATES = {}
+
+TEST_RUNNER = 'gym_flow.common.runner.TimedTestRunner'
+# Number of slowest tests listed after each run; --slowest overrides it.
+TEST_SLOWEST = 10
@@ -14,11 +14,17 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
+from gym_flow.common.views import serve_media
+
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('', include('gym_flow.common.urls')),
-    path('accounts/', include('gym_flow.accounts.urls'))
+    path('accounts/', include('gym_flow.accounts.urls')),
+    path('checkins/', include('gym_flow.checkins.urls')),
+    path('classes/', include('gym_flow.scheduling.urls')),
+    path(f"{settings.MEDIA_URL.strip('/')}/<path:path>", serve_media, name='media'),
 ]
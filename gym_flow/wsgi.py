@@ -14,3 +14,10 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'gym_flow.settings')
 
 application = get_wsgi_application()
+
+from django.conf import settings  # noqa: E402
+
+if settings.TEMPLATES_WARM_ON_STARTUP:
+    from gym_flow.common.templates import warm_templates
+
+    warm_templates()